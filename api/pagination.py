@@ -0,0 +1,67 @@
+"""Keyset pagination for API list endpoints."""
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from searching.pagination import InvalidCursor, KeysetPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over ``searching.pagination.KeysetPaginator``.
+
+    The view provides the ordering through ``get_keyset_ordering()``. Clients
+    follow the ``next`` link; ``limit`` sets the page size.
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    page_size = 24
+    max_page_size = 100
+
+    def get_limit(self, request):
+        """Return the requested page size within ``max_page_size``."""
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(limit, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the rows of the requested page."""
+        self.request = request
+        paginator = KeysetPaginator(queryset, view.get_keyset_ordering(), self.get_limit(request))
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise ValidationError({self.cursor_query_param: 'Некоректний курсор.'})
+        return self.page.items
+
+    def get_next_link(self):
+        """Return the URL of the next page, or None on the last page."""
+        if not self.page.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.page.next_cursor,
+        )
+
+    def get_first_link(self):
+        """Return the URL of the first page."""
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        """Wrap page data with navigation links."""
+        return Response({'next': self.get_next_link(), 'first': self.get_first_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        """Describe the paginated response for schema generation."""
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,28 @@
+"""JSON renderer backed by orjson when it is installed."""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Compact JSON renderer.
+
+    Serializes with orjson (several times faster than the standard library)
+    and falls back to DRF's renderer when orjson is not available.
+    """
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render ``data`` into compact UTF-8 JSON bytes."""
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._encoder.default)
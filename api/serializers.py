@@ -0,0 +1,81 @@
+"""Serializers for the read-only catalog API."""
+
+from rest_framework import serializers
+
+from profiles.models import Department, ScientificInterest, TeacherProfile
+from searching.models import Slot
+
+
+class SparseFieldsetsMixin:
+    """
+    Limit serialized fields to the ``fields`` query parameter.
+
+    ``?fields=id,last_name`` returns only those top-level fields; unknown
+    names are ignored and an empty value keeps all fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        requested = request.query_params.get('fields') if request is not None else None
+        if not requested:
+            return
+        keep = {name.strip() for name in requested.split(',')}
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
+class DepartmentSerializer(serializers.ModelSerializer):
+    """Department id and name."""
+
+    class Meta:
+        model = Department
+        fields = ['id', 'name']
+
+
+class InterestSerializer(serializers.ModelSerializer):
+    """Scientific interest."""
+
+    class Meta:
+        model = ScientificInterest
+        fields = ['id', 'name', 'description']
+
+
+class InterestNameSerializer(serializers.ModelSerializer):
+    """Scientific interest without description, as prefetched for the catalog."""
+
+    class Meta:
+        model = ScientificInterest
+        fields = ['id', 'name']
+
+
+class TeacherSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """
+    Teacher catalog card.
+
+    Expects a queryset prepared with ``TeacherProfile.objects.for_catalog()``,
+    so any number of teachers is serialized with a fixed number of queries.
+    """
+
+    first_name = serializers.CharField(source='user.first_name')
+    last_name = serializers.CharField(source='user.last_name')
+    email = serializers.EmailField(source='user.email')
+    department = DepartmentSerializer()
+    interests = InterestNameSerializer(source='scientific_interests', many=True)
+    free_slots = serializers.IntegerField(source='free_slot_count')
+    total_slots = serializers.IntegerField(source='slot_count')
+
+    class Meta:
+        model = TeacherProfile
+        fields = [
+            'id', 'first_name', 'last_name', 'email', 'department', 'interests', 'bio',
+            'max_slots', 'free_slots', 'total_slots',
+        ]
+
+
+class SlotSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """Available consultation slot."""
+
+    class Meta:
+        model = Slot
+        fields = ['id', 'topic', 'created_at']
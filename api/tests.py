@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from profiles.models import Department, ScientificInterest, StudentProfile
+from searching.models import Slot
+from searching.tests import make_teacher
+from users.models import User
+
+
+class CatalogApiTests(TestCase):
+    """The catalog API filters, paginates and keeps a fixed query count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.other = Department.objects.create(name="Кафедра математики")
+        cls.interest = ScientificInterest.objects.create(name="Машинне навчання")
+        cls.teachers = [
+            make_teacher(cls.department, f"t{i}@lnu.edu.ua", [cls.interest], bio="нейронні мережі")
+            for i in range(5)
+        ]
+        cls.foreign = make_teacher(cls.other, "foreign@lnu.edu.ua")
+        user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(
+            user=user, group="ПМі-31", year_of_study=3, department=cls.department,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.student.user)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api:teacher-list')).status_code, 403)
+
+    def test_token_authentication(self):
+        self.client.logout()
+        token = Token.objects.create(user=self.student.user)
+        response = self.client.get(reverse('api:department-list'), HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d['name'] for d in response.json()], ["Кафедра математики", "Кафедра програмування"])
+
+    def test_teachers_are_paginated_by_cursor(self):
+        url = reverse('api:teacher-list')
+        seen = []
+        while url:
+            response = self.client.get(url, {'limit': 2} if not seen else None)
+            data = response.json()
+            seen.extend(t['id'] for t in data['results'])
+            url = data['next']
+
+        # 3rd year students only see teachers of their department.
+        self.assertEqual(sorted(seen), sorted(t.pk for t in self.teachers))
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        url = reverse('api:teacher-list')
+        self.client.get(url)  # warm session and role caches
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {'limit': 1})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(url, {'limit': 5})
+        self.assertEqual(len(small), len(large))
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(reverse('api:teacher-list'), {'fields': 'id,free_slots'})
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'free_slots'})
+
+    def test_search_and_interest_filters(self):
+        response = self.client.get(reverse('api:teacher-list'), {'q': 'мережі', 'interest': self.interest.pk})
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_available_slots(self):
+        teacher = self.teachers[0]
+        taken = teacher.slots.first()
+        taken.is_available = False
+        taken.save()
+
+        response = self.client.get(reverse('api:teacher-slots', args=[teacher.pk]))
+
+        self.assertEqual(
+            [slot['id'] for slot in response.json()],
+            list(Slot.objects.filter(teacher=teacher, is_available=True).order_by('created_at', 'id')
+                 .values_list('pk', flat=True)),
+        )
+        self.assertEqual(self.client.get(reverse('api:teacher-slots', args=[self.foreign.pk])).status_code, 404)
@@ -0,0 +1,15 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('departments', views.DepartmentViewSet, basename='department')
+router.register('interests', views.InterestViewSet, basename='interest')
+router.register('teachers', views.TeacherViewSet, basename='teacher')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
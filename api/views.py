@@ -0,0 +1,71 @@
+"""Read-only JSON API for the teacher catalog and slot availability."""
+
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from profiles.models import Department, ScientificInterest
+from searching.catalog import CATALOG_SORTS, filter_catalog
+from searching.models import Slot
+from users.roles import ROLE_STUDENT, resolve_profile
+
+from .pagination import KeysetPagination
+from .serializers import DepartmentSerializer, InterestSerializer, SlotSerializer, TeacherSerializer
+
+
+def _student_profile(request):
+    """Return the student profile of the requesting user, or None."""
+    resolved = resolve_profile(request.user)
+    return resolved.profile if resolved.role == ROLE_STUDENT else None
+
+
+class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
+    """Departments, sorted by name."""
+
+    queryset = Department.objects.order_by('name')
+    serializer_class = DepartmentSerializer
+    pagination_class = None
+
+
+class InterestViewSet(viewsets.ReadOnlyModelViewSet):
+    """Scientific interests, sorted by name."""
+
+    queryset = ScientificInterest.objects.order_by('name')
+    serializer_class = InterestSerializer
+    pagination_class = None
+
+
+class TeacherViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Approved teachers with the same filters as the HTML catalog.
+
+    Query parameters: ``department``, ``interest``, ``q``, ``sort``
+    (``name``/``availability``/``relevance``), ``cursor``, ``limit`` and
+    ``fields``. 3rd/4th year students only see their own department.
+    """
+
+    serializer_class = TeacherSerializer
+    pagination_class = KeysetPagination
+
+    def _catalog(self):
+        """Apply catalog filters once per request (detail routes ignore list filters)."""
+        if not hasattr(self, '_catalog_query'):
+            params = self.request.query_params if self.action == 'list' else {}
+            self._catalog_query = filter_catalog(params, _student_profile(self.request))
+        return self._catalog_query
+
+    def get_queryset(self):
+        """Return catalog teachers prepared for serialization."""
+        return self._catalog().teachers.for_catalog().with_sort_names()
+
+    def get_keyset_ordering(self):
+        """Return the keyset ordering for the requested sort."""
+        return CATALOG_SORTS[self._catalog().sort]
+
+    @action(detail=True, serializer_class=SlotSerializer)
+    def slots(self, request, pk=None):
+        """Return the teacher's available slots, oldest first."""
+        teacher = get_object_or_404(self._catalog().teachers.only('id'), pk=pk)
+        slots = Slot.objects.filter(teacher=teacher, is_available=True, is_filled=False).order_by('created_at', 'id')
+        return Response(self.get_serializer(slots, many=True).data)
@@ -0,0 +1,42 @@
+"""Gunicorn settings for the web container.
+
+By default the ASGI application runs on uvicorn workers, so async views do
+not hold a worker while they wait for the database. Set
+``GUNICORN_WORKER_CLASS=sync`` to fall back to the WSGI application with
+classic sync workers, e.g. to compare both with ``loadtest --base-url``.
+
+Prometheus metrics of all workers are merged through files in
+``PROMETHEUS_MULTIPROC_DIR`` (see mentorion/metrics.py), which is emptied
+when the server starts.
+"""
+
+import os
+import shutil
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# Caches are per process unless CACHE_URL points at a shared backend, see settings.py.
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+if worker_class == 'sync' or worker_class.startswith(('gthread', 'gevent', 'eventlet')):
+    wsgi_app = 'mentorion.wsgi:application'
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+else:
+    wsgi_app = 'mentorion.asgi:application'
+
+# Set before the workers fork, so every worker writes its samples there.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/mentorion-metrics')
+
+
+def on_starting(server):
+    """Drop samples of workers from a previous run."""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Stop counting the live gauges of a worker that exited."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,62 @@
+"""Django admin configuration for background jobs."""
+
+from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
+
+from .models import Job
+from .registry import enqueue
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Read-only admin interface for Job model with progress and downloads."""
+
+    list_display = ('id', 'kind', 'status', 'progress_display', 'created_by', 'created_at', 'finished_at',
+                    'download_link')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('kind', 'params', 'status', 'progress', 'total', 'result', 'artifact', 'error',
+                       'created_by', 'created_at', 'started_at', 'finished_at', 'download_link')
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        """Jobs are created by admin actions only."""
+        return False
+
+    def progress_display(self, obj):
+        """Display processed items and percentage."""
+        percent = obj.percent()
+        if percent is None:
+            return obj.progress
+        return f"{obj.progress}/{obj.total or obj.progress} ({percent}%)"
+    progress_display.short_description = 'Прогрес'
+
+    def download_link(self, obj):
+        """Display a link to the job artifact."""
+        if obj.status != Job.STATUS_DONE or not obj.artifact:
+            return ''
+        return format_html('<a href="{}">Завантажити</a>', reverse('jobs:download', args=[obj.pk]))
+    download_link.short_description = 'Файл'
+
+
+class EnqueueJobMixin:
+    """ModelAdmin mixin for actions that hand work over to the job queue."""
+
+    def enqueue_job(self, request, kind, params):
+        """
+        Queue a job and tell the admin where to follow its progress.
+
+        Args:
+            request: HTTP request object.
+            kind: Registered task name.
+            params: JSON-serializable task parameters.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = enqueue(kind, params, user=request.user)
+        self.message_user(request, format_html(
+            'Завдання <a href="{}">#{}</a> додано в чергу. Результат з\'явиться після обробки.',
+            reverse('admin:jobs_job_change', args=[job.pk]), job.pk,
+        ))
+        return job
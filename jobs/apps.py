@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "jobs"
+    verbose_name = "Фонові завдання"
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        # Task functions live in ``<app>/tasks.py`` and register themselves on import.
+        autodiscover_modules('tasks')
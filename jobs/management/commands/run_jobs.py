@@ -0,0 +1,97 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from jobs.runner import claim_jobs, fail_job, fail_stale_jobs, run_job
+from jobs.worker import execute, init_worker
+
+
+class Command(BaseCommand):
+    help = 'Виконує фонові завдання з черги в базі даних (пул процесів, без зовнішнього брокера)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Кількість процесів; 0 — виконувати в поточному процесі')
+        parser.add_argument('--poll', type=float, default=2.0, help='Інтервал опитування черги, с')
+        parser.add_argument('--once', action='store_true', help='Виконати наявні завдання і завершитись')
+        parser.add_argument('--stale-minutes', type=int, default=120,
+                            help='Позначати як невдалі завдання, що виконуються довше за цей час')
+
+    def handle(self, *args, **options):
+        stale = fail_stale_jobs(timezone.now() - timedelta(minutes=options['stale_minutes']))
+        if stale:
+            self.stdout.write(self.style.WARNING(f'Позначено як невдалі {stale} завислих завдань'))
+
+        if options['workers'] <= 0:
+            self._run_inline(options)
+            return
+
+        # A crashed worker breaks the whole pool; start a new one and carry on.
+        while not self._run_pool(options):
+            self.stderr.write(self.style.WARNING('Пул процесів перезапускається'))
+
+    def _run_inline(self, options):
+        while True:
+            claimed = claim_jobs(1)
+            for job_id in claimed:
+                self._report(job_id, run_job(job_id))
+            if not claimed:
+                if options['once']:
+                    return
+                close_old_connections()
+                time.sleep(options['poll'])
+
+    def _run_pool(self, options):
+        """
+        Feed claimed jobs to a process pool until the queue is drained (with --once).
+
+        Returns:
+            bool: False if the pool broke and must be restarted.
+        """
+        workers = options['workers']
+        # Spawned processes do not inherit the parent's database connections.
+        context = multiprocessing.get_context('spawn')
+        running = {}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+            while True:
+                for job_id in claim_jobs(workers - len(running)):
+                    try:
+                        running[pool.submit(execute, job_id)] = job_id
+                    except BrokenProcessPool as exc:
+                        self._fail(job_id, exc)
+                        return False
+
+                if not running:
+                    if options['once']:
+                        return True
+                    close_old_connections()
+                    time.sleep(options['poll'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        self._report(job_id, future.result())
+                    except BrokenProcessPool as exc:
+                        self._fail(job_id, exc)
+                        broken = True
+                if broken:
+                    for job_id in running.values():
+                        self._fail(job_id, BrokenProcessPool())
+                    return False
+
+    def _fail(self, job_id, exc):
+        fail_job(job_id, f'Обробник впав: {exc!r}')
+        self.stderr.write(self.style.ERROR(f'Завдання #{job_id}: обробник впав ({exc})'))
+
+    def _report(self, job_id, status):
+        style = self.style.SUCCESS if status == 'done' else self.style.ERROR
+        self.stdout.write(style(f'Завдання #{job_id}: {status}'))
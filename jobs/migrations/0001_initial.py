@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 07:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=100, verbose_name='Тип')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Параметри')),
+                ('status', models.CharField(choices=[('queued', 'В черзі'), ('running', 'Виконується'), ('done', 'Завершено'), ('failed', 'Помилка')], default='queued', max_length=20, verbose_name='Статус')),
+                ('progress', models.PositiveIntegerField(default=0, verbose_name='Оброблено')),
+                ('total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Всього')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('artifact', models.CharField(blank=True, max_length=500, verbose_name='Файл')),
+                ('error', models.TextField(blank=True, verbose_name='Помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Розпочато')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to=settings.AUTH_USER_MODEL, verbose_name='Створено користувачем')),
+            ],
+            options={
+                'verbose_name': 'Фонове завдання',
+                'verbose_name_plural': 'Фонові завдання',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+"""Models for the database-backed background job queue."""
+
+from django.conf import settings
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    Unit of background work picked up by the ``run_jobs`` worker.
+
+    Attributes:
+        kind: Registered task name (see jobs.registry)
+        params: JSON parameters passed to the task
+        status: Current status (queued/running/done/failed)
+        progress: Number of processed items
+        total: Total number of items, if known
+        result: JSON summary returned by the task
+        artifact: File produced by the task, relative to JOBS_ARTIFACT_ROOT
+        error: Traceback of a failed job
+        created_by: User who enqueued the job
+        created_at: Timestamp of job creation
+        started_at: Timestamp when a worker claimed the job
+        finished_at: Timestamp when the job finished
+    """
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'В черзі'),
+        (STATUS_RUNNING, 'Виконується'),
+        (STATUS_DONE, 'Завершено'),
+        (STATUS_FAILED, 'Помилка'),
+    ]
+
+    kind = models.CharField(max_length=100, verbose_name="Тип")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Параметри")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name="Статус",
+    )
+    progress = models.PositiveIntegerField(default=0, verbose_name="Оброблено")
+    total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Всього")
+    result = models.JSONField(null=True, blank=True, verbose_name="Результат")
+    artifact = models.CharField(max_length=500, blank=True, verbose_name="Файл")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+        verbose_name="Створено користувачем",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Розпочато")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
+
+    class Meta:
+        verbose_name = "Фонове завдання"
+        verbose_name_plural = "Фонові завдання"
+        indexes = [
+            # Workers claim the oldest queued jobs.
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ]
+
+    def percent(self):
+        """
+        Get completion percentage.
+
+        Returns:
+            int or None: Percent of processed items, None if the total is unknown.
+        """
+        if not self.total:
+            return 100 if self.status == self.STATUS_DONE else None
+        return min(100, self.progress * 100 // self.total)
+
+    def __str__(self):
+        """Return string representation of job."""
+        return f"{self.kind} #{self.pk} ({self.get_status_display()})"
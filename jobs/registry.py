@@ -0,0 +1,116 @@
+"""Registry of background tasks and the enqueue API.
+
+Tasks are plain functions registered with ``@task('app.name')`` in an app's
+``tasks.py``. They receive a ``JobContext`` and the job parameters and
+return a JSON-serializable summary.
+"""
+
+import os
+
+from django.conf import settings
+from django.utils import timezone
+
+_TASKS = {}
+
+
+class UnknownTask(LookupError):
+    """Raised when a job refers to a task that is not registered."""
+
+
+def task(name):
+    """
+    Register a function as a background task.
+
+    Args:
+        name: Unique task name stored in ``Job.kind``.
+
+    Returns:
+        callable: Decorator that registers and returns the function.
+    """
+    def decorator(func):
+        _TASKS[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    """
+    Return the task function registered under ``name``.
+
+    Raises:
+        UnknownTask: If no task has this name.
+    """
+    try:
+        return _TASKS[name]
+    except KeyError:
+        raise UnknownTask(name) from None
+
+
+def enqueue(name, params=None, user=None):
+    """
+    Add a job to the queue.
+
+    Args:
+        name: Registered task name.
+        params: JSON-serializable task parameters.
+        user: User who requested the job.
+
+    Returns:
+        Job: The queued job.
+    """
+    from .models import Job
+
+    get_task(name)
+    return Job.objects.create(kind=name, params=params or {}, created_by=user)
+
+
+def artifact_root():
+    """Return the directory where job artifacts are stored."""
+    return settings.JOBS_ARTIFACT_ROOT
+
+
+class JobContext:
+    """
+    Handle passed to a running task for progress and artifact reporting.
+
+    Args:
+        job: The Job being executed.
+    """
+
+    def __init__(self, job, report_every=500):
+        self.job = job
+        self.report_every = report_every
+        self._reported = 0
+
+    def set_total(self, total):
+        """Store the total number of items to process."""
+        self.job.total = total
+        type(self.job).objects.filter(pk=self.job.pk).update(total=total)
+
+    @property
+    def done(self):
+        """Return the last reported number of processed items."""
+        return self.job.progress
+
+    def progress(self, done, force=False):
+        """
+        Report the number of processed items.
+
+        Writes to the database at most once per ``report_every`` items.
+        """
+        self.job.progress = done
+        if force or done - self._reported >= self.report_every:
+            self._reported = done
+            type(self.job).objects.filter(pk=self.job.pk).update(progress=done)
+
+    def artifact_path(self, filename):
+        """
+        Return an absolute path for a file produced by the task.
+
+        The file is registered as the job artifact and served by the download view.
+        """
+        relative = os.path.join(timezone.now().strftime('%Y/%m'), f"{self.job.pk}-{filename}")
+        path = os.path.join(artifact_root(), relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.job.artifact = relative
+        return path
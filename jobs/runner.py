@@ -0,0 +1,95 @@
+"""Claiming and executing queued jobs.
+
+Workers claim jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+``run_jobs`` processes can share one queue without a broker. Connection
+housekeeping is left to the caller (see jobs.worker).
+"""
+
+import logging
+import traceback
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+from .registry import JobContext, get_task
+
+logger = logging.getLogger(__name__)
+
+
+def claim_jobs(limit):
+    """
+    Atomically move up to ``limit`` oldest queued jobs to running.
+
+    Args:
+        limit: Maximum number of jobs to claim.
+
+    Returns:
+        list: Ids of the claimed jobs.
+    """
+    if limit <= 0:
+        return []
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED)
+            .order_by('id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(pk__in=ids, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING, started_at=timezone.now(),
+            )
+    return ids
+
+
+def run_job(job_id):
+    """
+    Execute a claimed job and store its outcome.
+
+    Args:
+        job_id: Id of a job in running status.
+
+    Returns:
+        str: Final job status.
+    """
+    job = Job.objects.get(pk=job_id)
+    context = JobContext(job)
+    try:
+        result = get_task(job.kind)(context, **job.params)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        job.status = Job.STATUS_FAILED
+        job.error = traceback.format_exc()
+        result = None
+    else:
+        job.status = Job.STATUS_DONE
+        if job.total is not None:
+            job.progress = job.total
+
+    job.result = result
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'progress', 'result', 'artifact', 'error', 'finished_at'])
+    return job.status
+
+
+def fail_job(job_id, error):
+    """Mark a running job as failed when its worker process died."""
+    Job.objects.filter(pk=job_id, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_FAILED, error=error, finished_at=timezone.now(),
+    )
+
+
+def fail_stale_jobs(started_before):
+    """
+    Mark jobs left running by a dead worker as failed.
+
+    Args:
+        started_before: Jobs started before this datetime are considered stale.
+
+    Returns:
+        int: Number of failed jobs.
+    """
+    return Job.objects.filter(status=Job.STATUS_RUNNING, started_at__lt=started_before).update(
+        status=Job.STATUS_FAILED, error="Обробник завершився до закінчення завдання.", finished_at=timezone.now(),
+    )
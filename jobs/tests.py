@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.registry import enqueue, task
+from jobs.runner import claim_jobs, run_job
+from profiles.datasets import generate_dataset
+from profiles.models import StudentProfile
+from users.models import User
+
+
+@task('jobs.tests.fail')
+def failing_task(job):
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    """Jobs are claimed once, executed and keep their outcome."""
+
+    def setUp(self):
+        self.artifacts = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.artifacts)
+        override = override_settings(JOBS_ARTIFACT_ROOT=self.artifacts)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_claim_takes_each_job_once(self):
+        jobs = [enqueue('jobs.tests.fail') for _ in range(3)]
+
+        first, second = claim_jobs(2), claim_jobs(2)
+
+        self.assertEqual(first, [jobs[0].pk, jobs[1].pk])
+        self.assertEqual(second, [jobs[2].pk])
+        self.assertEqual(claim_jobs(2), [])
+
+    def test_failure_is_recorded(self):
+        job = enqueue('jobs.tests.fail')
+        claim_jobs(1)
+
+        with self.assertLogs('jobs.runner', 'ERROR'):
+            self.assertEqual(run_job(job.pk), Job.STATUS_FAILED)
+        job.refresh_from_db()
+        self.assertIn("RuntimeError: boom", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_export_artifact_is_downloaded_by_staff(self):
+        generate_dataset(departments=1, teachers_per_department=1, students_per_department=5, interests=1)
+        admin = User.objects.create_superuser(email="admin@lnu.edu.ua", password="x")
+        ids = list(StudentProfile.objects.values_list('pk', flat=True))
+        job = enqueue('profiles.export_students', {'student_ids': ids, 'file_format': 'csv'}, user=admin)
+
+        call_command('run_jobs', workers=0, once=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_DONE)
+        self.assertEqual((job.progress, job.total), (5, 5))
+        self.assertEqual(job.result, {'rows': 5})
+
+        url = reverse('jobs:download', args=[job.pk])
+        student = User.objects.filter(student_profile__isnull=False).first()
+        self.client.force_login(student)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('students_export.csv', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content).decode().count('\n'), 6)
@@ -0,0 +1,34 @@
+"""Views for downloading job artifacts."""
+
+import os
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+
+from .models import Job
+from .registry import artifact_root
+
+
+@staff_member_required
+def download_artifact_view(request, job_id):
+    """
+    Send the file produced by a finished job.
+
+    Args:
+        request: HTTP request object.
+        job_id: ID of the job.
+
+    Returns:
+        FileResponse: The artifact as an attachment.
+
+    Raises:
+        Http404: If the job has no artifact or the file is gone.
+    """
+    job = get_object_or_404(Job, pk=job_id, status=Job.STATUS_DONE)
+    root = os.path.realpath(artifact_root())
+    path = os.path.realpath(os.path.join(root, job.artifact))
+    if not job.artifact or os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise Http404("Файл не знайдено.")
+    filename = os.path.basename(path).split('-', 1)[-1]
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
@@ -0,0 +1,25 @@
+"""Entry points executed in spawned job worker processes.
+
+Spawned processes unpickle these functions before Django is set up, so this
+module must not import models at import time.
+"""
+
+import django
+
+
+def init_worker():
+    """Set up Django in a freshly spawned worker process."""
+    django.setup()
+
+
+def execute(job_id):
+    """Run a claimed job in the worker process and return its final status."""
+    from django.db import close_old_connections
+
+    from .runner import run_job
+
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
@@ -0,0 +1,176 @@
+"""Routing of read-only page views to an optional read replica.
+
+When ``DATABASES`` has a ``replica`` alias, views decorated with
+``replica_reads`` run their queries against it; everything else uses the
+primary. A request that writes anything marks the browser with a short-lived
+cookie (see ``PrimaryPinMiddleware``), and reads from that browser stay on the
+primary until it expires, so users always see their own changes even if the
+replica lags behind.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+PIN_COOKIE = 'primary_pin'
+
+
+@dataclass
+class RoutingState:
+    """Per-request routing flags shared by the router, decorator and middleware."""
+
+    use_replica: bool = False
+    wrote: bool = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    """Return True if a ``replica`` database alias is configured."""
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def pin_seconds():
+    """Return how long a browser's reads stay on the primary after a write."""
+    return getattr(settings, 'READ_REPLICA_PIN_SECONDS', 10)
+
+
+class ReplicaRouter:
+    """
+    Send reads of ``replica_reads`` views to the replica and all writes to the primary.
+
+    Reads stay on the primary once the current request has written, inside
+    transactions and outside of requests (commands, job workers).
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is not None
+            and state.use_replica
+            and not state.wrote
+            and replica_configured()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives the schema through replication.
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
+
+
+@contextmanager
+def _reading_from_replica():
+    """Route reads of the current request to the replica while the block runs."""
+    state = _state.get()
+    token = None
+    if state is None:
+        state = RoutingState()
+        token = _state.set(state)
+    previous = state.use_replica
+    state.use_replica = True
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+        if token is not None:
+            _state.reset(token)
+
+
+def _pinned(request):
+    """Return True if the request must read from the primary."""
+    return request.method not in ('GET', 'HEAD') or bool(request.COOKIES.get(PIN_COOKIE))
+
+
+def replica_reads(view):
+    """
+    Run a read-only view against the replica unless the browser is pinned to the primary.
+
+    Place it below the authentication and role decorators so sessions and
+    users are always loaded from the primary. Works with sync and async views.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if _pinned(request):
+                return await view(request, *args, **kwargs)
+            with _reading_from_replica():
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if _pinned(request):
+            return view(request, *args, **kwargs)
+        with _reading_from_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin a browser's reads to the primary for a short time after it writes.
+
+    Must be placed after ``SessionMiddleware`` so session saves, which happen
+    on the way out, do not count as writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(request, response, state)
+
+    @staticmethod
+    def _pin(request, response, state):
+        """Set the pin cookie if the request wrote to the primary."""
+        if state.wrote and replica_configured():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=pin_seconds(), httponly=True, samesite='Lax',
+                secure=request.is_secure(),
+            )
+        return response
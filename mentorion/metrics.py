@@ -0,0 +1,192 @@
+"""Prometheus metrics: request latency and SQL counts per view, backlog gauges.
+
+``MetricsMiddleware`` observes every request to a named route of the
+``searching`` and ``profiles`` URL namespaces: its latency and the number
+of SQL statements it ran (counted by ``mentorion.tracing``), labelled with
+the URL name. Backlog gauges (pending requests, free slots per department,
+teachers awaiting approval) are computed when ``/metrics`` is scraped, from
+aggregate queries cached for ``METRICS_BACKLOG_SECONDS``.
+
+Under gunicorn every worker is a separate process. ``gunicorn.conf.py``
+sets ``PROMETHEUS_MULTIPROC_DIR``, where each worker writes its samples, and
+the scrape merges the files of all workers, so any worker can answer it.
+"""
+
+import hmac
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from . import tracing
+
+TRACKED_NAMESPACES = ('searching', 'profiles')
+BACKLOG_KEY = 'mentorion:metrics-backlog'
+
+REQUEST_LATENCY = Histogram(
+    'mentorion_http_request_duration_seconds',
+    'Request latency by URL name',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'mentorion_http_request_queries',
+    'SQL statements per request by URL name',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+
+def _view_name(request):
+    """Return ``namespace:name`` of a tracked route, or None."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name or match.namespace not in TRACKED_NAMESPACES:
+        return None
+    return match.view_name
+
+
+class MetricsMiddleware:
+    """
+    Observe latency and SQL count of requests to tracked views.
+
+    Place it right after ``TracingMiddleware``, whose trace counts the SQL
+    statements.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, start)
+        return response
+
+    @staticmethod
+    def _observe(request, response, start):
+        view = _view_name(request)
+        if view is None:
+            return
+        REQUEST_LATENCY.labels(view, request.method, str(response.status_code)).observe(time.perf_counter() - start)
+        trace = tracing.current_trace()
+        if trace is not None:
+            REQUEST_QUERIES.labels(view).observe(trace.totals[tracing.SQL][1])
+
+
+def backlog():
+    """
+    Return the cached registration backlog.
+
+    Returns:
+        dict: ``pending_requests``, ``unapproved_teachers`` and
+        ``free_slots`` as a mapping of department name to count.
+    """
+    from profiles.models import Department, TeacherProfile
+    from searching.models import SlotRequest
+
+    def load():
+        free_slots = Department.objects.annotate(
+            free=Count(
+                'teachers__slots',
+                filter=Q(
+                    teachers__is_approved=True,
+                    teachers__slots__is_available=True,
+                    teachers__slots__is_filled=False,
+                ),
+            ),
+        ).values_list('name', 'free')
+        return {
+            'pending_requests': SlotRequest.objects.filter(status='pending').count(),
+            'unapproved_teachers': TeacherProfile.objects.filter(is_approved=False).count(),
+            'free_slots': dict(free_slots),
+        }
+
+    return cache.get_or_set(BACKLOG_KEY, load, getattr(settings, 'METRICS_BACKLOG_SECONDS', 30))
+
+
+class BacklogCollector:
+    """Expose ``backlog()`` as gauges at scrape time."""
+
+    def describe(self):
+        # Without it registering would call ``collect``, i.e. query the database.
+        return []
+
+    def collect(self):
+        values = backlog()
+        yield GaugeMetricFamily(
+            'mentorion_pending_slot_requests', 'Slot requests waiting for a teacher', value=values['pending_requests'],
+        )
+        yield GaugeMetricFamily(
+            'mentorion_unapproved_teachers', 'Teachers waiting for approval', value=values['unapproved_teachers'],
+        )
+        free_slots = GaugeMetricFamily(
+            'mentorion_free_slots', 'Free slots of approved teachers by department', labels=['department'],
+        )
+        for department, count in sorted(values['free_slots'].items()):
+            free_slots.add_metric([department], count)
+        yield free_slots
+
+
+_backlog_registry = None
+
+
+def backlog_registry():
+    """Return the registry of the backlog gauges, created on the first scrape."""
+    global _backlog_registry
+    if _backlog_registry is None:
+        registry = CollectorRegistry()
+        registry.register(BacklogCollector())
+        _backlog_registry = registry
+    return _backlog_registry
+
+
+def render():
+    """Return the exposition text of all workers and the backlog gauges."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(backlog_registry())
+
+
+def metrics_view(request):
+    """
+    Serve metrics in the Prometheus text format.
+
+    Scrapers authenticate with ``Authorization: Bearer <METRICS_TOKEN>``.
+    Without a configured token the endpoint does not exist.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        HttpResponse: Metrics, 403 for a wrong token.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        raise Http404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,283 @@
+"""On-demand profiling of single requests for staff users.
+
+A staff user adds ``?_profile=cpu`` to a URL or sends an ``X-Profile: cpu``
+header, and ``ProfilingMiddleware`` runs that request under ``cProfile``.
+With ``mem`` instead of ``cpu`` it also traces allocations with
+``tracemalloc``. Each profiled request leaves a ``.prof`` file (open it with
+``python -m pstats`` or snakeviz) and, with ``mem``, an allocation summary
+in ``PROFILING_ROOT``. Only the newest ``PROFILING_MAX_DUMPS`` requests are
+kept. The response names its dump in the ``X-Profile-Dump`` header. Staff
+list and download dumps at ``/admin/profiling/``.
+
+Requests without the flag only pay for two lookups in ``request.META``;
+the user is not even loaded. One request per process is profiled at a
+time, because ``tracemalloc`` is global; a flagged request arriving during
+another one runs unprofiled.
+
+Under ASGI a second profiler runs in the request's worker thread, where
+sync views and middleware run, and both are merged into one dump. The
+event loop profiler also sees other requests served concurrently by the
+same process.
+"""
+
+import cProfile
+import logging
+import pstats
+import re
+import secrets
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAMETER = '_profile'
+MODE_CPU = 'cpu'
+MODE_MEMORY = 'mem'
+
+PROFILE_SUFFIX = '.prof'
+ALLOCATIONS_SUFFIX = '.alloc.txt'
+TOP_ALLOCATIONS = 30
+
+_DUMP_NAME_RE = re.compile(r'^[\w.-]+\.(?:prof|alloc\.txt)$')
+
+_lock = threading.Lock()
+
+
+def dump_root():
+    """Return the directory where profiles are stored."""
+    return Path(getattr(settings, 'PROFILING_ROOT', settings.BASE_DIR / 'var' / 'profiling'))
+
+
+def _requested_mode(request):
+    """
+    Return the mode a request asks for, or None.
+
+    Reads only ``request.META`` so unflagged requests stay free.
+    """
+    mode = request.META.get(HEADER)
+    if mode is None:
+        if f'{QUERY_PARAMETER}=' not in request.META.get('QUERY_STRING', ''):
+            return None
+        mode = request.GET.get(QUERY_PARAMETER)
+    if not mode:
+        return None
+    return MODE_MEMORY if mode == MODE_MEMORY else MODE_CPU
+
+
+def _is_staff(request):
+    return request.user.is_staff
+
+
+class _Session:
+    """Profilers of one request."""
+
+    def __init__(self, mode):
+        self.memory = mode == MODE_MEMORY
+        self.profilers = [cProfile.Profile()]
+        self.started_tracing = False
+        self.snapshot = None
+
+    def start(self):
+        if self.memory:
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self.snapshot = tracemalloc.take_snapshot()
+        self.profilers[0].enable()
+
+    def start_in_thread(self):
+        """Profile the calling thread as well."""
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        profiler.enable()
+
+    def stop_in_thread(self):
+        self.profilers[-1].disable()
+
+    def stop(self):
+        self.profilers[0].disable()
+        if not self.memory:
+            return None
+        allocations = tracemalloc.take_snapshot().compare_to(self.snapshot, 'lineno')
+        peak = tracemalloc.get_traced_memory()[1]
+        if self.started_tracing:
+            tracemalloc.stop()
+        return allocations, peak
+
+    def save(self, request, response, memory):
+        """Write the dumps and return their common name."""
+        root = dump_root()
+        root.mkdir(parents=True, exist_ok=True)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name.replace(':', '.') if match and match.view_name else 'unresolved'
+        name = f"{timezone.now():%Y%m%dT%H%M%S%f}-{view}-{secrets.token_hex(3)}"
+
+        for profiler in self.profilers:
+            profiler.create_stats()
+        # pstats refuses profilers that recorded nothing.
+        stats = pstats.Stats(*(profiler for profiler in self.profilers if profiler.stats))
+        stats.dump_stats(root / f'{name}{PROFILE_SUFFIX}')
+        if memory is not None:
+            allocations, peak = memory
+            lines = [
+                f'{request.method} {request.get_full_path()} -> {response.status_code}',
+                f'Peak traced memory: {peak / 1024:.1f} KiB',
+                f'Allocations still held after the request, top {TOP_ALLOCATIONS} by size:',
+                *(f'  {stat}' for stat in allocations[:TOP_ALLOCATIONS]),
+            ]
+            (root / f'{name}{ALLOCATIONS_SUFFIX}').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        prune_dumps()
+        return name
+
+
+def prune_dumps(keep=None):
+    """
+    Delete all but the newest ``keep`` profiled requests.
+
+    Args:
+        keep: Requests to keep, ``PROFILING_MAX_DUMPS`` by default.
+    """
+    keep = getattr(settings, 'PROFILING_MAX_DUMPS', 50) if keep is None else keep
+    root = dump_root()
+    # Names start with a timestamp, so they sort by age.
+    names = sorted(path.name[:-len(PROFILE_SUFFIX)] for path in root.glob(f'*{PROFILE_SUFFIX}'))
+    for name in names[:max(len(names) - keep, 0)]:
+        for suffix in (PROFILE_SUFFIX, ALLOCATIONS_SUFFIX):
+            # Another worker may be pruning the same files.
+            (root / f'{name}{suffix}').unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests flagged by staff users.
+
+    Place it right after ``AuthenticationMiddleware``, which provides the
+    user checked for ``is_staff``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = _requested_mode(request)
+        if mode is None or not _is_staff(request) or not _lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            session = _Session(mode)
+            session.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                memory = session.stop()
+            return self._finish(session, request, response, memory)
+        finally:
+            _lock.release()
+
+    async def __acall__(self, request):
+        mode = _requested_mode(request)
+        if mode is None or not await sync_to_async(_is_staff)(request) or not _lock.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            session = _Session(mode)
+            session.start()
+            # Runs in the request's worker thread, like the sync parts of the request.
+            await sync_to_async(session.start_in_thread)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(session.stop_in_thread)()
+                memory = session.stop()
+            return self._finish(session, request, response, memory)
+        finally:
+            _lock.release()
+
+    @staticmethod
+    def _finish(session, request, response, memory):
+        try:
+            response.headers['X-Profile-Dump'] = session.save(request, response, memory)
+        except OSError:
+            logger.exception("Could not write profile of %s", request.path)
+        return response
+
+
+def _dumps():
+    """Return the stored dumps, newest first."""
+    root = dump_root()
+    if not root.is_dir():
+        return []
+    dumps = []
+    for path in root.glob(f'*{PROFILE_SUFFIX}'):
+        name = path.name[:-len(PROFILE_SUFFIX)]
+        allocations = root / f'{name}{ALLOCATIONS_SUFFIX}'
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        dumps.append({
+            'name': name,
+            'created': datetime.fromtimestamp(stat.st_mtime, tz=timezone.get_current_timezone()),
+            'size': stat.st_size,
+            'profile': path.name,
+            'allocations': allocations.name if allocations.exists() else None,
+        })
+    return sorted(dumps, key=lambda dump: dump['name'], reverse=True)
+
+
+@staff_member_required
+def dumps_view(request):
+    """
+    List stored request profiles in the admin.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        TemplateResponse: Admin page with download links.
+    """
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Профілі запитів',
+        'dumps': _dumps(),
+        'max_dumps': getattr(settings, 'PROFILING_MAX_DUMPS', 50),
+    }
+    return TemplateResponse(request, 'admin/profiling_dumps.html', context)
+
+
+@staff_member_required
+def download_dump_view(request, filename):
+    """
+    Send a stored profile or allocation summary.
+
+    Args:
+        request: HTTP request object.
+        filename: Name of the file in ``PROFILING_ROOT``.
+
+    Returns:
+        FileResponse: The file as an attachment.
+
+    Raises:
+        Http404: If the name is not a dump or the file is gone.
+    """
+    path = dump_root() / filename
+    if not _DUMP_NAME_RE.match(filename) or not path.is_file():
+        raise Http404("Файл не знайдено.")
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
@@ -0,0 +1,116 @@
+"""Runtime detector of repeated queries (N+1) within one request.
+
+Opt-in with ``QUERYCHECK_MODE``: ``log`` writes a warning and ``raise``
+fails the request with ``RepeatedQueryError`` when one SQL shape runs more
+than ``QUERYCHECK_REPEAT_LIMIT`` times in a request. A shape is the
+statement with literals and ``IN`` lists collapsed, so the queries of a
+loop like ``{% for t in teachers %}{{ t.department.name }}`` share one.
+With the default ``off`` the middleware only reads the setting.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .tracing import call_site
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACE_RE = re.compile(r'\s+')
+
+_shapes = ContextVar('querycheck_shapes', default=None)
+
+
+class RepeatedQueryError(Exception):
+    """Raised in ``raise`` mode when a request repeats a query shape too often."""
+
+
+def _mode():
+    return getattr(settings, 'QUERYCHECK_MODE', 'off')
+
+
+def query_shape(sql):
+    """
+    Return ``sql`` with literals and ``IN`` lists collapsed.
+
+    Args:
+        sql: Statement as passed to the cursor, with ``%s`` placeholders.
+
+    Returns:
+        str: Normalized statement.
+    """
+    sql = _IN_LIST_RE.sub('(%s)', sql)
+    sql = _LITERAL_RE.sub('?', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _check(execute, sql, params, many, context):
+    """``execute_wrapper`` counting query shapes of a checked request."""
+    shapes = _shapes.get()
+    if shapes is not None:
+        shape = query_shape(sql)
+        shapes[shape] += 1
+        limit = getattr(settings, 'QUERYCHECK_REPEAT_LIMIT', 10)
+        # Report each shape once, when it crosses the limit.
+        if shapes[shape] == limit + 1:
+            message = f'Query repeated more than {limit} times in one request at {call_site()}: {shape}'
+            if _mode() == 'raise':
+                raise RepeatedQueryError(message)
+            logger.warning(message)
+    return execute(sql, params, many, context)
+
+
+def install_query_check(connection, **kwargs):
+    """Add the shape counter to a connection once."""
+    if _check not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_check)
+
+
+connection_created.connect(install_query_check, dispatch_uid='mentorion.querycheck')
+
+
+class QueryCheckMiddleware:
+    """Count query shapes of each request when ``QUERYCHECK_MODE`` is not ``off``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if _mode() == 'off':
+            return self.get_response(request)
+        token = self._start()
+        try:
+            return self.get_response(request)
+        finally:
+            _shapes.reset(token)
+
+    async def __acall__(self, request):
+        if _mode() == 'off':
+            return await self.get_response(request)
+        token = self._start()
+        try:
+            return await self.get_response(request)
+        finally:
+            _shapes.reset(token)
+
+    @staticmethod
+    def _start():
+        # Connections opened before this module was imported have no wrapper yet.
+        for connection in connections.all(initialized_only=True):
+            install_query_check(connection)
+        return _shapes.set(Counter())
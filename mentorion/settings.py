@@ -33,6 +33,10 @@ INSTALLED_APPS = [
     "users",
     "profiles",
     "searching",
+    "jobs",
+    "api",
+    "rest_framework",
+    "rest_framework.authtoken",
     "allauth",
     "allauth.account",
     "allauth.socialaccount",
@@ -40,12 +44,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "mentorion.tracing.TracingMiddleware",
+    "mentorion.metrics.MetricsMiddleware",
+    "mentorion.querycheck.QueryCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "mentorion.db_routing.PrimaryPinMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "mentorion.profiling.ProfilingMiddleware",
+    "users.middleware.ProfileMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
@@ -55,7 +65,7 @@ ROOT_URLCONF = "mentorion.urls"
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'mentorion.tracing.TracedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -83,6 +93,82 @@ DATABASES = {
     )
 }
 
+# Optional read replica for read-only pages (see mentorion/db_routing.py).
+# Tests treat it as a mirror of the primary.
+if env("REPLICA_DATABASE_URL", default=None):
+    DATABASES["replica"] = env.db("REPLICA_DATABASE_URL")
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["mentorion.db_routing.ReplicaRouter"]
+
+# Seconds a browser keeps reading from the primary after it wrote something.
+READ_REPLICA_PIN_SECONDS = env.int("READ_REPLICA_PIN_SECONDS", default=10)
+
+# Cache for roles, catalog cards and reference data. The default in-process
+# cache is per worker; cached cards and facet counts are keyed by versions
+# stored in the database (searching/versions.py), so bumps from the job
+# worker reach every process. A shared backend (e.g. redis:// or
+# pymemcache://) in CACHE_URL lets workers share the cached values too.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://mentorion")}
+CACHES["default"].setdefault("TIMEOUT", 300)
+if CACHES["default"]["BACKEND"].endswith(("LocMemCache", "FileBasedCache", "DatabaseCache")):
+    # Evict a third of the entries when full instead of growing without bound.
+    CACHES["default"].setdefault("OPTIONS", {}).update({"MAX_ENTRIES": 20000, "CULL_FREQUENCY": 3})
+
+# Text search configuration for teacher search on PostgreSQL. Use "ukrainian"
+# when such a configuration (e.g. hunspell dictionaries) is installed.
+SEARCH_CONFIG = env("SEARCH_CONFIG", default="simple")
+
+# Collation used to sort teachers by surname on PostgreSQL (ICU, Ukrainian).
+CATALOG_COLLATION = env("CATALOG_COLLATION", default="uk-x-icu")
+
+# Read-only JSON API (/api/v1/). Machine clients authenticate with a token
+# created in the admin; browsers reuse the session.
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.TokenAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_RENDERER_CLASSES": ["api.renderers.FastJSONRenderer"],
+}
+
+# Files produced by background jobs (exports), served to staff from disk.
+JOBS_ARTIFACT_ROOT = env("JOBS_ARTIFACT_ROOT", default=str(BASE_DIR / "var" / "jobs"))
+
+# Request tracing (mentorion/tracing.py): every response gets a
+# Server-Timing header (per category for staff); a sampled share of requests
+# is written with SQL text and call sites as OTLP/JSON lines to a rotating file,
+# one per process: TRACING_FILE with the process id before the suffix.
+TRACING_SAMPLE_RATE = env.float("TRACING_SAMPLE_RATE", default=0.01)
+TRACING_FILE = env("TRACING_FILE", default=str(BASE_DIR / "var" / "traces" / "traces.jsonl"))
+TRACING_FILE_MAX_BYTES = 10 * 1024 * 1024
+TRACING_FILE_BACKUPS = 5
+# Proxies whose "traceparent" sampling flag is followed for every user.
+TRACING_TRUSTED_PROXIES = env.list("TRACING_TRUSTED_PROXIES", default=[])
+MESSAGE_STORAGE = "mentorion.tracing.TracedMessageStorage"
+
+# Prometheus metrics at /metrics (mentorion/metrics.py), scraped with
+# "Authorization: Bearer <METRICS_TOKEN>"; the endpoint is off without a token.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+METRICS_BACKLOG_SECONDS = 30
+
+# N+1 detector (mentorion/querycheck.py): "log" warns and "raise" fails a
+# request that runs one SQL shape more than QUERYCHECK_REPEAT_LIMIT times.
+QUERYCHECK_MODE = env("QUERYCHECK_MODE", default="off")
+QUERYCHECK_REPEAT_LIMIT = env.int("QUERYCHECK_REPEAT_LIMIT", default=10)
+
+# Staff profiling (mentorion/profiling.py): "?_profile=cpu" or "X-Profile: mem"
+# profiles one request; dumps of the newest requests are listed at /admin/profiling/.
+PROFILING_ROOT = env("PROFILING_ROOT", default=str(BASE_DIR / "var" / "profiling"))
+PROFILING_MAX_DUMPS = 50
+
+# Live events (searching/events.py): "auto" fans out through PostgreSQL
+# LISTEN/NOTIFY on PostgreSQL and within the process otherwise.
+EVENTS_BACKEND = env("EVENTS_BACKEND", default="auto")
+EVENTS_HEARTBEAT_SECONDS = 20
+EVENTS_STREAM_SECONDS = 300
+
 CSRF_TRUSTED_ORIGINS = [
     'https://' + h.strip() for h in env("ALLOWED_HOSTS", default="").split(",") if h.strip() and h.strip() != '*'
 ]
@@ -174,6 +260,9 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # Вмикаємо WhiteNoise для стиснення і кешування файлів
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Tests use plain static file storage (see mentorion/test_runner.py).
+TEST_RUNNER = "mentorion.test_runner.TestRunner"
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -0,0 +1,28 @@
+"""Test runner of the project."""
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Run tests with plain static file storage and without trace export.
+
+    The manifest storage of production only knows files after
+    ``collectstatic``, so rendering any page in a test would fail without it.
+    Sampled traces would be appended to ``var/traces`` of the working tree;
+    tests of tracing set their own ``TRACING_FILE``.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            TRACING_SAMPLE_RATE=0,
+            TRACING_FILE='',
+        )
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,426 @@
+"""Per-request tracing with a ``Server-Timing`` header and sampled trace export.
+
+``TracingMiddleware`` starts a trace for every request. While it runs, SQL
+statements, template renders, role checks, message storage and allauth
+adapter calls are timed as spans (see ``span`` and ``traced``). Every
+response gets a ``Server-Timing`` header with the time and number of spans
+per category, which browsers show in their network panel.
+
+Only a sampled share of requests (``TRACING_SAMPLE_RATE``) keeps the spans
+themselves, with SQL text and call sites, and writes them to a rotating
+file per process (``TRACING_FILE`` with the process id before the suffix)
+as OpenTelemetry (OTLP/JSON) lines that any OTLP-capable tool can import. Unsampled requests only add up durations, so tracing can stay on in
+production. The sampling flag of an incoming ``traceparent`` header is
+followed for ``TRACING_TRUSTED_PROXIES`` and staff users only, and only
+staff get the per-category ``Server-Timing`` entries; everyone else sees the
+total, so clients can neither fill the disk nor read the timings.
+
+The trace lives in a context variable, so spans recorded in the worker
+threads of ``sync_to_async`` and in ``asyncio.gather`` tasks land in the
+trace of their request.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+SQL = 'sql'
+TEMPLATE = 'tpl'
+AUTH = 'auth'
+MESSAGES = 'msg'
+ADAPTER = 'adapter'
+
+# OTLP span kinds.
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+_TRACEPARENT_RE = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-([0-9a-f]{2})$')
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Trace:
+    """Spans and per-category totals of one request."""
+
+    def __init__(self, sampled, trace_id=None, staff_only=False):
+        self.sampled = sampled
+        # Sampled on request of an untrusted client: exported for staff users only.
+        self.staff_only = staff_only
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter_ns()
+        # category -> [duration_ns, count]
+        self.totals = defaultdict(lambda: [0, 0])
+        self.spans = []
+
+    def add(self, category, name, start, end, kind=KIND_INTERNAL, attributes=None, parent=None, span_id=None):
+        """
+        Record a finished span.
+
+        ``start`` and ``end`` are ``perf_counter_ns`` values. Unsampled traces
+        only update the totals.
+        """
+        total = self.totals[category]
+        total[0] += end - start
+        total[1] += 1
+        if self.sampled:
+            self.spans.append({
+                'traceId': self.trace_id,
+                'spanId': span_id or secrets.token_hex(8),
+                'parentSpanId': parent or self.span_id,
+                'name': name,
+                'kind': kind,
+                'startTimeUnixNano': str(self.start_ns + start - self.start),
+                'endTimeUnixNano': str(self.start_ns + end - self.start),
+                'attributes': _attributes({'mentorion.category': category, **(attributes or {})}),
+            })
+
+    def server_timing(self, total_ns, detailed=True):
+        """Return the ``Server-Timing`` header value, with categories if ``detailed``."""
+        parts = [
+            f'{category};dur={duration / 1e6:.1f};desc="{count}"'
+            for category, (duration, count) in sorted(self.totals.items())
+        ] if detailed else []
+        parts.append(f'total;dur={total_ns / 1e6:.1f}')
+        return ', '.join(parts)
+
+
+_trace = ContextVar('tracing_trace', default=None)
+_parent = ContextVar('tracing_parent', default=None)
+
+
+def current_trace():
+    """Return the trace of the current request, or None outside of requests."""
+    return _trace.get()
+
+
+def _is_staff(request):
+    """
+    Return True if the request's user is staff.
+
+    Only a user the request already loaded counts, so the check never
+    queries and is safe in async code.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return False
+    return user.is_staff
+
+
+def _attributes(values):
+    """Encode a dict as OTLP ``KeyValue`` attributes."""
+    encoded = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            encoded.append({'key': key, 'value': {'boolValue': value}})
+        elif isinstance(value, int):
+            encoded.append({'key': key, 'value': {'intValue': str(value)}})
+        else:
+            encoded.append({'key': key, 'value': {'stringValue': str(value)}})
+    return encoded
+
+
+@contextmanager
+def span(category, name, **attributes):
+    """
+    Time a block as a span of the current request.
+
+    Does nothing outside of traced requests.
+
+    Args:
+        category: ``Server-Timing`` metric name, e.g. ``auth``.
+        name: Span name.
+        **attributes: Extra attributes kept on sampled spans.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    span_id = secrets.token_hex(8) if trace.sampled else None
+    parent = _parent.get()
+    token = _parent.set(span_id) if span_id else None
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        if token is not None:
+            _parent.reset(token)
+        trace.add(category, name, start, end, attributes=attributes, parent=parent, span_id=span_id)
+
+
+def traced(category, name=None):
+    """
+    Decorate a sync or async function to run inside a span.
+
+    Args:
+        category: ``Server-Timing`` metric name.
+        name: Span name, the function's qualified name by default.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(category, span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(category, span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def call_site():
+    """Return ``path:line`` of the innermost project frame outside this module."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and filename != _THIS_FILE and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return ''
+
+
+def _trace_sql(execute, sql, params, many, context):
+    """``execute_wrapper`` timing every statement of a traced request."""
+    trace = _trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        end = time.perf_counter_ns()
+        attributes = None
+        if trace.sampled:
+            connection = context['connection']
+            attributes = {
+                'db.system': connection.vendor,
+                'db.name': connection.alias,
+                'db.statement': sql,
+                'code.location': call_site(),
+            }
+        trace.add(
+            SQL, sql.split(None, 1)[0].upper() if sql else 'SQL', start, end,
+            kind=KIND_CLIENT, attributes=attributes, parent=_parent.get(),
+        )
+
+
+def install_sql_tracing(connection, **kwargs):
+    """Add the SQL span wrapper to a connection once."""
+    if _trace_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_trace_sql)
+
+
+# Covers connections opened in any thread, including the ones of async views.
+connection_created.connect(install_sql_tracing, dispatch_uid='mentorion.tracing')
+
+
+class _TracedTemplate:
+    """Django template whose renders are spans."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with span(TEMPLATE, self.template.origin.template_name or 'template'):
+            return self.template.render(context, request)
+
+
+class TracedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` backend that times every template render."""
+
+    def from_string(self, template_code):
+        return _TracedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TracedTemplate(super().get_template(template_name))
+
+
+class TracedMessageStorage(FallbackStorage):
+    """Message storage that times loading and saving messages."""
+
+    def _get(self, *args, **kwargs):
+        with span(MESSAGES, 'messages.load'):
+            return super()._get(*args, **kwargs)
+
+    def update(self, response):
+        with span(MESSAGES, 'messages.store'):
+            return super().update(response)
+
+
+def process_file(path):
+    """
+    Return the trace file of the current process for ``TRACING_FILE``.
+
+    ``RotatingFileHandler`` is not safe across processes: gunicorn workers
+    rotating one shared file would lose or overwrite each other's traces.
+
+    Args:
+        path: Configured ``TRACING_FILE``.
+
+    Returns:
+        Path: ``path`` with the process id before the suffix.
+    """
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}')
+
+
+class FileExporter:
+    """Append traces as OTLP/JSON lines to a size-rotated file of this process."""
+
+    def __init__(self, path, max_bytes, backups):
+        self.path = path
+        self.pid = os.getpid()
+        self.file = process_file(path)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            self.file, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True,
+        )
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+
+    def export(self, trace, root):
+        line = json.dumps({
+            'resourceSpans': [{
+                'resource': {'attributes': _attributes({'service.name': 'mentorion'})},
+                'scopeSpans': [{'scope': {'name': __name__}, 'spans': [root, *trace.spans]}],
+            }],
+        }, ensure_ascii=False)
+        self._handler.emit(logging.makeLogRecord({'msg': line, 'args': None}))
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def exporter():
+    """Return the process-wide file exporter for ``TRACING_FILE``."""
+    global _exporter
+    with _exporter_lock:
+        path = _setting('TRACING_FILE', None)
+        # A forked worker writes to a file of its own.
+        if _exporter is None or _exporter.path != path or _exporter.pid != os.getpid():
+            _exporter = FileExporter(
+                path, _setting('TRACING_FILE_MAX_BYTES', 10 * 1024 * 1024), _setting('TRACING_FILE_BACKUPS', 5),
+            )
+        return _exporter
+
+
+class TracingMiddleware:
+    """
+    Trace every request and answer with a ``Server-Timing`` header.
+
+    Place it first in ``MIDDLEWARE`` so the trace covers the other
+    middleware. An incoming W3C ``traceparent`` header keeps its trace id.
+    Its sampling decision is followed from ``TRACING_TRUSTED_PROXIES``; a
+    sampled header from anyone else yields a trace for staff users only.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trace, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _trace.reset(token)
+        return self._finish(request, response, trace)
+
+    async def __acall__(self, request):
+        trace, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _trace.reset(token)
+        return self._finish(request, response, trace)
+
+    @staticmethod
+    def _start(request):
+        trace_id = None
+        staff_only = False
+        sampled = random.random() < _setting('TRACING_SAMPLE_RATE', 0.0)
+        match = _TRACEPARENT_RE.match(request.headers.get('traceparent', ''))
+        if match:
+            trace_id, flags = match.groups()
+            requested = bool(int(flags, 16) & 1)
+            if request.META.get('REMOTE_ADDR') in _setting('TRACING_TRUSTED_PROXIES', ()):
+                sampled = requested
+            elif requested and not sampled:
+                # The user is not known yet; _finish drops the trace unless it is staff.
+                sampled = staff_only = True
+        trace = Trace(sampled and bool(_setting('TRACING_FILE', None)), trace_id, staff_only)
+        # Connections opened before this module was imported have no wrapper yet.
+        for connection in connections.all(initialized_only=True):
+            install_sql_tracing(connection)
+        return trace, _trace.set(trace)
+
+    @staticmethod
+    def _finish(request, response, trace):
+        end = time.perf_counter_ns()
+        staff = _is_staff(request)
+        response.headers['Server-Timing'] = trace.server_timing(end - trace.start, detailed=staff)
+        if trace.sampled and (staff or not trace.staff_only):
+            match = getattr(request, 'resolver_match', None)
+            root = {
+                'traceId': trace.trace_id,
+                'spanId': trace.span_id,
+                'name': f'{request.method} {match.route if match else request.path}',
+                'kind': KIND_SERVER,
+                'startTimeUnixNano': str(trace.start_ns),
+                'endTimeUnixNano': str(trace.start_ns + end - trace.start),
+                'attributes': _attributes({
+                    'http.request.method': request.method,
+                    'url.path': request.path,
+                    'http.route': match.route if match else '',
+                    'http.response.status_code': response.status_code,
+                }),
+            }
+            try:
+                exporter().export(trace, root)
+            except OSError:
+                logger.exception("Could not write trace %s", trace.trace_id)
+        return response
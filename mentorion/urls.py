@@ -4,7 +4,9 @@ from django.contrib import admin
 from django.shortcuts import redirect
 from django.urls import include, path
 
-from profiles.models import StudentProfile, TeacherProfile
+from mentorion import profiling
+from mentorion.metrics import metrics_view
+from users.roles import ROLE_STUDENT, ROLE_TEACHER, resolve_profile
 
 
 def home(request):
@@ -26,19 +28,26 @@ def home(request):
     if not request.user.is_authenticated:
         return redirect('account_login')
 
-    if StudentProfile.objects.filter(user=request.user).exists():
+    role = resolve_profile(request.user).role
+    if role == ROLE_STUDENT:
         return redirect('profiles:student_profile')
 
-    if TeacherProfile.objects.filter(user=request.user).exists():
+    if role == ROLE_TEACHER:
         return redirect('profiles:teacher_profile')
 
     return redirect('profiles:onboarding')
 
 
 urlpatterns = [
+    # Before the admin, whose catch-all would answer these URLs.
+    path("admin/profiling/", profiling.dumps_view, name="profiling_dumps"),
+    path("admin/profiling/<str:filename>", profiling.download_dump_view, name="profiling_download"),
     path("admin/", admin.site.urls),
     path("accounts/", include("allauth.urls")),
     path("profiles/", include("profiles.urls")),
     path("searching/", include("searching.urls")),
+    path("jobs/", include("jobs.urls")),
+    path("api/v1/", include("api.urls")),
+    path("metrics", metrics_view, name="metrics"),
     path("", home, name="home"),
 ]
@@ -1,20 +1,57 @@
 """Django admin configuration for profile models."""
 
 from django.contrib import admin
-from django.utils import timezone
+from django.contrib.admin import helpers
+from django.template.response import TemplateResponse
 
+from jobs.admin import EnqueueJobMixin
+
+from . import approval
+from .exports import students_csv_response
+from .forms import DepartmentMaxSlotsForm
 from .models import Department, ScientificInterest, StudentProfile, TeacherProfile
-from django.http import HttpResponse
-from io import BytesIO
-import csv
 
 
 @admin.register(Department)
-class DepartmentAdmin(admin.ModelAdmin):
+class DepartmentAdmin(EnqueueJobMixin, admin.ModelAdmin):
     """Admin interface for Department model."""
 
     list_display = ('name',)
     search_fields = ('name',)
+    actions = ['set_max_slots']
+
+    def set_max_slots(self, request, queryset):
+        """
+        Admin action to set max_slots for all teachers of the selected departments.
+
+        Shows an intermediate form; on submit queues a job that updates the
+        teachers with one statement and reconciles their slots in bulk.
+
+        Args:
+            request: HTTP request object.
+            queryset: QuerySet of selected Department instances.
+
+        Returns:
+            TemplateResponse or None: The form page, or None to return to the list.
+        """
+        form = DepartmentMaxSlotsForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            self.enqueue_job(request, 'profiles.set_department_max_slots', {
+                'department_ids': list(queryset.values_list('pk', flat=True)),
+                'max_slots': form.cleaned_data['max_slots'],
+            })
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Встановити кількість слотів для кафедр',
+            'opts': self.model._meta,
+            'departments': queryset,
+            'form': form,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/profiles/department/set_max_slots.html', context)
+    set_max_slots.short_description = 'Встановити кількість слотів для викладачів кафедри'
 
 
 @admin.register(ScientificInterest)
@@ -26,7 +63,7 @@ class ScientificInterestAdmin(admin.ModelAdmin):
 
 
 @admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
+class StudentProfileAdmin(EnqueueJobMixin, admin.ModelAdmin):
     """Admin interface for StudentProfile model."""
 
     list_display = ('user', 'group', 'year_of_study', 'department', 'course_topic')
@@ -34,72 +71,29 @@ class StudentProfileAdmin(admin.ModelAdmin):
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'group', 'course_topic')
     readonly_fields = ('user',)
 
-    actions = ['export_students_excel']
+    actions = ['export_students_excel', 'export_students_csv']
 
     def export_students_excel(self, request, queryset):
         """
-        Export selected student profiles to an Excel file (XLSX). Falls back to CSV if openpyxl
-        is not installed.
+        Queue an export of selected student profiles to an Excel file (XLSX). Falls back to CSV
+        if openpyxl is not installed. The file is downloaded from the job page.
         """
-        # Try XLSX via openpyxl
-        try:
-            from openpyxl import Workbook
-        except Exception:
-            # Fallback to CSV
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = 'attachment; filename=students_export.csv'
-            writer = csv.writer(response)
-            writer.writerow(['Студент', 'Група', 'Кафедра', 'Викладач, якщо вже узгоджено', 'Тема курсової'])
-            for sp in queryset:
-                student = f"{sp.user.last_name} {sp.user.first_name} ({sp.user.email})"
-                group = sp.group
-                dept = sp.department.name if sp.department else ''
-                teacher = ''
-                topic = ''
-                if hasattr(sp, 'assigned_slot') and sp.assigned_slot:
-                    slot = sp.assigned_slot
-                    teacher_profile = slot.teacher
-                    teacher = f"{teacher_profile.user.last_name} {teacher_profile.user.first_name} ({teacher_profile.user.email})"
-                    topic = slot.topic if getattr(slot, 'topic', None) else (sp.course_topic or '')
-                else:
-                    topic = sp.course_topic or ''
-                writer.writerow([student, group, dept, teacher, topic])
-            return response
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Students'
-        headers = ['Студент', 'Група', 'Кафедра', 'Викладач, якщо вже узгоджено', 'Тема курсової / побажання']
-        ws.append(headers)
-
-        for sp in queryset:
-            student = f"{sp.user.last_name} {sp.user.first_name} ({sp.user.email})"
-            group = sp.group
-            dept = sp.department.name if sp.department else ''
-            teacher = ''
-            topic = ''
-            if hasattr(sp, 'assigned_slot') and sp.assigned_slot:
-                slot = sp.assigned_slot
-                teacher_profile = slot.teacher
-                teacher = f"{teacher_profile.user.last_name} {teacher_profile.user.first_name} ({teacher_profile.user.email})"
-                topic = slot.topic if getattr(slot, 'topic', None) else (sp.course_topic or '')
-            else:
-                topic = sp.course_topic or ''
-            ws.append([student, group, dept, teacher, topic])
-
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        response = HttpResponse(output.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename=students_export.xlsx'
-        return response
+        self.enqueue_job(request, 'profiles.export_students', {
+            'student_ids': list(queryset.values_list('pk', flat=True)),
+            'file_format': 'xlsx',
+        })
 
     export_students_excel.short_description = 'Експорт вибраних студентів в Excel'
 
+    def export_students_csv(self, request, queryset):
+        """Stream selected student profiles as a CSV file."""
+        return students_csv_response(queryset)
+
+    export_students_csv.short_description = 'Експорт вибраних студентів в CSV'
+
 
 @admin.register(TeacherProfile)
-class TeacherProfileAdmin(admin.ModelAdmin):
+class TeacherProfileAdmin(EnqueueJobMixin, admin.ModelAdmin):
     """Admin interface for TeacherProfile model with approval functionality."""
 
     list_display = ('user', 'department', 'is_approved', 'max_slots', 'total_slots_display', 'available_slots_display')
@@ -123,17 +117,12 @@ class TeacherProfileAdmin(admin.ModelAdmin):
         """
         Admin action to approve selected teachers.
 
+        Approves all of them with one UPDATE and provisions missing slots in bulk.
+
         Args:
             request: HTTP request object.
             queryset: QuerySet of selected TeacherProfile instances.
         """
-        updated = 0
-        for teacher in queryset.filter(is_approved=False):
-            teacher.is_approved = True
-            teacher.approved_by = request.user
-            teacher.approved_at = timezone.now()
-            teacher.save()
-            updated += 1
-
-        self.message_user(request, f'Підтверджено {updated} викладачів.')
+        summary = approval.approve_teachers(queryset.values_list('pk', flat=True), approved_by=request.user)
+        self.message_user(request, summary.message())
     approve_teachers.short_description = 'Підтвердити обраних викладачів'
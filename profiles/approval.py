@@ -0,0 +1,84 @@
+"""Bulk approval of teacher profiles.
+
+Approval is one UPDATE for all selected teachers plus one set-based slot
+reconciliation, instead of a ``save()`` (and its signal handlers) per row.
+"""
+
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from searching.cards import bump_card_versions
+
+from .models import TeacherProfile
+from .slots import reconcile_teacher_slots
+
+
+@dataclass
+class ApprovalSummary:
+    """
+    Outcome of ``approve_teachers``.
+
+    Attributes:
+        approved: Ids of teachers approved by this call
+        already_approved: Ids of selected teachers that were approved before
+        missing: Requested ids that do not exist
+        slots_created: Number of slots provisioned for approved teachers
+        slots_deleted: Number of extra free slots removed
+    """
+
+    approved: list = field(default_factory=list)
+    already_approved: list = field(default_factory=list)
+    missing: list = field(default_factory=list)
+    slots_created: int = 0
+    slots_deleted: int = 0
+
+    def message(self):
+        """Return a human-readable summary for admin messages."""
+        parts = [f'Підтверджено {len(self.approved)} викладачів']
+        if self.already_approved:
+            parts.append(f'вже підтверджених: {len(self.already_approved)}')
+        if self.missing:
+            parts.append(f'не знайдено: {len(self.missing)}')
+        parts.append(f'створено слотів: {self.slots_created}')
+        if self.slots_deleted:
+            parts.append(f'видалено зайвих слотів: {self.slots_deleted}')
+        return ', '.join(parts) + '.'
+
+
+@transaction.atomic
+def approve_teachers(teacher_ids, approved_by=None):
+    """
+    Approve teachers with a single UPDATE and provision their slots in bulk.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+        approved_by: User who approves the teachers.
+
+    Returns:
+        ApprovalSummary: What changed.
+    """
+    teacher_ids = set(teacher_ids)
+    summary = ApprovalSummary()
+
+    rows = dict(
+        TeacherProfile.objects.select_for_update(no_key=True)
+        .filter(pk__in=teacher_ids)
+        .values_list('pk', 'is_approved')
+    )
+    summary.missing = sorted(teacher_ids - rows.keys())
+    summary.already_approved = sorted(pk for pk, approved in rows.items() if approved)
+    summary.approved = sorted(pk for pk, approved in rows.items() if not approved)
+    if not summary.approved:
+        return summary
+
+    now = timezone.now()
+    TeacherProfile.objects.filter(pk__in=summary.approved).update(
+        is_approved=True, approved_by=approved_by, approved_at=now, updated_at=now,
+    )
+    # The UPDATE sends no post_save, and approved teachers join the catalog.
+    bump_card_versions(summary.approved)
+    result = reconcile_teacher_slots(summary.approved)
+    summary.slots_created, summary.slots_deleted = result.created, result.deleted
+    return summary
@@ -0,0 +1,185 @@
+"""Synthetic registration datasets for load tests and query budgets.
+
+All rows are inserted with ``bulk_create`` (signals are not fired), so slots
+and search documents are provisioned explicitly. Generated users share an
+email prefix, which is how ``clear_dataset`` finds them again.
+"""
+
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from users.models import User
+
+from .models import Department, ScientificInterest, StudentProfile, TeacherProfile
+from .search import refresh_search_documents
+from .slots import refresh_free_slots
+
+DEFAULT_TAG = 'synthetic'
+
+FIRST_NAMES = [
+    'Андрій', 'Олена', 'Тарас', 'Ірина', 'Богдан', 'Марія', 'Остап', 'Наталія',
+    'Юрій', 'Софія', 'Василь', 'Оксана', 'Дмитро', 'Христина', 'Роман', 'Катерина',
+]
+LAST_NAMES = [
+    'Шевченко', 'Коваленко', 'Бондаренко', 'Ткаченко', 'Кравчук', 'Олійник', 'Шевчук',
+    'Поліщук', 'Мельник', 'Бойко', 'Ковальчук', 'Лисенко', 'Гнатюк', 'Юрченко',
+    'Іваненко', 'Зінченко', 'Федорів', 'Антонюк', 'Чорновол', 'Яковенко',
+]
+TOPIC_WORDS = [
+    'машинне навчання', 'бази даних', 'комп\'ютерний зір', 'обробка природної мови',
+    'розподілені системи', 'криптографія', 'теорія графів', 'чисельні методи',
+    'математичне моделювання', 'оптимізація', 'веб-розробка', 'мобільні застосунки',
+    'хмарні обчислення', 'кібербезпека', 'аналіз даних', 'диференціальні рівняння',
+    'теорія ймовірностей', 'штучний інтелект', 'комп\'ютерна графіка', 'компілятори',
+]
+
+
+@dataclass
+class DatasetSummary:
+    """Number of rows created by ``generate_dataset``."""
+
+    departments: int = 0
+    interests: int = 0
+    teachers: int = 0
+    slots: int = 0
+    students: int = 0
+    pending_requests: int = 0
+
+
+def _name(rng):
+    """Return a random (first_name, last_name) pair."""
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+@transaction.atomic
+def generate_dataset(
+    departments=5,
+    teachers_per_department=40,
+    students_per_department=300,
+    interests=30,
+    min_slots=2,
+    max_slots=6,
+    pending_ratio=0.2,
+    seed=1,
+    tag=DEFAULT_TAG,
+    batch_size=1000,
+):
+    """
+    Generate departments, interests, approved teachers with slots and students.
+
+    Students are spread across years 1-4; 3rd and 4th year students belong to
+    a department. A ``pending_ratio`` share of students gets a pending request
+    for a free slot of a teacher they are allowed to contact.
+
+    Returns:
+        DatasetSummary: Number of created rows per kind.
+    """
+    from searching.models import Slot, SlotRequest
+
+    rng = random.Random(seed)
+    password = make_password(None)
+    summary = DatasetSummary()
+
+    dept_objs = Department.objects.bulk_create(
+        [Department(name=f"Кафедра {i + 1} [{tag}]") for i in range(departments)]
+    )
+    summary.departments = len(dept_objs)
+
+    interest_objs = ScientificInterest.objects.bulk_create([
+        ScientificInterest(
+            name=f"{TOPIC_WORDS[i % len(TOPIC_WORDS)].capitalize()} {i + 1} [{tag}]",
+            description=f"Дослідження: {rng.choice(TOPIC_WORDS)}, {rng.choice(TOPIC_WORDS)}",
+        )
+        for i in range(interests)
+    ])
+    summary.interests = len(interest_objs)
+
+    teacher_users, teacher_rows = [], []
+    for d, department in enumerate(dept_objs):
+        for i in range(teachers_per_department):
+            first_name, last_name = _name(rng)
+            teacher_users.append(User(
+                email=f"{tag}.t{d}.{i}@lnu.edu.ua", first_name=first_name, last_name=last_name, password=password,
+            ))
+            teacher_rows.append(department)
+    teacher_users = User.objects.bulk_create(teacher_users, batch_size=batch_size)
+
+    teachers = TeacherProfile.objects.bulk_create([
+        TeacherProfile(
+            user=user,
+            department=department,
+            bio=f"Керую курсовими з тем: {', '.join(rng.sample(TOPIC_WORDS, 3))}.",
+            max_slots=rng.randint(min_slots, max_slots),
+            is_approved=True,
+        )
+        for user, department in zip(teacher_users, teacher_rows)
+    ], batch_size=batch_size)
+    summary.teachers = len(teachers)
+
+    through = TeacherProfile.scientific_interests.through
+    through.objects.bulk_create([
+        through(teacherprofile_id=teacher.pk, scientificinterest_id=interest.pk)
+        for teacher in teachers
+        for interest in rng.sample(interest_objs, min(3, len(interest_objs)))
+    ], batch_size=batch_size)
+
+    slots = Slot.objects.bulk_create([
+        Slot(teacher=teacher, topic=rng.choice([None, rng.choice(TOPIC_WORDS).capitalize()]))
+        for teacher in teachers
+        for _ in range(teacher.max_slots)
+    ], batch_size=batch_size)
+    summary.slots = len(slots)
+
+    student_users, student_rows = [], []
+    for d, department in enumerate(dept_objs):
+        for i in range(students_per_department):
+            first_name, last_name = _name(rng)
+            year = rng.randint(1, 4)
+            student_users.append(User(
+                email=f"{tag}.s{d}.{i}@lnu.edu.ua", first_name=first_name, last_name=last_name, password=password,
+            ))
+            student_rows.append((department if year >= 3 else None, year))
+    student_users = User.objects.bulk_create(student_users, batch_size=batch_size)
+
+    students = StudentProfile.objects.bulk_create([
+        StudentProfile(
+            user=user,
+            group=f"ПМі-{year}{rng.randint(1, 4)}",
+            year_of_study=year,
+            department=department,
+            course_topic=rng.choice(TOPIC_WORDS).capitalize(),
+        )
+        for user, (department, year) in zip(student_users, student_rows)
+    ], batch_size=batch_size)
+    summary.students = len(students)
+
+    slots_by_department = {}
+    for slot in slots:
+        slots_by_department.setdefault(slot.teacher.department_id, []).append(slot)
+    requests = []
+    for student in rng.sample(students, int(len(students) * pending_ratio)):
+        pool = slots_by_department.get(student.department_id) or slots
+        requests.append(SlotRequest(student=student, slot=rng.choice(pool), status='pending'))
+    SlotRequest.objects.bulk_create(requests, batch_size=batch_size)
+    summary.pending_requests = len(requests)
+
+    refresh_search_documents([teacher.pk for teacher in teachers])
+    refresh_free_slots([teacher.pk for teacher in teachers])
+    return summary
+
+
+@transaction.atomic
+def clear_dataset(tag=DEFAULT_TAG):
+    """
+    Delete users, departments and interests created by ``generate_dataset``.
+
+    Returns:
+        int: Number of deleted users.
+    """
+    _, per_model = User.objects.filter(email__startswith=f"{tag}.").delete()
+    Department.objects.filter(name__endswith=f"[{tag}]").delete()
+    ScientificInterest.objects.filter(name__endswith=f"[{tag}]").delete()
+    return per_model.get(User._meta.label, 0)
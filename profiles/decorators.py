@@ -1,36 +1,97 @@
-"""Decorators for role-based access control."""
+"""Decorators for role-based access control.
+
+All decorators here accept both sync and async views. For async views the
+session, user and profile are loaded in a worker thread before the view runs,
+so the view can use ``request.user`` and its primed profile without queries.
+"""
 
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.contrib import messages
+from django.contrib.auth import decorators as auth_decorators
+from django.contrib.auth.views import redirect_to_login
 from django.shortcuts import redirect
 
+from mentorion.tracing import AUTH, traced
+from users.roles import ROLE_STUDENT, ROLE_TEACHER, resolve_profile
 
-def student_required(view_func):
+
+def login_required(view_func):
     """
-    Decorator to restrict view access to students only.
+    Async-aware variant of Django's ``login_required``.
 
     Args:
-        view_func: View function to wrap.
+        view_func: Sync or async view function to wrap.
 
     Returns:
-        Wrapped view function that checks for student role.
+        Wrapped view function that redirects anonymous users to the login page.
     """
+    if not iscoroutinefunction(view_func):
+        return auth_decorators.login_required(view_func)
+
     @wraps(view_func)
-    def _wrapped_view(request, *args, **kwargs):
+    async def _wrapped_view(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+def _role_required(view_func, required_role, message):
+    """
+    Wrap ``view_func`` so that only users with ``required_role`` can open it.
+
+    Other users get ``message`` and are redirected to their own profile or
+    to onboarding.
+    """
+    @traced(AUTH, f'{required_role}_required')
+    def deny(request):
         if not request.user.is_authenticated:
             return redirect('account_login')
 
-        if not request.user.is_student:
-            messages.error(request, "Ця сторінка доступна тільки для студентів.")
-            if request.user.is_teacher:
-                return redirect('profiles:teacher_profile')
-            return redirect('profiles:onboarding')
+        role = resolve_profile(request.user).role
+        if role == required_role:
+            return None
+        messages.error(request, message)
+        if role == ROLE_TEACHER:
+            return redirect('profiles:teacher_profile')
+        if role == ROLE_STUDENT:
+            return redirect('profiles:student_profile')
+        return redirect('profiles:onboarding')
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _async_view(request, *args, **kwargs):
+            response = await sync_to_async(deny)(request)
+            if response is not None:
+                return response
+            return await view_func(request, *args, **kwargs)
+        return _async_view
 
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = deny(request)
+        if response is not None:
+            return response
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
 
+def student_required(view_func):
+    """
+    Decorator to restrict view access to students only.
+
+    Args:
+        view_func: View function to wrap.
+
+    Returns:
+        Wrapped view function that checks for student role.
+    """
+    return _role_required(view_func, ROLE_STUDENT, "Ця сторінка доступна тільки для студентів.")
+
+
 def teacher_required(view_func):
     """
     Decorator to restrict view access to teachers only.
@@ -41,16 +102,4 @@ def teacher_required(view_func):
     Returns:
         Wrapped view function that checks for teacher role.
     """
-    @wraps(view_func)
-    def _wrapped_view(request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return redirect('account_login')
-
-        if not request.user.is_teacher:
-            messages.error(request, "Ця сторінка доступна тільки для викладачів.")
-            if request.user.is_student:
-                return redirect('profiles:student_profile')
-            return redirect('profiles:onboarding')
-
-        return view_func(request, *args, **kwargs)
-    return _wrapped_view
+    return _role_required(view_func, ROLE_TEACHER, "Ця сторінка доступна тільки для викладачів.")
@@ -0,0 +1,111 @@
+"""Constant-memory export of student profiles to CSV and XLSX.
+
+Rows are read through ``iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) with every relation joined in the same query, so the export runs
+a fixed number of queries and never holds the whole faculty in memory. CSV is
+streamed to the client; XLSX is written in openpyxl write-only mode by the
+``profiles.export_students`` job (see profiles.tasks).
+"""
+
+import csv
+
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_HEADERS = ['Студент', 'Група', 'Кафедра', 'Викладач, якщо вже узгоджено', 'Тема курсової']
+XLSX_HEADERS = ['Студент', 'Група', 'Кафедра', 'Викладач, якщо вже узгоджено', 'Тема курсової / побажання']
+
+
+class Echo:
+    """File-like object that returns what is written, for streaming csv.writer output."""
+
+    def write(self, value):
+        """Return the written value instead of storing it."""
+        return value
+
+
+def _person(user):
+    """Format a user as ``Last First (email)``."""
+    return f"{user.last_name} {user.first_name} ({user.email})"
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Yield export rows for student profiles.
+
+    Args:
+        queryset: StudentProfile queryset to export.
+        chunk_size: Number of rows fetched from the database at a time.
+        progress: Optional callable receiving the number of rows produced so far.
+
+    Yields:
+        list: Student, group, department, teacher and topic.
+    """
+    queryset = queryset.select_related('user', 'department', 'assigned_slot__teacher__user')
+    for count, sp in enumerate(queryset.iterator(chunk_size=chunk_size), start=1):
+        dept = sp.department.name if sp.department else ''
+        teacher = ''
+        topic = sp.course_topic or ''
+        slot = getattr(sp, 'assigned_slot', None)
+        if slot is not None:
+            teacher = _person(slot.teacher.user)
+            topic = slot.topic or topic
+        yield [_person(sp.user), sp.group, dept, teacher, topic]
+        if progress is not None:
+            progress(count)
+
+
+def students_csv_response(queryset, filename='students_export.csv'):
+    """
+    Stream student profiles as CSV.
+
+    Args:
+        queryset: StudentProfile queryset to export.
+        filename: Name of the downloaded file.
+
+    Returns:
+        StreamingHttpResponse: CSV attachment produced row by row.
+    """
+    writer = csv.writer(Echo())
+    rows = (writer.writerow(row) for row in _with_headers(CSV_HEADERS, export_rows(queryset)))
+    response = StreamingHttpResponse(rows, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+def write_students_csv(queryset, fileobj, progress=None):
+    """
+    Write student profiles to a text file as CSV.
+
+    Args:
+        queryset: StudentProfile queryset to export.
+        fileobj: Text file opened with ``newline=''``.
+        progress: Optional callable receiving the number of rows written so far.
+    """
+    writer = csv.writer(fileobj)
+    writer.writerows(_with_headers(CSV_HEADERS, export_rows(queryset, progress=progress)))
+
+
+def write_students_xlsx(queryset, fileobj, progress=None):
+    """
+    Write student profiles to ``fileobj`` as XLSX in openpyxl write-only mode.
+
+    Args:
+        queryset: StudentProfile queryset to export.
+        fileobj: Seekable binary file or path to write the workbook to.
+        progress: Optional callable receiving the number of rows written so far.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Students')
+    for row in _with_headers(XLSX_HEADERS, export_rows(queryset, progress=progress)):
+        ws.append(row)
+    wb.save(fileobj)
+
+
+def _with_headers(headers, rows):
+    """Yield the header row followed by ``rows``."""
+    yield headers
+    yield from rows
@@ -2,6 +2,7 @@
 
 from django import forms
 
+from . import reference
 from .models import Department, ScientificInterest, StudentProfile, TeacherProfile
 
 
@@ -54,6 +55,19 @@ class OnboardingForm(forms.Form):
         widget=forms.Textarea(attrs={'rows': 4})
     )
 
+    def __init__(self, *args, **kwargs):
+        """
+        Render reference choices from the process-local cache.
+
+        Querysets are kept for validation, so a submitted id is still checked
+        against the database.
+        """
+        super().__init__(*args, **kwargs)
+        departments = reference.departments()
+        for name in ('student_department', 'teacher_department'):
+            self.fields[name].choices = reference.choices(departments, self.fields[name].empty_label)
+        self.fields['scientific_interests'].choices = reference.choices(reference.interests())
+
     def clean(self):
         """
         Validate form based on selected role.
@@ -132,3 +146,13 @@ class OnboardingForm(forms.Form):
             profile.scientific_interests.set(scientific_interests)
 
         return profile
+
+
+class DepartmentMaxSlotsForm(forms.Form):
+    """Admin form for setting max_slots for all teachers of selected departments."""
+
+    max_slots = forms.IntegerField(
+        min_value=0,
+        label="Максимальна кількість слотів",
+        widget=forms.NumberInput(attrs={'min': 0})
+    )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from profiles.datasets import DEFAULT_TAG, clear_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Генерує синтетичні кафедри, викладачів зі слотами та студентів для навантажувальних тестів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=5)
+        parser.add_argument('--teachers', type=int, default=40, help='Викладачів на кафедру')
+        parser.add_argument('--students', type=int, default=300, help='Студентів на кафедру')
+        parser.add_argument('--interests', type=int, default=30)
+        parser.add_argument('--min-slots', type=int, default=2)
+        parser.add_argument('--max-slots', type=int, default=6)
+        parser.add_argument('--pending-ratio', type=float, default=0.2,
+                            help='Частка студентів з активним запитом')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--tag', default=DEFAULT_TAG, help='Префікс для позначення згенерованих даних')
+        parser.add_argument('--clear', action='store_true', help='Видалити раніше згенеровані дані з цим тегом')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear_dataset(options['tag'])
+            self.stdout.write(self.style.WARNING(f'Видалено {deleted} згенерованих користувачів'))
+
+        summary = generate_dataset(
+            departments=options['departments'],
+            teachers_per_department=options['teachers'],
+            students_per_department=options['students'],
+            interests=options['interests'],
+            min_slots=options['min_slots'],
+            max_slots=options['max_slots'],
+            pending_ratio=options['pending_ratio'],
+            seed=options['seed'],
+            tag=options['tag'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Створено: кафедр {summary.departments}, інтересів {summary.interests}, '
+            f'викладачів {summary.teachers}, слотів {summary.slots}, студентів {summary.students}, '
+            f'активних запитів {summary.pending_requests}'
+        ))
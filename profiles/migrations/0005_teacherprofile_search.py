@@ -0,0 +1,71 @@
+# Generated by Django 4.2 on 2026-10-18 07:09
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+INDEX_NAME = 'teacherprofile_search_gin'
+
+
+def create_search_index(apps, schema_editor):
+    """Create the GIN index over the tsvector column (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON profiles_teacherprofile USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the GIN index (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Build search documents for existing teachers."""
+    TeacherProfile = apps.get_model('profiles', 'TeacherProfile')
+    Slot = apps.get_model('searching', 'Slot')
+
+    parts = {}
+    for teacher in TeacherProfile.objects.prefetch_related('scientific_interests'):
+        texts = [teacher.bio or '']
+        for interest in teacher.scientific_interests.all():
+            texts.extend([interest.name or '', interest.description or ''])
+        parts[teacher.pk] = texts
+    for teacher_id, topic in Slot.objects.filter(topic__isnull=False).values_list('teacher_id', 'topic'):
+        parts.setdefault(teacher_id, []).append(topic)
+
+    for pk, texts in parts.items():
+        document = ' '.join(t for t in texts if t).lower()
+        TeacherProfile.objects.filter(pk=pk).update(search_document=document)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'UPDATE profiles_teacherprofile SET search_vector = to_tsvector(%s::regconfig, search_document)',
+            [getattr(settings, 'SEARCH_CONFIG', 'simple')],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_teacherprofile_approved_at_and_more'),
+        ('searching', '0002_slot_topic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
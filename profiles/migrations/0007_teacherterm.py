@@ -0,0 +1,88 @@
+# Generated by Django 4.2 on 2026-10-18 08:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+from collections import Counter
+
+# A frozen copy of profiles.recommendations.analyze as of this migration, so
+# later changes to the analyzer do not change what the migration writes.
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_CYRILLIC_RE = re.compile(r'[а-яіїєґ]')
+STOP_WORDS = frozenset(
+    'і й та а але або в у на з із зі зо до від для по при про під над за через між що як це '
+    'його її їх їхній цей ця ці той та те не ні чи же ж би б так також щодо шляхом основі '
+    'and or the of in on for to with a an by'.split()
+)
+_SUFFIXES = sorted(
+    {
+        'ами', 'ями', 'ові', 'еві', 'єві', 'ого', 'ому', 'ими', 'іми', 'ої', 'ій', 'ий', 'их', 'іх',
+        'ів', 'їв', 'ах', 'ях', 'ам', 'ям', 'ом', 'ем', 'єм', 'ою', 'ею', 'єю',
+        'а', 'я', 'о', 'е', 'є', 'і', 'ї', 'и', 'у', 'ю', 'ь', 'й',
+    },
+    key=len,
+    reverse=True,
+)
+MIN_STEM = 3
+MAX_TERM_LENGTH = 64
+
+
+def stem(word):
+    if _CYRILLIC_RE.search(word):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+                return word[:-len(suffix)]
+        return word
+    if word.endswith('s') and len(word) > MIN_STEM + 1:
+        return word[:-1]
+    return word
+
+
+def analyze(text):
+    terms = []
+    for word in _WORD_RE.findall((text or '').lower()):
+        if len(word) < 2 or word.isdigit() or word in STOP_WORDS:
+            continue
+        terms.append(stem(word)[:MAX_TERM_LENGTH])
+    return terms
+
+
+def backfill_postings(apps, schema_editor):
+    """Index the search documents of existing teachers."""
+    TeacherProfile = apps.get_model('profiles', 'TeacherProfile')
+    TeacherTerm = apps.get_model('profiles', 'TeacherTerm')
+
+    postings = []
+    for pk, document in TeacherProfile.objects.values_list('pk', 'search_document').iterator():
+        counts = Counter(analyze(document))
+        length = sum(counts.values())
+        postings.extend(
+            TeacherTerm(teacher_id=pk, term=term, frequency=frequency, document_length=length)
+            for term, frequency in counts.items()
+        )
+    TeacherTerm.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_teacherprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField()),
+                ('document_length', models.PositiveIntegerField()),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='profiles.teacherprofile')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='teacherterm',
+            constraint=models.UniqueConstraint(fields=('term', 'teacher'), name='teacherterm_term_teacher_uniq'),
+        ),
+        migrations.RunPython(backfill_postings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 09:08
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_free_slots(apps, schema_editor):
+    """Count the free slots of existing teachers."""
+    TeacherProfile = apps.get_model('profiles', 'TeacherProfile')
+    Slot = apps.get_model('searching', 'Slot')
+    free = Slot.objects.filter(
+        teacher=models.OuterRef('pk'), is_available=True, is_filled=False,
+    ).order_by().values('teacher').annotate(n=models.Count('pk')).values('n')
+    TeacherProfile.objects.update(free_slots=Coalesce(models.Subquery(free), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_teacherterm'),
+        ('searching', '0006_cache_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='free_slots',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_free_slots, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-free_slots', 'id'], name='teacher_free_slots_idx'),
+        ),
+    ]
@@ -1,8 +1,12 @@
 """Profile models for students and teachers."""
 
+import functools
+
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models
+from django.db.models.functions import Coalesce, Collate
 
 
 class Department(models.Model):
@@ -102,6 +106,92 @@ class StudentProfile(models.Model):
         return f"{self.user.email} (Студент, {self.get_year_of_study_display()})"
 
 
+@functools.lru_cache(maxsize=None)
+def catalog_collation(using='default'):
+    """
+    Return ``settings.CATALOG_COLLATION`` if the database supports it.
+
+    Returns:
+        str or None: Collation name on PostgreSQL when it exists, otherwise None.
+    """
+    connection = connections[using]
+    collation = getattr(settings, 'CATALOG_COLLATION', None)
+    if connection.vendor != 'postgresql' or not collation:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_collation WHERE collname = %s', [collation])
+        return collation if cursor.fetchone() else None
+
+
+class TeacherProfileQuerySet(models.QuerySet):
+    """QuerySet helpers for rendering teacher lists with a fixed number of queries."""
+
+    def with_slot_counts(self):
+        """
+        Annotate slot counters computed in the same query.
+
+        Adds ``free_slot_count`` (available and unfilled slots) and
+        ``slot_count`` (all slots). The counters are subqueries rather than a
+        GROUP BY, so a page ordered by an index stops after its rows.
+
+        Returns:
+            TeacherProfileQuerySet: Annotated queryset.
+        """
+        from searching.models import Slot
+
+        def count(**filters):
+            slots = Slot.objects.filter(teacher=models.OuterRef('pk'), **filters).order_by()
+            return Coalesce(models.Subquery(slots.values('teacher').annotate(n=models.Count('pk')).values('n')), 0)
+
+        return self.annotate(
+            free_slot_count=count(is_available=True, is_filled=False),
+            slot_count=count(),
+        )
+
+    def with_sort_names(self):
+        """
+        Annotate ``sort_last_name``/``sort_first_name`` for alphabetical ordering.
+
+        On PostgreSQL the names use ``settings.CATALOG_COLLATION`` (Ukrainian
+        ICU collation by default), matching the index created by
+        ``users`` migration 0002.
+
+        Returns:
+            TeacherProfileQuerySet: Annotated queryset.
+        """
+        collation = catalog_collation(self.db)
+        if collation:
+            return self.annotate(
+                sort_last_name=Collate('user__last_name', collation),
+                sort_first_name=Collate('user__first_name', collation),
+            )
+        return self.annotate(
+            sort_last_name=models.F('user__last_name'),
+            sort_first_name=models.F('user__first_name'),
+        )
+
+    def for_catalog(self):
+        """
+        Prepare teachers for the catalog cards.
+
+        Joins user and department, prefetches interest names and annotates
+        slot counters, so rendering any number of cards costs two queries.
+
+        Returns:
+            TeacherProfileQuerySet: Catalog queryset.
+        """
+        return (
+            self.select_related('user', 'department')
+            .prefetch_related(
+                models.Prefetch(
+                    'scientific_interests',
+                    queryset=ScientificInterest.objects.only('id', 'name').order_by('name'),
+                )
+            )
+            .with_slot_counts()
+        )
+
+
 class TeacherProfile(models.Model):
     """
     Teacher profile with academic and administrative information.
@@ -115,6 +205,7 @@ class TeacherProfile(models.Model):
         is_approved: Admin approval status
         approved_by: User who approved the teacher
         approved_at: Timestamp of approval
+        updated_at: Timestamp of last update
     """
 
     user = models.OneToOneField(
@@ -149,6 +240,47 @@ class TeacherProfile(models.Model):
         verbose_name="Підтверджено користувачем"
     )
     approved_at = models.DateTimeField(null=True, blank=True, verbose_name="Дата підтвердження")
+    # Bulk updates must set it explicitly; it validates cached catalog pages.
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    # Denormalized search text (bio, interests, slot topics), see profiles.search.
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # Populated on PostgreSQL only; the GIN index is created by migration 0005.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Denormalized number of free slots that orders the catalog by availability,
+    # see profiles.slots.refresh_free_slots. Cards count the slots themselves.
+    free_slots = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = TeacherProfileQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pages of the catalog sorted by availability.
+            models.Index(
+                fields=['-free_slots', 'id'], condition=models.Q(is_approved=True), name='teacher_free_slots_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded ``max_slots`` to detect changes on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_max_slots = instance.__dict__.get('max_slots')
+        return instance
+
+    def max_slots_changed(self):
+        """
+        Check whether ``max_slots`` differs from the value loaded from the database.
+
+        Returns:
+            bool: True for new profiles or when ``max_slots`` was edited.
+        """
+        return getattr(self, '_loaded_max_slots', None) != self.__dict__.get('max_slots')
+
+    def save(self, *args, **kwargs):
+        """Save the profile and reset change tracking."""
+        super().save(*args, **kwargs)
+        self._loaded_max_slots = self.max_slots
 
     def available_slots_count(self):
         """
@@ -182,6 +314,33 @@ class TeacherProfile(models.Model):
         return f"{self.user.email} (Викладач)"
 
 
+class TeacherTerm(models.Model):
+    """
+    Posting of the teacher recommendation index, see ``profiles.recommendations``.
+
+    Attributes:
+        teacher: Teacher whose search document contains the term
+        term: Stemmed term
+        frequency: Number of occurrences in the document
+        document_length: Number of terms in the whole document
+    """
+
+    teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField()
+    document_length = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            # Also the index for looking postings up by term.
+            models.UniqueConstraint(fields=['term', 'teacher'], name='teacherterm_term_teacher_uniq'),
+        ]
+
+    def __str__(self):
+        """Return string representation of posting."""
+        return f"{self.term} × {self.frequency} ({self.teacher_id})"
+
+
 class Profile(models.Model):
     """
     Legacy profile model for backward compatibility during migration.
@@ -0,0 +1,192 @@
+"""Teacher recommendations for a student's course topic (BM25 over an inverted index).
+
+Every teacher's search document (bio, scientific interests and slot topics,
+see ``profiles.search``) is split into stemmed terms and stored as
+``TeacherTerm`` postings. The postings of a teacher are rebuilt together
+with the search document, so the index follows every change that the
+search does.
+
+Scoring reads only the postings of the topic's terms through the
+``(term, teacher)`` index and ranks them with BM25 in Python. Recommendations
+rank only the postings of teachers the student may see, so a restricted
+catalog still gets its best matches. Corpus
+statistics (number of indexed teachers and average document length) are
+cached for a few minutes; BM25 barely moves when they drift a little.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+_CYRILLIC_RE = re.compile(r'[а-яіїєґ]')
+
+STOP_WORDS = frozenset(
+    'і й та а але або в у на з із зі зо до від для по при про під над за через між що як це '
+    'його її їх їхній цей ця ці той та те не ні чи же ж би б так також щодо шляхом основі '
+    'and or the of in on for to with a an by'.split()
+)
+
+# Inflectional endings of Ukrainian nouns and adjectives, longest first.
+_SUFFIXES = sorted(
+    {
+        'ами', 'ями', 'ові', 'еві', 'єві', 'ого', 'ому', 'ими', 'іми', 'ої', 'ій', 'ий', 'их', 'іх',
+        'ів', 'їв', 'ах', 'ях', 'ам', 'ям', 'ом', 'ем', 'єм', 'ою', 'ею', 'єю',
+        'а', 'я', 'о', 'е', 'є', 'і', 'ї', 'и', 'у', 'ю', 'ь', 'й',
+    },
+    key=len,
+    reverse=True,
+)
+MIN_STEM = 3
+MAX_TERM_LENGTH = 64
+
+K1 = 1.2
+B = 0.75
+STATS_KEY = 'profiles:recommendation-stats'
+STATS_TIMEOUT = 5 * 60
+
+
+def stem(word):
+    """
+    Strip an inflectional ending so that word forms share one term.
+
+    A light suffix stripper, not a full Ukrainian stemmer: "мережа",
+    "мережі" and "мереж" all become "мереж". Latin words only lose a plural "s".
+    """
+    if _CYRILLIC_RE.search(word):
+        for suffix in _SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+                return word[:-len(suffix)]
+        return word
+    if word.endswith('s') and len(word) > MIN_STEM + 1:
+        return word[:-1]
+    return word
+
+
+def analyze(text):
+    """
+    Split text into stemmed index terms.
+
+    Args:
+        text: Any text, e.g. a course topic or a search document.
+
+    Returns:
+        list: Terms in text order, without stop words, numbers and one-letter words.
+    """
+    terms = []
+    for word in _WORD_RE.findall((text or '').lower()):
+        if len(word) < 2 or word.isdigit() or word in STOP_WORDS:
+            continue
+        terms.append(stem(word)[:MAX_TERM_LENGTH])
+    return terms
+
+
+def index_documents(documents):
+    """
+    Replace the postings of the given teachers.
+
+    Args:
+        documents: Mapping of TeacherProfile id to search document text.
+    """
+    from .models import TeacherTerm
+
+    if not documents:
+        return
+    TeacherTerm.objects.filter(teacher_id__in=documents).delete()
+    postings = []
+    for pk, document in documents.items():
+        counts = Counter(analyze(document))
+        length = sum(counts.values())
+        postings.extend(
+            TeacherTerm(teacher_id=pk, term=term, frequency=frequency, document_length=length)
+            for term, frequency in counts.items()
+        )
+    TeacherTerm.objects.bulk_create(postings, batch_size=1000)
+
+
+def corpus_stats():
+    """
+    Return the number of indexed teachers and their average document length.
+
+    Returns:
+        tuple: ``(teachers, average_length)``.
+    """
+    from .models import TeacherTerm
+
+    def load():
+        totals = TeacherTerm.objects.aggregate(teachers=Count('teacher_id', distinct=True), terms=Sum('frequency'))
+        teachers = totals['teachers'] or 0
+        return teachers, (totals['terms'] or 0) / teachers if teachers else 0.0
+
+    return cache.get_or_set(STATS_KEY, load, STATS_TIMEOUT)
+
+
+def score_teachers(text, teachers=None):
+    """
+    Score indexed teachers against a text with BM25.
+
+    Args:
+        text: Student's course topic or any other query text.
+        teachers: TeacherProfile queryset to score, all indexed teachers by default.
+
+    Returns:
+        dict: Mapping of TeacherProfile id to score, only for teachers that
+        share at least one term with the text.
+    """
+    from .models import TeacherTerm
+
+    query = Counter(analyze(text))
+    if not query:
+        return {}
+
+    matching = TeacherTerm.objects.filter(term__in=query)
+    document_frequency = None
+    if teachers is not None:
+        # Term rarity is a property of the whole corpus, not of the scored teachers.
+        document_frequency = Counter(dict(
+            matching.order_by().values('term').annotate(teachers=Count('teacher_id')).values_list('term', 'teachers')
+        ))
+        matching = matching.filter(teacher_id__in=teachers.values('pk'))
+    postings = list(matching.values_list('teacher_id', 'term', 'frequency', 'document_length'))
+    if not postings:
+        return {}
+    corpus_size, average_length = corpus_stats()
+    if document_frequency is None:
+        document_frequency = Counter(term for _, term, _, _ in postings)
+    # Postings written after the stats were cached may outnumber them.
+    corpus_size = max(corpus_size, max(document_frequency.values()))
+    average_length = average_length or 1.0
+
+    scores = defaultdict(float)
+    for teacher_id, term, frequency, length in postings:
+        df = document_frequency[term]
+        idf = math.log(1 + (corpus_size - df + 0.5) / (df + 0.5))
+        saturation = frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * length / average_length))
+        scores[teacher_id] += query[term] * idf * saturation
+    return dict(scores)
+
+
+def recommend_teachers(queryset, text, limit=4):
+    """
+    Return the best matching teachers of a queryset for a text.
+
+    Args:
+        queryset: TeacherProfile queryset the recommendations must come from.
+        text: Student's course topic.
+        limit: Maximum number of teachers.
+
+    Returns:
+        list: Teachers ordered by descending score, each with ``recommendation_score``.
+    """
+    scores = score_teachers(text, queryset)
+    if not scores:
+        return []
+    candidates = sorted(scores, key=lambda pk: (-scores[pk], pk))[:limit]
+    teachers = list(queryset.filter(pk__in=candidates))
+    for teacher in teachers:
+        teacher.recommendation_score = scores[teacher.pk]
+    teachers.sort(key=lambda teacher: (-teacher.recommendation_score, teacher.pk))
+    return teachers[:limit]
@@ -0,0 +1,114 @@
+"""Process-local cache for reference data (departments, scientific interests).
+
+Reference lists change a few times per semester but are shown on every
+catalog and onboarding page. Each worker keeps them in memory for up to
+``TTL`` seconds. Edits bump a generation number stored in the database (see
+profiles.signals and searching.versions); workers read it at most every
+``CHECK_INTERVAL`` seconds, one primary-key lookup, and reload when it
+moved, so all gunicorn workers pick up changes quickly whatever the cache
+backend.
+"""
+
+import time
+
+from django.db import transaction
+
+from searching.versions import bump_versions, current_version
+
+GENERATION_KEY = 'profiles:reference-generation'
+TTL = 10 * 60
+CHECK_INTERVAL = 5
+
+# name -> (generation, loaded_at, value)
+_entries = {}
+# (generation, checked_at) of the last read of the shared generation.
+_checked = None
+
+
+def _generation(now):
+    """Return the shared generation, read at most every ``CHECK_INTERVAL`` seconds; 0 before the first edit."""
+    global _checked
+    if _checked is None or now - _checked[1] >= CHECK_INTERVAL:
+        _checked = (current_version(GENERATION_KEY), now)
+    return _checked[0]
+
+
+def _cached(name, load):
+    """
+    Return the cached value of ``name``, reloading it when stale.
+
+    Args:
+        name: Entry name.
+        load: Callable returning the fresh value.
+    """
+    now = time.monotonic()
+    generation = _generation(now)
+    entry = _entries.get(name)
+    if entry is not None:
+        loaded_generation, loaded_at, value = entry
+        if loaded_generation == generation and now - loaded_at < TTL:
+            return value
+
+    value = load()
+    _entries[name] = (generation, now, value)
+    return value
+
+
+def reset():
+    """Forget the reference data and the generation this process has read."""
+    global _checked
+    _entries.clear()
+    _checked = None
+
+
+def invalidate():
+    """
+    Make every worker reload reference data.
+
+    This worker drops its copy right away so the editing request sees its
+    own change, and again once the shared generation moves after the
+    transaction commits.
+    """
+    reset()
+    bump_versions([GENERATION_KEY])
+    transaction.on_commit(reset)
+
+
+def departments():
+    """
+    Return all departments ordered by name.
+
+    Returns:
+        list: Department instances with ``id`` and ``name``.
+    """
+    from .models import Department
+
+    return _cached('departments', lambda: list(Department.objects.order_by('name')))
+
+
+def interests():
+    """
+    Return all scientific interests ordered by name, without descriptions.
+
+    Returns:
+        list: ScientificInterest instances with ``id`` and ``name`` loaded.
+    """
+    from .models import ScientificInterest
+
+    return _cached('interests', lambda: list(ScientificInterest.objects.only('id', 'name').order_by('name')))
+
+
+def choices(objects, empty_label=None):
+    """
+    Build form field choices from cached reference objects.
+
+    Args:
+        objects: Objects with ``pk`` and ``name``.
+        empty_label: Label of the empty choice, if the field has one.
+
+    Returns:
+        list: ``(value, label)`` pairs.
+    """
+    result = [('', empty_label)] if empty_label is not None else []
+    result.extend((obj.pk, obj.name) for obj in objects)
+    return result
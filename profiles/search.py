@@ -0,0 +1,135 @@
+"""Full-text search over teacher bios, scientific interests and slot topics.
+
+Each teacher has a denormalized ``search_document`` with the searchable text.
+On PostgreSQL it is also indexed as a ``tsvector`` (``search_vector``, GIN
+index) built with ``settings.SEARCH_CONFIG`` and queried with ranking. Other
+databases fall back to substring matching over the lowercased document,
+ranked by the number of matched terms.
+"""
+
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .recommendations import index_documents
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_config():
+    """Return the PostgreSQL text search configuration name."""
+    return getattr(settings, 'SEARCH_CONFIG', 'simple')
+
+
+def uses_postgres_search():
+    """Check whether the tsvector search path is available."""
+    return connection.vendor == 'postgresql'
+
+
+def build_documents(teacher_ids):
+    """
+    Build search documents for the given teachers.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+
+    Returns:
+        dict: Mapping of teacher id to lowercased document text.
+    """
+    from searching.models import Slot
+
+    from .models import TeacherProfile
+
+    parts = defaultdict(list)
+    for pk, bio in TeacherProfile.objects.filter(pk__in=teacher_ids).values_list('pk', 'bio'):
+        parts[pk].append(bio or '')
+
+    through = TeacherProfile.scientific_interests.through
+    interests = through.objects.filter(teacherprofile_id__in=parts).values_list(
+        'teacherprofile_id', 'scientificinterest__name', 'scientificinterest__description',
+    )
+    for pk, name, description in interests:
+        parts[pk].extend([name or '', description or ''])
+
+    topics = Slot.objects.filter(teacher_id__in=parts, topic__isnull=False).values_list('teacher_id', 'topic')
+    for pk, topic in topics:
+        parts[pk].append(topic)
+
+    return {pk: ' '.join(p for p in texts if p).lower() for pk, texts in parts.items()}
+
+
+def refresh_search_documents(teacher_ids):
+    """
+    Rebuild search documents, tsvectors on PostgreSQL and recommendation postings for the given teachers.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+    """
+    from .models import TeacherProfile
+
+    teacher_ids = set(teacher_ids)
+    if not teacher_ids:
+        return
+
+    documents = build_documents(teacher_ids)
+    # Interests and slot topics are shown on catalog pages, so the change also
+    # counts as a profile update for page validators (see searching.conditional).
+    now = timezone.now()
+    profiles = [TeacherProfile(pk=pk, search_document=doc, updated_at=now) for pk, doc in documents.items()]
+    TeacherProfile.objects.bulk_update(profiles, ['search_document', 'updated_at'])
+
+    if uses_postgres_search():
+        TeacherProfile.objects.filter(pk__in=documents).update(
+            search_vector=SearchVector('search_document', config=search_config()),
+        )
+    index_documents(documents)
+
+
+def search_terms(query):
+    """Split a user query into lowercased terms."""
+    return _TERM_RE.findall(query.lower())
+
+
+def search_teachers(queryset, query):
+    """
+    Filter and rank teachers by a free-text query.
+
+    Annotates ``search_rank`` (higher is better) on the returned queryset.
+
+    Args:
+        queryset: TeacherProfile queryset to filter.
+        query: Text typed by the user.
+
+    Returns:
+        QuerySet: Matching teachers annotated with ``search_rank``.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if uses_postgres_search():
+        # Documents are lowercased in Python, so do the same with the query
+        # instead of relying on the database locale for non-ASCII text.
+        search_query = SearchQuery(query.lower(), config=search_config(), search_type='websearch')
+        # ts_rank returns real; cast to double precision so the value round-trips
+        # exactly through pagination cursors.
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(SearchRank('search_vector', search_query), FloatField()),
+        )
+
+    matches = Q()
+    rank = Value(0.0, output_field=FloatField())
+    for term in terms:
+        matches |= Q(search_document__contains=term)
+        rank += Case(
+            When(search_document__contains=term, then=Value(1.0)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    return queryset.filter(matches).annotate(search_rank=rank)
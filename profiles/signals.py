@@ -1,25 +1,141 @@
 # profiles/signals.py
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import TeacherProfile
+from django.utils import timezone
 
+from users.roles import forget_profile, invalidate_role
 
+from . import reference
+from .models import Department, ScientificInterest, StudentProfile, TeacherProfile
+from .search import refresh_search_documents
+from .slots import reconcile_teacher_slots, refresh_free_slots
+
+
+@receiver(post_save, sender=TeacherProfile)
+def create_slots_for_teacher(sender, instance: TeacherProfile, created: bool, update_fields=None, **kwargs):
+    """
+    Add or remove slots when a teacher is created or their max_slots is changed.
+    """
+    if update_fields is not None and 'max_slots' not in update_fields:
+        return
+    if created or instance.max_slots_changed():
+        reconcile_teacher_slots([instance.pk])
+
+
+@receiver(post_save, sender=StudentProfile)
 @receiver(post_save, sender=TeacherProfile)
-def create_slots_for_teacher(sender, instance: TeacherProfile, created: bool, **kwargs):
-    """
-    automatic adding or removing slots when the teacher's max_slots is changed.
-    """
-    from searching.models import Slot
-    
-    current_slots_count = Slot.objects.filter(teacher=instance).count()
-    target_slots_count = instance.max_slots
-    
-    if current_slots_count < target_slots_count:
-        slots_to_create = target_slots_count - current_slots_count
-        for _ in range(slots_to_create):
-            Slot.objects.create(teacher=instance)
-    
-    elif current_slots_count > target_slots_count:
-        slots_to_delete = current_slots_count - target_slots_count
-        Slot.objects.filter(teacher=instance, student__isnull=True).order_by('-created_at')[:slots_to_delete].delete()
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=TeacherProfile)
+def invalidate_cached_role(sender, instance, **kwargs):
+    """
+    Drop the cached role of the profile owner when a profile is created, changed or removed.
+    """
+    invalidate_role(instance.user_id)
+    if sender.user.is_cached(instance):
+        forget_profile(instance.user)
+
+
+@receiver(post_save, sender=TeacherProfile)
+def refresh_teacher_search_document(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Rebuild the teacher's search document when the bio may have changed.
+    """
+    if update_fields is not None and 'bio' not in update_fields:
+        return
+    refresh_search_documents([instance.pk])
+
+
+@receiver(m2m_changed, sender=TeacherProfile.scientific_interests.through)
+def refresh_search_on_interests_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Rebuild search documents when teachers gain or lose scientific interests.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_search_documents([instance.pk])
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_teacher_ids = list(instance.teachers.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_search_documents(getattr(instance, '_cleared_teacher_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_search_documents(pk_set or [])
+
+
+@receiver(post_save, sender=ScientificInterest)
+def refresh_search_on_interest_edit(sender, instance, created, **kwargs):
+    """
+    Rebuild documents of teachers with an interest whose name or description changed.
+    """
+    if not created:
+        refresh_search_documents(instance.teachers.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=ScientificInterest)
+def remember_interest_teachers(sender, instance, **kwargs):
+    """Remember teachers of an interest before its M2M rows are removed."""
+    instance._deleted_teacher_ids = list(instance.teachers.values_list('pk', flat=True))
 
+
+@receiver(post_delete, sender=ScientificInterest)
+def refresh_search_on_interest_delete(sender, instance, **kwargs):
+    """Rebuild documents of teachers that had a deleted interest."""
+    refresh_search_documents(getattr(instance, '_deleted_teacher_ids', []))
+
+
+@receiver(post_save, sender='searching.Slot')
+def refresh_search_on_slot_topic_change(sender, instance, **kwargs):
+    """
+    Rebuild the teacher's search document when a slot topic changes.
+    """
+    if instance.topic_changed():
+        refresh_search_documents([instance.teacher_id])
+
+
+@receiver(post_save, sender='searching.Slot')
+def refresh_free_slots_on_slot_save(sender, instance, **kwargs):
+    """
+    Recount the teacher's free slots when a slot is added, taken or released.
+    """
+    if instance.free_changed():
+        refresh_free_slots([instance.teacher_id])
+
+
+@receiver(post_delete, sender='searching.Slot')
+def refresh_free_slots_on_slot_delete(sender, instance, **kwargs):
+    """
+    Recount the teacher's free slots when a slot is removed.
+    """
+    refresh_free_slots([instance.teacher_id])
+
+
+@receiver(post_save, sender=Department)
+def touch_teachers_on_department_rename(sender, instance, created, **kwargs):
+    """
+    Mark the department's teachers as updated, since their pages show its name.
+    """
+    if not created:
+        TeacherProfile.objects.filter(department=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def touch_teacher_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Mark the teacher profile as updated when the teacher's name or email may have changed.
+    """
+    if created or (update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields)):
+        return
+    TeacherProfile.objects.filter(user=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=ScientificInterest)
+@receiver(post_delete, sender=ScientificInterest)
+def invalidate_reference_data(sender, **kwargs):
+    """
+    Make every worker reload cached departments and interests after an edit.
+    """
+    reference.invalidate()
@@ -0,0 +1,149 @@
+"""Set-based provisioning of consultation slots from ``TeacherProfile.max_slots``.
+
+Reconciliation works on many teachers at once: one grouped COUNT, one
+``bulk_create`` for the missing slots and one DELETE for the extra ones.
+Only free slots without pending requests are ever removed, so a teacher may
+keep more slots than ``max_slots`` until students are released.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from searching.cards import bump_card_versions
+from searching.events import publish_slots_freed
+
+from .search import refresh_search_documents
+
+
+@dataclass
+class SlotReconciliation:
+    """Number of slots created and deleted by ``reconcile_teacher_slots``."""
+
+    created: int = 0
+    deleted: int = 0
+
+
+def removable_slots():
+    """
+    Return slots that may be deleted when a teacher lowers ``max_slots``.
+
+    A slot is removable if it has no student, is not filled and has no
+    pending requests.
+
+    Returns:
+        QuerySet: Slot queryset.
+    """
+    from searching.models import Slot, SlotRequest
+
+    pending = SlotRequest.objects.filter(slot=models.OuterRef('pk'), status='pending')
+    return Slot.objects.filter(student__isnull=True, is_filled=False).exclude(models.Exists(pending))
+
+
+def refresh_free_slots(teacher_ids):
+    """
+    Recount ``TeacherProfile.free_slots`` of the given teachers with one UPDATE.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+    """
+    from searching.models import Slot
+
+    from .models import TeacherProfile
+
+    teacher_ids = set(teacher_ids)
+    if not teacher_ids:
+        return
+    free = Slot.objects.filter(
+        teacher=models.OuterRef('pk'), is_available=True, is_filled=False,
+    ).order_by().values('teacher').annotate(n=models.Count('pk')).values('n')
+    TeacherProfile.objects.filter(pk__in=teacher_ids).update(free_slots=Coalesce(models.Subquery(free), 0))
+
+
+@transaction.atomic
+def reconcile_teacher_slots(teacher_ids):
+    """
+    Create or delete slots so that each teacher has ``max_slots`` of them.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+
+    Returns:
+        SlotReconciliation: Number of created and deleted slots.
+    """
+    from searching.models import Slot
+
+    from .models import TeacherProfile
+
+    result = SlotReconciliation()
+    teacher_ids = set(teacher_ids)
+    if not teacher_ids:
+        return result
+
+    counts = TeacherProfile.objects.filter(pk__in=teacher_ids).values('pk', 'max_slots').annotate(
+        current=models.Count('slots'),
+    ).values_list('pk', 'max_slots', 'current')
+
+    missing, excess = [], {}
+    for pk, max_slots, current in counts:
+        if current < max_slots:
+            missing.extend(Slot(teacher_id=pk) for _ in range(max_slots - current))
+        elif current > max_slots:
+            excess[pk] = current - max_slots
+
+    if missing:
+        result.created = len(Slot.objects.bulk_create(missing))
+        refresh_free_slots({slot.teacher_id for slot in missing})
+        bump_card_versions({slot.teacher_id for slot in missing})
+        publish_slots_freed({slot.teacher_id for slot in missing})
+
+    if excess:
+        # Newest removable slots go first, as before.
+        candidates = removable_slots().filter(teacher_id__in=excess).order_by(
+            'teacher_id', '-created_at', '-id',
+        ).values_list('pk', 'teacher_id')
+        doomed, taken = [], defaultdict(int)
+        for pk, teacher_id in candidates:
+            if taken[teacher_id] < excess[teacher_id]:
+                taken[teacher_id] += 1
+                doomed.append(pk)
+
+        if doomed:
+            # The conditions are repeated in the DELETE so a request sent in the
+            # meantime keeps its slot.
+            _, per_model = removable_slots().filter(pk__in=doomed).delete()
+            result.deleted = per_model.get(Slot._meta.label, 0)
+            # Removed slots may have carried topics.
+            refresh_search_documents(taken)
+            bump_card_versions(taken)
+
+    return result
+
+
+@transaction.atomic
+def set_department_max_slots(departments, max_slots):
+    """
+    Set ``max_slots`` for every teacher of the given departments.
+
+    Updates all teachers with one statement and reconciles their slots in bulk.
+
+    Args:
+        departments: Department queryset or iterable of ids.
+        max_slots: New number of slots per teacher.
+
+    Returns:
+        tuple: Number of updated teachers and the ``SlotReconciliation``.
+    """
+    from .models import TeacherProfile
+
+    teachers = TeacherProfile.objects.filter(department__in=departments)
+    teacher_ids = list(teachers.values_list('pk', flat=True))
+    updated = TeacherProfile.objects.filter(pk__in=teacher_ids).update(
+        max_slots=max_slots, updated_at=timezone.now(),
+    )
+    # Also when no slot is created or deleted: the UPDATE sends no post_save.
+    bump_card_versions(teacher_ids)
+    return updated, reconcile_teacher_slots(teacher_ids)
@@ -0,0 +1,51 @@
+"""Background tasks for long profile admin operations (see jobs.registry)."""
+
+import importlib.util
+
+from jobs.registry import task
+
+from .exports import write_students_csv, write_students_xlsx
+from .models import StudentProfile
+from .slots import set_department_max_slots
+
+
+@task('profiles.export_students')
+def export_students(job, student_ids, file_format='xlsx'):
+    """
+    Export student profiles to a file attached to the job.
+
+    Args:
+        job: JobContext of the running job.
+        student_ids: Ids of the StudentProfile rows to export.
+        file_format: ``'xlsx'`` or ``'csv'``; CSV is used when openpyxl is missing.
+
+    Returns:
+        dict: Number of exported rows.
+    """
+    queryset = StudentProfile.objects.filter(pk__in=student_ids).order_by('pk')
+    job.set_total(len(student_ids))
+
+    if file_format == 'xlsx' and importlib.util.find_spec('openpyxl') is not None:
+        write_students_xlsx(queryset, job.artifact_path('students_export.xlsx'), progress=job.progress)
+    else:
+        with open(job.artifact_path('students_export.csv'), 'w', newline='', encoding='utf-8') as fh:
+            write_students_csv(queryset, fh, progress=job.progress)
+    return {'rows': job.done}
+
+
+@task('profiles.set_department_max_slots')
+def set_max_slots(job, department_ids, max_slots):
+    """
+    Set max_slots for all teachers of the given departments and reconcile slots.
+
+    Args:
+        job: JobContext of the running job.
+        department_ids: Ids of the departments.
+        max_slots: New number of slots per teacher.
+
+    Returns:
+        dict: Number of updated teachers and created/deleted slots.
+    """
+    updated, result = set_department_max_slots(department_ids, max_slots)
+    job.set_total(updated)
+    return {'teachers': updated, 'created': result.created, 'deleted': result.deleted}
@@ -1,3 +1,486 @@
+import csv
+from io import BytesIO, StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles import reference
+from profiles import urls as profiles_urls
+from profiles.approval import approve_teachers
+from profiles.datasets import clear_dataset, generate_dataset
+from profiles.exports import export_rows, students_csv_response, write_students_xlsx
+from profiles.forms import OnboardingForm
+from profiles.models import Department, ScientificInterest, StudentProfile, TeacherProfile
+from profiles.recommendations import analyze, recommend_teachers, score_teachers
+from profiles.slots import reconcile_teacher_slots
+from searching.models import CacheVersion, Slot, SlotRequest
+from users.models import User
+
+
+class GenerateDatasetTests(TestCase):
+    """The synthetic dataset generator builds a consistent registration state."""
+
+    def test_generates_requested_shape(self):
+        summary = generate_dataset(
+            departments=2, teachers_per_department=3, students_per_department=10,
+            interests=4, min_slots=2, max_slots=2, pending_ratio=0.5,
+        )
+
+        self.assertEqual(summary.teachers, 6)
+        self.assertEqual(summary.students, 20)
+        self.assertEqual(Slot.objects.count(), 12)
+        self.assertEqual(SlotRequest.objects.filter(status='pending').count(), 10)
+        self.assertFalse(StudentProfile.objects.filter(year_of_study__gte=3, department__isnull=True).exists())
+        self.assertFalse(TeacherProfile.objects.filter(search_document='').exists())
+
+    def test_clear_removes_tagged_rows(self):
+        generate_dataset(departments=1, teachers_per_department=2, students_per_department=3, interests=2)
+
+        deleted = clear_dataset()
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Department.objects.exists())
+
+    def test_command_reports_summary(self):
+        call_command(
+            'generate_dataset', departments=1, teachers=2, students=2, interests=2, stdout=StringIO(),
+        )
+
+        self.assertEqual(TeacherProfile.objects.count(), 2)
+
+
+class SlotProvisioningTests(TestCase):
+    """Slots follow max_slots without touching taken slots."""
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Кафедра програмування")
+        user = User.objects.create_user(email="teacher@lnu.edu.ua")
+        self.teacher = TeacherProfile.objects.create(user=user, department=self.department, max_slots=3)
+
+    def _student(self, email):
+        user = User.objects.create_user(email=email)
+        return StudentProfile.objects.create(user=user, group="ПМі-31", year_of_study=3, department=self.department)
+
+    def test_new_teacher_gets_slots(self):
+        self.assertEqual(self.teacher.slots.count(), 3)
+
+    def test_unrelated_save_does_not_reconcile(self):
+        self.teacher.slots.all().delete()
+        teacher = TeacherProfile.objects.get(pk=self.teacher.pk)
+        teacher.bio = "Новий опис"
+        teacher.save()
+
+        self.assertEqual(teacher.slots.count(), 0)
+
+    def test_increase_adds_missing_slots(self):
+        teacher = TeacherProfile.objects.get(pk=self.teacher.pk)
+        teacher.max_slots = 5
+        teacher.save()
+
+        self.assertEqual(teacher.slots.count(), 5)
+
+    def test_decrease_keeps_filled_and_requested_slots(self):
+        filled, requested, _ = self.teacher.slots.order_by('id')
+        filled.student = self._student("a@lnu.edu.ua")
+        filled.save()
+        SlotRequest.objects.create(student=self._student("b@lnu.edu.ua"), slot=requested)
+
+        teacher = TeacherProfile.objects.get(pk=self.teacher.pk)
+        teacher.max_slots = 0
+        teacher.save()
+
+        self.assertEqual(set(teacher.slots.values_list('pk', flat=True)), {filled.pk, requested.pk})
+
+    def test_reconcile_is_set_based(self):
+        users = [User.objects.create_user(email=f"t{i}@lnu.edu.ua") for i in range(5)]
+        teachers = [
+            TeacherProfile.objects.create(user=user, department=self.department, max_slots=2) for user in users
+        ]
+        TeacherProfile.objects.filter(pk__in=[t.pk for t in teachers]).update(max_slots=4)
+
+        # Savepoint, grouped COUNT, one INSERT, free-slot recount, release.
+        with self.assertNumQueries(5):
+            result = reconcile_teacher_slots([t.pk for t in teachers])
+
+        self.assertEqual(result.created, 10)
+        self.assertEqual(Slot.objects.filter(teacher__in=teachers).count(), 20)
+        self.assertEqual(set(TeacherProfile.objects.filter(pk__in=[t.pk for t in teachers]).values_list(
+            'free_slots', flat=True,
+        )), {4})
+
+
+class DepartmentMaxSlotsActionTests(TestCase):
+    """The department admin action queues setting max_slots for all its teachers."""
+
+    def test_sets_max_slots_and_reconciles(self):
+        department = Department.objects.create(name="Кафедра програмування")
+        other = Department.objects.create(name="Кафедра математики")
+        for i, dept in enumerate([department, department, other]):
+            user = User.objects.create_user(email=f"t{i}@lnu.edu.ua")
+            TeacherProfile.objects.create(user=user, department=dept, max_slots=2)
+        admin = User.objects.create_superuser(email="admin@lnu.edu.ua", password="x")
+        self.client.force_login(admin)
+        url = reverse('admin:profiles_department_changelist')
+        data = {'action': 'set_max_slots', '_selected_action': [department.pk]}
+
+        response = self.client.post(url, data)
+        self.assertContains(response, 'name="max_slots"')
+
+        response = self.client.post(url, {**data, 'apply': '1', 'max_slots': 5})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Slot.objects.filter(teacher__department=department).count(), 4)
+
+        call_command('run_jobs', workers=0, once=True, stdout=StringIO())
+        self.assertEqual(
+            list(TeacherProfile.objects.order_by('pk').values_list('max_slots', flat=True)), [5, 5, 2],
+        )
+        self.assertEqual(Slot.objects.filter(teacher__department=department).count(), 10)
+
+
+class StudentExportTests(TestCase):
+    """Student exports run a fixed number of queries regardless of row count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(departments=2, teachers_per_department=2, students_per_department=15, interests=2)
+        cls.assigned = StudentProfile.objects.first()
+        slot = Slot.objects.filter(student__isnull=True).first()
+        slot.student = cls.assigned
+        slot.topic = "Призначена тема"
+        slot.save()
+
+    def test_rows_use_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(export_rows(StudentProfile.objects.all()))
+
+        self.assertEqual(len(rows), 30)
+        assigned = next(row for row in rows if row[0].endswith(f"({self.assigned.user.email})"))
+        self.assertEqual(assigned[4], "Призначена тема")
+        self.assertTrue(assigned[3])
+
+    def test_csv_is_streamed(self):
+        response = students_csv_response(StudentProfile.objects.all())
+
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(rows[0][0], 'Студент')
+        self.assertEqual(len(rows), 31)
+
+    def test_xlsx_is_written_in_write_only_mode(self):
+        from openpyxl import load_workbook
+
+        output = BytesIO()
+        write_students_xlsx(StudentProfile.objects.all(), output)
+
+        workbook = load_workbook(BytesIO(output.getvalue()), read_only=True)
+        self.assertEqual(len(list(workbook['Students'].rows)), 31)
+
+
+class BulkApprovalTests(TestCase):
+    """Approving teachers costs the same number of queries for any selection."""
+
+    def setUp(self):
+        self.department = Department.objects.create(name="Кафедра програмування")
+        self.admin = User.objects.create_superuser(email="admin@lnu.edu.ua", password="x")
+
+    def _teachers(self, count, **extra):
+        teachers = []
+        for _ in range(count):
+            user = User.objects.create_user(email=f"t{User.objects.count()}@lnu.edu.ua")
+            teachers.append(TeacherProfile.objects.create(user=user, department=self.department, **extra))
+        return teachers
+
+    def test_query_count_does_not_depend_on_selection(self):
+        few, many = self._teachers(2), self._teachers(20)
+        Slot.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as small:
+            approve_teachers([t.pk for t in few], approved_by=self.admin)
+        with CaptureQueriesContext(connection) as large:
+            approve_teachers([t.pk for t in many], approved_by=self.admin)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Slot.objects.count(), 22 * 4)
+
+    def test_summary_is_precise(self):
+        pending = self._teachers(2)
+        approved = self._teachers(1, is_approved=True)
+        missing_id = pending[-1].pk + 1000
+        pending[0].slots.first().delete()
+
+        summary = approve_teachers([t.pk for t in pending + approved] + [missing_id], approved_by=self.admin)
+
+        self.assertEqual(summary.approved, [t.pk for t in pending])
+        self.assertEqual(summary.already_approved, [approved[0].pk])
+        self.assertEqual(summary.missing, [missing_id])
+        self.assertEqual(summary.slots_created, 1)
+        teacher = TeacherProfile.objects.get(pk=pending[0].pk)
+        self.assertTrue(teacher.is_approved)
+        self.assertEqual(teacher.approved_by, self.admin)
+        self.assertIsNotNone(teacher.approved_at)
+
+    def test_admin_action_reports_summary(self):
+        teachers = self._teachers(3)
+        self.client.force_login(self.admin)
+
+        response = self.client.post(
+            reverse('admin:profiles_teacherprofile_changelist'),
+            {'action': 'approve_teachers', '_selected_action': [t.pk for t in teachers]},
+            follow=True,
+        )
+
+        self.assertContains(response, 'Підтверджено 3 викладачів')
+        self.assertEqual(TeacherProfile.objects.filter(is_approved=True).count(), 3)
+
+
+class ReferenceCacheTests(TestCase):
+    """Departments and interests are served from the process-local cache."""
+
+    def setUp(self):
+        cache.clear()
+        reference.reset()
+        self.department = Department.objects.create(name='Кафедра ІПЗ')
+        self.interest = ScientificInterest.objects.create(name='Машинне навчання')
+
+    def test_repeated_reads_hit_memory(self):
+        reference.departments()
+        reference.interests()
+
+        with self.assertNumQueries(0):
+            self.assertEqual([d.name for d in reference.departments()], ['Кафедра ІПЗ'])
+            self.assertEqual([i.name for i in reference.interests()], ['Машинне навчання'])
+
+    def test_edit_invalidates_after_commit(self):
+        reference.departments()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.department.name = 'Кафедра КН'
+            self.department.save()
+
+        self.assertEqual([d.name for d in reference.departments()], ['Кафедра КН'])
+
+    def test_other_worker_reloads_when_generation_moves(self):
+        reference.departments()
+        # Simulate another worker with its own cache: only the generation row changes.
+        Department.objects.filter(pk=self.department.pk).update(name='Кафедра КН')
+        CacheVersion.objects.create(key=reference.GENERATION_KEY, version=1)
+        generation, checked_at = reference._checked
+        reference._checked = (generation, checked_at - reference.CHECK_INTERVAL)
+
+        self.assertEqual([d.name for d in reference.departments()], ['Кафедра КН'])
+
+    def test_onboarding_form_uses_cached_choices(self):
+        OnboardingForm()
+
+        with self.assertNumQueries(0):
+            form = OnboardingForm()
+            self.assertEqual(
+                list(form.fields['student_department'].choices),
+                [('', 'Оберіть кафедру'), (self.department.pk, 'Кафедра ІПЗ')],
+            )
+            self.assertEqual(
+                list(form.fields['scientific_interests'].choices),
+                [(self.interest.pk, 'Машинне навчання')],
+            )
+
+    def test_onboarding_form_still_validates_ids(self):
+        form = OnboardingForm(data={'role': 'teacher', 'teacher_department': self.department.pk + 100})
+
+        self.assertFalse(form.is_valid())
+        self.assertIn('teacher_department', form.errors)
+
+
+class AsyncProfilePageTests(TestCase):
+    """Profile pages are async views served through the ASGI handler."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Кафедра ІПЗ')
+        teacher_user = User.objects.create_user(email='teacher@lnu.edu.ua')
+        cls.teacher = TeacherProfile.objects.create(user=teacher_user, department=cls.department, max_slots=3)
+        student_user = User.objects.create_user(email='student@lnu.edu.ua')
+        cls.student = StudentProfile.objects.create(user=student_user, group='ПМі-21', year_of_study=2)
+        slot = cls.teacher.slots.first()
+        slot.student, slot.is_filled = cls.student, True
+        slot.save()
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_student_profile_shows_assigned_teacher(self):
+        await sync_to_async(self.async_client.force_login)(self.student.user)
+
+        response = await self.async_client.get(reverse('profiles:student_profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['teacher'].pk, self.teacher.pk)
+        self.assertIsNone(response.context['active_request'])
+
+    async def test_teacher_profile_counts_slots(self):
+        await sync_to_async(self.async_client.force_login)(self.teacher.user)
+
+        response = await self.async_client.get(reverse('profiles:teacher_profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.context['total_slots'], response.context['available_slots'], response.context['filled_slots']),
+            (3, 2, 1),
+        )
+
+    async def test_wrong_role_is_redirected(self):
+        await sync_to_async(self.async_client.force_login)(self.student.user)
+
+        response = await self.async_client.get(reverse('profiles:teacher_profile'))
+
+        self.assertRedirects(response, reverse('profiles:student_profile'), fetch_redirect_response=False)
+
+
+class RecommendationIndexTests(TestCase):
+    """The recommendation index follows teacher changes and ranks by topic."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.ml = ScientificInterest.objects.create(name="Машинне навчання")
+
+    def setUp(self):
+        cache.clear()
+
+    def _teacher(self, email, bio='', interests=()):
+        teacher = TeacherProfile.objects.create(
+            user=User.objects.create_user(email=email), department=self.department, bio=bio, is_approved=True,
+        )
+        teacher.scientific_interests.set(interests)
+        return teacher
+
+    def test_word_forms_share_terms(self):
+        self.assertEqual(analyze("Нейронні мережі"), analyze("нейронних мереж"))
+        self.assertEqual(analyze("Аналіз даних для медицини"), ['аналіз', 'дан', 'медицин'])
+
+    def test_index_follows_bio_interests_and_slot_topics(self):
+        teacher = self._teacher("t@lnu.edu.ua", bio="Історія математики")
+        self.assertIn('історі', set(teacher.terms.values_list('term', flat=True)))
+
+        teacher.scientific_interests.add(self.ml)
+        teacher.bio = "Комп'ютерний зір"
+        teacher.save()
+        slot = teacher.slots.first()
+        slot.topic = "Розпізнавання облич"
+        slot.save()
+
+        terms = set(teacher.terms.values_list('term', flat=True))
+        self.assertTrue({'машинн', 'навчанн', 'зір', 'облич'} <= terms)
+        self.assertNotIn('історі', terms)
+
+    def test_scores_by_topic_relevance(self):
+        focused = self._teacher("a@lnu.edu.ua", bio="Машинне навчання в медицині", interests=[self.ml])
+        broad = self._teacher("b@lnu.edu.ua", bio="Бази даних, веб-розробка та трохи навчання")
+        self._teacher("c@lnu.edu.ua", bio="Історія математики")
+
+        scores = score_teachers("Машинне навчання для медичних знімків")
+
+        self.assertEqual(set(scores), {focused.pk, broad.pk})
+        self.assertGreater(scores[focused.pk], scores[broad.pk])
+
+    def test_recommends_from_the_queryset_when_others_score_higher(self):
+        other = Department.objects.create(name="Кафедра математики")
+        for i in range(11):
+            TeacherProfile.objects.create(
+                user=User.objects.create_user(email=f"other{i}@lnu.edu.ua"), department=other,
+                bio="Машинне навчання, машинне навчання", is_approved=True,
+            )
+        own = self._teacher("own@lnu.edu.ua", bio="Навчання")
+
+        recommended = recommend_teachers(
+            TeacherProfile.objects.filter(department=self.department), "машинне навчання", limit=1,
+        )
+
+        self.assertEqual([teacher.pk for teacher in recommended], [own.pk])
+
+    def test_scoring_reads_only_the_topic_postings(self):
+        self._teacher("a@lnu.edu.ua", interests=[self.ml])
+        score_teachers("навчання")
+
+        # Corpus statistics are cached; postings are looked up by term.
+        with self.assertNumQueries(1):
+            score_teachers("машинне навчання")
+
+
+class ViewQueryBudgetTests(TestCase):
+    """Every profile view runs a fixed number of queries, whatever the data size."""
+
+    # (URL name, method) -> most queries a request may run on a cold cache.
+    BUDGETS = {
+        ('onboarding', 'get'): 6,
+        ('onboarding', 'post'): 30,
+        ('student_profile', 'get'): 5,
+        ('teacher_profile', 'get'): 7,
+    }
+    SIZES = (2, 10)
+
+    def _seed(self, size):
+        """
+        Create a teacher with ``size`` interests and slots and a student assigned to them.
+
+        Returns:
+            dict: (URL name, method) -> (user, form data) of one request per view.
+        """
+        department = Department.objects.create(name='Кафедра ІПЗ')
+        interests = [ScientificInterest.objects.create(name=f'Тема {i}') for i in range(size)]
+        teacher = TeacherProfile.objects.create(
+            user=User.objects.create_user(email='teacher@lnu.edu.ua'), department=department, max_slots=size,
+        )
+        teacher.scientific_interests.set(interests)
+        student = StudentProfile.objects.create(
+            user=User.objects.create_user(email='student@lnu.edu.ua'), group='ПМі-21', year_of_study=2,
+        )
+        Slot.objects.filter(pk=teacher.slots.first().pk).update(student=student, is_filled=True, is_available=False)
+        newcomer = User.objects.create_user(email='new@lnu.edu.ua')
+        onboarding = {
+            'role': 'teacher',
+            'teacher_department': department.pk,
+            'scientific_interests': [interest.pk for interest in interests],
+        }
+        return {
+            ('onboarding', 'get'): (newcomer, None),
+            ('onboarding', 'post'): (newcomer, onboarding),
+            ('student_profile', 'get'): (student.user, None),
+            ('teacher_profile', 'get'): (teacher.user, None),
+        }
+
+    def _measure(self, size):
+        """Return (URL name, method) -> query count at the given data size."""
+        counts = {}
+        with transaction.atomic():
+            for (name, method), (user, form) in self._seed(size).items():
+                cache.clear()
+                reference.reset()
+                self.client.force_login(user)
+                # Each request sees the seeded data, not the writes of the previous one.
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = getattr(self.client, method)(reverse(f'profiles:{name}'), form)
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400, name)
+                if method == 'post':
+                    self.assertEqual(response.status_code, 302, f"{name}: the form was not accepted")
+                counts[name, method] = len(ctx.captured_queries)
+            transaction.set_rollback(True)
+        return counts
+
+    def test_views_stay_within_budget(self):
+        small, large = (self._measure(size) for size in self.SIZES)
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(view=name):
+                self.assertEqual(small[name], large[name], "query count grows with the data")
+                self.assertLessEqual(large[name], budget)
 
-# Create your tests here.
+    def test_every_view_has_a_budget(self):
+        self.assertEqual({pattern.name for pattern in profiles_urls.urlpatterns}, {name for name, _ in self.BUDGETS})
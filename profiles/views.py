@@ -1,14 +1,19 @@
 """Profile views for onboarding and profile management."""
 
+import asyncio
+
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
-from django.shortcuts import redirect, render
+from django.db.models import Count, Q
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 from django.utils.decorators import method_decorator
 from django.views.generic import FormView
 
-from searching.models import Slot
+from mentorion.db_routing import replica_reads
+from searching.models import AllocationRound, Slot
+from users.roles import ROLE_STUDENT, ROLE_TEACHER
 
-from .decorators import student_required, teacher_required
+from .decorators import login_required, student_required, teacher_required
 from .forms import OnboardingForm
 
 
@@ -35,11 +40,11 @@ class OnboardingView(FormView):
         Returns:
             HttpResponse: Redirect to profile page or onboarding form.
         """
-        if request.user.has_profile:
-            if request.user.is_student:
-                return redirect('profiles:student_profile')
-            if request.user.is_teacher:
-                return redirect('profiles:teacher_profile')
+        role = request.user.profile_role
+        if role == ROLE_STUDENT:
+            return redirect('profiles:student_profile')
+        if role == ROLE_TEACHER:
+            return redirect('profiles:teacher_profile')
         return super().dispatch(request, *args, **kwargs)
 
     def form_valid(self, form):
@@ -63,12 +68,24 @@ class OnboardingView(FormView):
         return redirect('home')
 
 
+async def _allocation_open(department_id):
+    """Return True if the department has an allocation round accepting preferences."""
+    if department_id is None:
+        return False
+    return await AllocationRound.objects.filter(
+        department_id=department_id, status=AllocationRound.STATUS_OPEN,
+    ).aexists()
+
+
 @login_required
 @student_required
-def student_profile_view(request):
+@replica_reads
+async def student_profile_view(request):
     """
     Display student profile with active requests and assigned teacher.
 
+    The pending request and the assigned slot are loaded concurrently.
+
     Args:
         request: HTTP request object.
 
@@ -77,8 +94,13 @@ def student_profile_view(request):
     """
     student_profile = request.user.student_profile
 
-    active_request = student_profile.slot_requests.filter(status='pending').first()
-    assigned_slot = Slot.objects.filter(student=student_profile, is_filled=True).first()
+    active_request, assigned_slot, allocation_open = await asyncio.gather(
+        student_profile.slot_requests.filter(status='pending').select_related('slot__teacher__user').afirst(),
+        Slot.objects.filter(student=student_profile, is_filled=True).select_related(
+            'teacher__user', 'teacher__department',
+        ).afirst(),
+        _allocation_open(student_profile.department_id),
+    )
     teacher = assigned_slot.teacher if assigned_slot else None
 
     context = {
@@ -86,13 +108,15 @@ def student_profile_view(request):
         'active_request': active_request,
         'assigned_slot': assigned_slot,
         'teacher': teacher,
+        'allocation_open': allocation_open,
     }
-    return render(request, 'profiles/student_profile.html', context)
+    return TemplateResponse(request, 'profiles/student_profile.html', context)
 
 
 @login_required
 @teacher_required
-def teacher_profile_view(request):
+@replica_reads
+async def teacher_profile_view(request):
     """
     Display teacher profile with slot statistics and approval status.
 
@@ -104,11 +128,22 @@ def teacher_profile_view(request):
     """
     teacher_profile = request.user.teacher_profile
 
+    # One aggregate instead of three COUNT queries.
+    counts, allocation_open = await asyncio.gather(
+        teacher_profile.slots.aaggregate(
+            total=Count('id'),
+            available=Count('id', filter=Q(is_available=True, is_filled=False)),
+            filled=Count('id', filter=Q(is_filled=True)),
+        ),
+        _allocation_open(teacher_profile.department_id),
+    )
+
     context = {
         'teacher_profile': teacher_profile,
-        'total_slots': teacher_profile.total_slots_count(),
-        'available_slots': teacher_profile.available_slots_count(),
-        'filled_slots': teacher_profile.filled_slots_count(),
+        'total_slots': counts['total'],
+        'available_slots': counts['available'],
+        'filled_slots': counts['filled'],
         'is_approved': teacher_profile.is_approved,
+        'allocation_open': allocation_open,
     }
-    return render(request, 'profiles/teacher_profile.html', context)
+    return TemplateResponse(request, 'profiles/teacher_profile.html', context)
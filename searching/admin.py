@@ -1,10 +1,14 @@
 from django.contrib import admin
-from .models import Slot, SlotRequest
+
+from jobs.admin import EnqueueJobMixin
+
+from .models import AllocationRound, Slot, SlotRequest
 
 
 @admin.register(Slot)
 class SlotAdmin(admin.ModelAdmin):
     list_display = ('id', 'teacher', 'student', 'is_available', 'is_filled', 'created_at')
+    ordering = ('-created_at',)
     list_filter = ('is_available', 'is_filled', 'created_at')
     search_fields = ('teacher__user__email', 'student__user__email')
     readonly_fields = ('created_at', 'updated_at')
@@ -13,6 +17,29 @@ class SlotAdmin(admin.ModelAdmin):
 @admin.register(SlotRequest)
 class SlotRequestAdmin(admin.ModelAdmin):
     list_display = ('id', 'student', 'slot', 'status', 'created_at')
+    ordering = ('-created_at',)
     list_filter = ('status', 'created_at')
     search_fields = ('student__user__email', 'slot__teacher__user__email')
     readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(AllocationRound)
+class AllocationRoundAdmin(EnqueueJobMixin, admin.ModelAdmin):
+    """Admin interface for allocation rounds with a batch allocation action."""
+
+    list_display = ('id', 'department', 'status', 'max_choices', 'created_at', 'allocated_at')
+    list_filter = ('status', 'department')
+    readonly_fields = ('status', 'summary', 'created_at', 'allocated_at')
+    actions = ['allocate']
+
+    def allocate(self, request, queryset):
+        """
+        Admin action to queue the allocation of the selected open rounds.
+
+        Args:
+            request: HTTP request object.
+            queryset: QuerySet of selected AllocationRound instances.
+        """
+        for allocation_round in queryset.filter(status=AllocationRound.STATUS_OPEN):
+            self.enqueue_job(request, 'searching.allocate_round', {'round_id': allocation_round.pk})
+    allocate.short_description = 'Розподілити слоти за вподобаннями'
@@ -0,0 +1,352 @@
+"""Batch allocation of a department's free slots in an ``AllocationRound``.
+
+Students rank teachers of their department; teachers may rank the students
+who chose them. ``allocate_round`` loads all preferences with a few queries,
+runs the deferred acceptance engine (``searching.matching``) and writes the
+result with bulk statements: one UPDATE for the slots (per batch outside
+PostgreSQL), one INSERT per batch of approved requests and one UPDATE for
+the pending requests it supersedes.
+
+Applicants a teacher did not rank come after the ranked ones, in an order
+drawn by lot from the round id, so a rerun on the same data gives the same
+result.
+"""
+
+from dataclasses import asdict, dataclass
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from profiles.models import StudentProfile, TeacherProfile
+from profiles.slots import refresh_free_slots
+
+from . import events
+from .cards import bump_card_versions
+from .matching import UNMATCHED, deferred_acceptance
+from .models import AllocationRound, Slot, SlotRequest, StudentPreference, TeacherPreference
+
+BATCH_SIZE = 1000
+# Priority of applicants a teacher did not rank, above any explicit rank.
+UNRANKED = 1 << 32
+
+
+class AllocationError(Exception):
+    """Raised when a round cannot be allocated."""
+
+
+@dataclass
+class AllocationSummary:
+    """
+    Outcome of ``allocate_round``, stored in ``AllocationRound.summary``.
+
+    Attributes:
+        students: Students with preferences and without a slot
+        matched: Students assigned to a slot
+        unmatched: Students left without a slot
+        slots: Free slots offered in the round
+        iterations: Iterations of the matching engine
+        superseded_requests: Pending requests cancelled or rejected by the allocation
+    """
+
+    students: int = 0
+    matched: int = 0
+    unmatched: int = 0
+    slots: int = 0
+    iterations: int = 0
+    superseded_requests: int = 0
+
+
+def _group_positions(sorted_keys):
+    """Return the position of every element within its run of equal keys."""
+    return np.arange(sorted_keys.size) - np.searchsorted(sorted_keys, sorted_keys, side='left')
+
+
+def _preference_arrays(allocation_round, student_ids, teacher_ids):
+    """
+    Build the engine input from the round's preferences.
+
+    Args:
+        allocation_round: The AllocationRound.
+        student_ids: Sorted array of participating StudentProfile ids.
+        teacher_ids: Sorted array of participating TeacherProfile ids.
+
+    Returns:
+        tuple: ``choices`` and ``priorities`` arrays for ``deferred_acceptance``.
+    """
+    # Whole-round reads filtered here: id lists of a department are too long for IN.
+    rows = np.array(
+        StudentPreference.objects.filter(round=allocation_round).order_by('student_id', 'rank').values_list(
+            'student_id', 'teacher_id',
+        ),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    rows = rows[np.isin(rows[:, 0], student_ids) & np.isin(rows[:, 1], teacher_ids)]
+    students = np.searchsorted(student_ids, rows[:, 0])
+    teachers = np.searchsorted(teacher_ids, rows[:, 1])
+    columns = _group_positions(students)
+
+    n = student_ids.size
+    width = int(columns.max()) + 1 if columns.size else 1
+    choices = np.full((n, width), UNMATCHED, dtype=np.int64)
+    choices[students, columns] = teachers
+
+    lottery = np.random.default_rng(allocation_round.pk).permutation(n)
+    priorities = np.zeros((n, width), dtype=np.int64)
+    priorities[students, columns] = UNRANKED + lottery[students]
+
+    ranked = np.array(
+        TeacherPreference.objects.filter(round=allocation_round).values_list('teacher_id', 'student_id', 'rank'),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    ranked = ranked[np.isin(ranked[:, 0], teacher_ids) & np.isin(ranked[:, 1], student_ids)]
+    if ranked.size:
+        # Look the (teacher, student) pairs up among the student choices.
+        pair_keys = teachers * n + students
+        order = np.argsort(pair_keys)
+        ranked_keys = np.searchsorted(teacher_ids, ranked[:, 0]) * n + np.searchsorted(student_ids, ranked[:, 1])
+        found = np.searchsorted(pair_keys[order], ranked_keys)
+        found = np.minimum(found, order.size - 1)
+        hit = pair_keys[order][found] == ranked_keys
+        chosen = order[found[hit]]
+        priorities[students[chosen], columns[chosen]] = ranked[hit, 2]
+
+    return choices, priorities
+
+
+def _lock_round(round_id):
+    """
+    Lock a round row for the rest of the transaction.
+
+    Saving preferences and allocating both take this lock, so preferences
+    are never saved into a round that is being or has been allocated.
+    """
+    return AllocationRound.objects.select_for_update(no_key=True).get(pk=round_id)
+
+
+def _open_round_for_update(allocation_round):
+    """
+    Lock the round and check that it still accepts preferences.
+
+    Raises:
+        AllocationError: If the round was allocated in the meantime.
+    """
+    if _lock_round(allocation_round.pk).status != AllocationRound.STATUS_OPEN:
+        raise AllocationError("Прийом вподобань у цьому раунді завершено.")
+
+
+@transaction.atomic
+def save_student_preferences(allocation_round, student, teacher_ids):
+    """
+    Replace a student's ranked list of teachers.
+
+    Args:
+        allocation_round: Open AllocationRound.
+        student: StudentProfile submitting the list.
+        teacher_ids: TeacherProfile ids, most preferred first.
+
+    Raises:
+        AllocationError: If the round no longer accepts preferences.
+    """
+    _open_round_for_update(allocation_round)
+    StudentPreference.objects.filter(round=allocation_round, student=student).delete()
+    StudentPreference.objects.bulk_create([
+        StudentPreference(round=allocation_round, student=student, teacher_id=teacher_id, rank=rank)
+        for rank, teacher_id in enumerate(teacher_ids, start=1)
+    ])
+
+
+@transaction.atomic
+def save_teacher_ranking(allocation_round, teacher, student_ids):
+    """
+    Replace a teacher's ranking of applicants.
+
+    Args:
+        allocation_round: Open AllocationRound.
+        teacher: TeacherProfile submitting the ranking.
+        student_ids: StudentProfile ids, most preferred first; unlisted
+            applicants are ordered by lot.
+
+    Raises:
+        AllocationError: If the round no longer accepts preferences.
+    """
+    _open_round_for_update(allocation_round)
+    TeacherPreference.objects.filter(round=allocation_round, teacher=teacher).delete()
+    TeacherPreference.objects.bulk_create([
+        TeacherPreference(round=allocation_round, teacher=teacher, student_id=student_id, rank=rank)
+        for rank, student_id in enumerate(student_ids, start=1)
+    ])
+
+
+@transaction.atomic
+def allocate_round(round_id):
+    """
+    Assign the free slots of a round's department by stable matching.
+
+    Students who already have a slot are skipped. Each teacher's capacity
+    is the number of their free slots, which are provisioned from
+    ``max_slots``. Matched students get an approved request; their other
+    pending requests are cancelled and pending requests of other students
+    for the filled slots are rejected.
+
+    Args:
+        round_id: Id of an open AllocationRound.
+
+    Returns:
+        AllocationSummary: What changed.
+
+    Raises:
+        AllocationError: If the round was already allocated.
+    """
+    allocation_round = _lock_round(round_id)
+    if allocation_round.status != AllocationRound.STATUS_OPEN:
+        raise AllocationError("Цей раунд вже розподілено.")
+
+    summary = AllocationSummary()
+    teacher_ids = np.array(
+        TeacherProfile.objects.filter(
+            department_id=allocation_round.department_id, is_approved=True,
+        ).order_by('pk').values_list('pk', flat=True),
+        dtype=np.int64,
+    )
+    # Slots, then students: the same lock order as approving a single request.
+    free_slots = np.array(
+        Slot.objects.select_for_update(no_key=True).filter(
+            teacher_id__in=_ids(teacher_ids.tolist()), student__isnull=True, is_filled=False, is_available=True,
+        ).order_by('teacher_id', 'created_at', 'id').values_list('pk', 'teacher_id'),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    students = dict(
+        StudentProfile.objects.select_for_update(no_key=True, of=('self',)).filter(
+            pk__in=StudentPreference.objects.filter(round=allocation_round).values('student_id'),
+            assigned_slot__isnull=True,
+        ).values_list('pk', 'user_id')
+    )
+    student_ids = np.array(sorted(students), dtype=np.int64)
+    matched_ids = []
+    summary.students = student_ids.size
+    summary.slots = free_slots.shape[0]
+
+    if student_ids.size and teacher_ids.size:
+        choices, priorities = _preference_arrays(allocation_round, student_ids, teacher_ids)
+        slot_teachers = np.searchsorted(teacher_ids, free_slots[:, 1])
+        capacity = np.bincount(slot_teachers, minlength=teacher_ids.size)
+        matching = deferred_acceptance(choices, priorities, capacity)
+        summary.iterations = matching.iterations
+
+        matched = np.flatnonzero(matching.assignment != UNMATCHED)
+        matched = matched[np.argsort(matching.assignment[matched], kind='stable')]
+        teachers = matching.assignment[matched]
+        # The n-th student of a teacher takes the teacher's n-th free slot.
+        first_slot = np.searchsorted(slot_teachers, teachers, side='left')
+        slot_ids = free_slots[first_slot + _group_positions(teachers), 0]
+        matched_ids = student_ids[matched].tolist()
+        summary.matched = len(matched_ids)
+        summary.superseded_requests = _write_matches(allocation_round, slot_ids.tolist(), matched_ids)
+
+        matched_teachers = teacher_ids[np.unique(teachers)].tolist()
+        refresh_free_slots(matched_teachers)
+        bump_card_versions(matched_teachers)
+        events.publish(
+            'request_approved',
+            {'message': "Вас розподілено до наукового керівника!"},
+            user_ids=[students[pk] for pk in matched_ids],
+        )
+
+    unmatched = set(students).difference(matched_ids)
+    summary.unmatched = len(unmatched)
+    events.publish(
+        'request_rejected',
+        {'message': "Під час розподілу для вас не знайшлося місця. Оберіть викладача з вільними слотами."},
+        user_ids=[students[pk] for pk in unmatched],
+    )
+
+    allocation_round.status = AllocationRound.STATUS_ALLOCATED
+    allocation_round.allocated_at = timezone.now()
+    allocation_round.summary = asdict(summary)
+    allocation_round.save(update_fields=['status', 'allocated_at', 'summary'])
+    return summary
+
+
+def _ids(ids):
+    """
+    Return a value for an ``__in`` filter on many ids.
+
+    On PostgreSQL the ids are sent as one array parameter, the way
+    ``_assign_slots`` sends them, instead of one placeholder per id.
+    """
+    if connections[Slot.objects.db].vendor == 'postgresql':
+        return RawSQL('SELECT unnest(%s::bigint[])', [list(ids)])
+    return list(ids)
+
+
+def _assign_slots(slot_ids, student_ids, now):
+    """
+    Set the students of many slots at once.
+
+    On PostgreSQL this is one UPDATE joined with the unnested id arrays;
+    Django's ``bulk_update`` builds a CASE expression per row, which takes
+    seconds to compile for a whole department.
+    """
+    connection = connections[Slot.objects.db]
+    if connection.vendor != 'postgresql':
+        Slot.objects.bulk_update(
+            [
+                Slot(pk=slot_id, student_id=student_id, is_filled=True, is_available=False, updated_at=now)
+                for slot_id, student_id in zip(slot_ids, student_ids)
+            ],
+            ['student', 'is_filled', 'is_available', 'updated_at'],
+            batch_size=BATCH_SIZE,
+        )
+        return
+
+    table = connection.ops.quote_name(Slot._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET student_id = v.student_id, is_filled = true, is_available = false, updated_at = %s '
+            f'FROM unnest(%s::bigint[], %s::bigint[]) AS v(slot_id, student_id) WHERE {table}.id = v.slot_id',
+            [now, slot_ids, student_ids],
+        )
+
+
+def _write_matches(allocation_round, slot_ids, student_ids):
+    """
+    Assign slots to students and record the approved requests.
+
+    Args:
+        allocation_round: The AllocationRound being allocated.
+        slot_ids: Slot ids, aligned with ``student_ids``.
+        student_ids: StudentProfile ids that get the slots.
+
+    Returns:
+        int: Number of superseded pending requests.
+    """
+    now = timezone.now()
+    _assign_slots(slot_ids, student_ids, now)
+
+    cancelled = SlotRequest.objects.filter(student_id__in=_ids(student_ids), status='pending').update(
+        status='cancelled', updated_at=now,
+    )
+    competing = dict(
+        SlotRequest.objects.filter(slot_id__in=_ids(slot_ids), status='pending').values_list(
+            'pk', 'student__user_id',
+        )
+    )
+    if competing:
+        SlotRequest.objects.filter(pk__in=competing).update(status='rejected', updated_at=now)
+        events.publish(
+            'request_rejected',
+            {'message': "Ваш запит відхилено: слот зайнято під час розподілу."},
+            user_ids=competing.values(),
+        )
+
+    message = f"Розподіл за вподобаннями (раунд #{allocation_round.pk})"
+    SlotRequest.objects.bulk_create(
+        [
+            SlotRequest(student_id=student_id, slot_id=slot_id, status='approved', message=message)
+            for slot_id, student_id in zip(slot_ids, student_ids)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    return cancelled + len(competing)
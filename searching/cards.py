@@ -0,0 +1,116 @@
+"""Versioned fragment cache for teacher catalog cards.
+
+A card looks the same for every student, so its HTML is cached under the
+teacher's current version token. Signals (see searching.signals) and bulk
+operations bump the token whenever something shown on the card changes, which
+makes the old fragment unreachable instead of deleting it. Tokens are stored
+in the database (see searching.versions), so bumps made by the job worker or
+another gunicorn worker reach every process even with a per-process cache.
+
+Fragments carry a soft expiry shorter than the cache timeout. When it passes,
+the first worker to take a short ``cache.add`` lock rebuilds the fragment
+while the others keep serving the stale copy, so a popular card is never
+rebuilt by many workers at once.
+
+Every bump also moves the catalog version, which keys data derived from
+many cards at once, such as the facet counts (see searching.facets).
+"""
+
+import time
+
+from django.core.cache import cache
+
+from .versions import bump_versions, current_version, current_versions
+
+VERSION_KEY = 'searching:card-version:{teacher_id}'
+FRAGMENT_KEY = 'searching:card:{teacher_id}:{version}'
+LOCK_KEY = 'searching:card-lock:{teacher_id}:{version}'
+CATALOG_VERSION_KEY = 'searching:catalog-version'
+
+# After SOFT_TIMEOUT a fragment is rebuilt by one worker; until FRAGMENT_TIMEOUT
+# the stale copy is still served by the others.
+SOFT_TIMEOUT = 10 * 60
+FRAGMENT_TIMEOUT = SOFT_TIMEOUT + 60
+LOCK_TIMEOUT = 10
+
+
+def card_versions(teacher_ids):
+    """
+    Return current card versions.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+
+    Returns:
+        dict: Mapping of teacher id to version token.
+    """
+    return page_versions(teacher_ids)[1]
+
+
+def page_versions(teacher_ids):
+    """
+    Return the catalog version and card versions with one query.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+
+    Returns:
+        tuple: Catalog version and a mapping of teacher id to card version.
+    """
+    keys = {VERSION_KEY.format(teacher_id=pk): pk for pk in teacher_ids}
+    versions = current_versions([CATALOG_VERSION_KEY, *keys])
+    return versions[CATALOG_VERSION_KEY], {keys[key]: versions[key] for key in keys}
+
+
+def catalog_version():
+    """
+    Return the version of the catalog as a whole.
+
+    Returns:
+        int: Version token that changes whenever any card does.
+    """
+    return current_version(CATALOG_VERSION_KEY)
+
+
+def bump_card_versions(teacher_ids):
+    """
+    Invalidate cached cards of the given teachers once the transaction commits.
+
+    Args:
+        teacher_ids: Iterable of TeacherProfile ids.
+    """
+    keys = {VERSION_KEY.format(teacher_id=pk) for pk in teacher_ids}
+    if keys:
+        bump_versions({*keys, CATALOG_VERSION_KEY})
+
+
+def cached_card(teacher_id, version, render):
+    """
+    Return the cached card fragment, rebuilding it at most once at a time.
+
+    Args:
+        teacher_id: TeacherProfile id.
+        version: Card version from ``card_versions``.
+        render: Callable returning the fragment HTML.
+
+    Returns:
+        str: Fragment HTML.
+    """
+    key = FRAGMENT_KEY.format(teacher_id=teacher_id, version=version)
+    cached = cache.get(key)
+    if cached is not None:
+        html, soft_expiry = cached
+        if soft_expiry > time.time():
+            return html
+
+    lock = LOCK_KEY.format(teacher_id=teacher_id, version=version)
+    if not cache.add(lock, 1, LOCK_TIMEOUT):
+        # Someone else is rebuilding: serve the stale copy if there is one.
+        return cached[0] if cached is not None else render()
+
+    try:
+        html = render()
+        cache.set(key, (html, time.time() + SOFT_TIMEOUT), FRAGMENT_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return html
@@ -0,0 +1,88 @@
+"""Teacher catalog filtering shared by the HTML views and the JSON API."""
+
+from typing import NamedTuple, Optional
+
+from profiles.models import TeacherProfile
+from profiles.search import search_teachers
+
+# Keyset orderings; each ends with a unique key. Names and availability
+# (the maintained ``free_slots`` column) are backed by indexes. Relevance is
+# the exception: the rank is computed per row, so a page sorts all teachers
+# matching the query, which the full-text index keeps to a small set.
+CATALOG_SORTS = {
+    'name': ['sort_last_name', 'sort_first_name', 'user_id'],
+    'availability': ['-free_slots', 'id'],
+    'relevance': ['-search_rank', 'id'],
+}
+
+
+class CatalogQuery(NamedTuple):
+    """Filtered teachers and the normalized filter values."""
+
+    teachers: object
+    department_id: Optional[str]
+    interest_id: Optional[str]
+    query: str
+    sort: str
+
+
+def restricts_to_department(student_profile):
+    """Check whether a student may only see teachers of their own department."""
+    return bool(
+        student_profile is not None
+        and student_profile.year_of_study in [3, 4]
+        and student_profile.department_id
+    )
+
+
+def _id_param(params, name):
+    """Return a numeric id parameter, or None when it is missing or malformed."""
+    value = (params.get(name) or '').strip()
+    return value if value.isdigit() else None
+
+
+def filter_catalog(params, student_profile=None):
+    """
+    Filter approved teachers by catalog parameters.
+
+    Filters:
+    - By department (``department``, optional)
+    - By scientific interest (``interest``, optional)
+    - By free-text query ``q`` over bios, interests and slot topics (optional, ranked)
+    - 3rd/4th year students: only teachers from their department
+
+    Args:
+        params: Query parameters (``request.GET``).
+        student_profile: Profile of the student browsing the catalog, if any.
+
+    Returns:
+        CatalogQuery: Unpaginated teachers and the effective sort key.
+    """
+    teachers = TeacherProfile.objects.filter(is_approved=True)
+
+    department_id = _id_param(params, 'department')
+    if department_id:
+        teachers = teachers.filter(department_id=department_id)
+
+    interest_id = _id_param(params, 'interest')
+    if interest_id:
+        # Filter through the M2M table instead of joining it, so rows are not
+        # duplicated and the slot counters stay correct without DISTINCT.
+        teachers = teachers.filter(
+            id__in=TeacherProfile.scientific_interests.through.objects.filter(
+                scientificinterest_id=interest_id,
+            ).values('teacherprofile_id')
+        )
+
+    if restricts_to_department(student_profile):
+        teachers = teachers.filter(department_id=student_profile.department_id)
+
+    query = (params.get('q') or '').strip()
+    if query:
+        teachers = search_teachers(teachers, query)
+
+    sort = params.get('sort')
+    if sort not in CATALOG_SORTS or (sort == 'relevance' and not query):
+        sort = 'relevance' if query else 'name'
+
+    return CatalogQuery(teachers, department_id, interest_id, query, sort)
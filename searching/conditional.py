@@ -0,0 +1,154 @@
+"""Validators for conditional GET (ETag / Last-Modified) on catalog pages.
+
+The catalog validator is the catalog version (see searching.cards), one
+primary-key lookup in the database table of versions, so changes made by the
+job worker or another gunicorn worker are seen at once; a teacher page is
+validated with a couple of aggregate queries over that teacher's rows. An unchanged page is answered
+with 304 before the view runs. Validators also cover the viewer: user, course topic, the
+CSRF secret embedded in forms and the student's own requests. Pages with
+pending flash messages are never treated as unchanged.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from profiles.models import TeacherProfile
+
+from .cards import catalog_version
+from .models import Slot, SlotRequest
+
+
+def _stamp(aggregate):
+    """Return ``(latest, count)`` of an aggregate with ``latest`` and ``count`` keys."""
+    return aggregate['latest'], aggregate['count']
+
+
+def _viewer_state(request):
+    """Return validator parts and change time that depend on who is looking at the page."""
+    student = request.user.student_profile
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    requests = SlotRequest.objects.filter(student=student).aggregate(
+        latest=Max('updated_at'), count=Count('id'),
+    )
+    parts = [
+        request.user.pk,
+        student.year_of_study,
+        student.department_id,
+        # Recommendations on the catalog follow the course topic.
+        hashlib.sha1((student.course_topic or '').encode()).hexdigest()[:12],
+        hashlib.sha1(csrf.encode()).hexdigest()[:12],
+        *_stamp(requests),
+    ]
+    return parts, [requests['latest']]
+
+
+def catalog_state(request):
+    """
+    Collect what the teacher catalog page depends on.
+
+    Returns:
+        tuple: Validator parts and the latest change time.
+    """
+    version = catalog_version()
+    # Versions are ``time_ns`` values of the last change, 0 before the first one.
+    changed = datetime.fromtimestamp(version / 1e9, tz=timezone.utc) if version else None
+    return ['catalog', request.get_full_path(), version], [changed]
+
+
+def teacher_detail_state(request, teacher_id):
+    """
+    Collect what a teacher detail page depends on.
+
+    Returns:
+        tuple: Validator parts and the latest change time.
+    """
+    teacher = TeacherProfile.objects.filter(pk=teacher_id).values_list('updated_at', flat=True).first()
+    slots = Slot.objects.filter(teacher_id=teacher_id).aggregate(latest=Max('updated_at'), count=Count('id'))
+    parts = ['teacher', teacher_id, teacher, *_stamp(slots)]
+    return parts, [teacher, slots['latest']]
+
+
+def _validators(request, state, *args, **kwargs):
+    """
+    Compute ``(etag, last_modified)`` once per request.
+
+    Returns ``(None, None)`` when the page must be rendered anyway.
+    """
+    cached = getattr(request, '_page_validators', None)
+    if cached is not None:
+        return cached
+
+    if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+        request._page_validators = (None, None)
+        return request._page_validators
+
+    parts, times = state(request, *args, **kwargs)
+    viewer_parts, viewer_times = _viewer_state(request)
+    parts, times = parts + viewer_parts, times + viewer_times
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    times = [t for t in times if t is not None]
+    request._page_validators = (f'W/"{digest}"', max(times) if times else None)
+    return request._page_validators
+
+
+def _not_modified(request, etag, last_modified):
+    """Return a 304/412 response if the request's preconditions allow it, else ``None``."""
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def _finish(request, response, etag, last_modified):
+    """Add validators and cache headers to a page response, like ``condition()`` does."""
+    # Redirects and errors must not be revalidated as if they were the page.
+    if request.method in ('GET', 'HEAD') and response.status_code == 200:
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        if etag:
+            response.headers.setdefault('ETag', etag)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(state):
+    """
+    Answer unchanged pages with 304 Not Modified.
+
+    Must be applied after login and role checks. Responses are marked
+    private and revalidated on every request. Works with sync and async
+    views; for async views the validators are computed in a worker thread.
+
+    Args:
+        state: Callable ``(request, *args, **kwargs) -> (parts, times)``.
+
+    Returns:
+        callable: View decorator.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                etag, last_modified = await sync_to_async(_validators)(request, state, *args, **kwargs)
+                response = _not_modified(request, etag, last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(request, response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag, last_modified = _validators(request, state, *args, **kwargs)
+            response = _not_modified(request, etag, last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(request, response, etag, last_modified)
+        return wrapper
+    return decorator
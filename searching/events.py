@@ -0,0 +1,282 @@
+"""Live events for the request pages, delivered as Server-Sent Events.
+
+Write paths call ``publish`` inside their transaction; the event is sent
+after commit. Every worker keeps an in-process hub that fans events out to
+the asyncio queues of its open streams. With PostgreSQL, events travel
+between workers through ``NOTIFY``: each worker has one listener thread on a
+dedicated connection that feeds its hub. Other databases use the hub of the
+publishing process only, which is enough for a single worker.
+
+Streams hold no database connection while idle, so an ASGI worker can keep
+thousands of them open. Each stream ends after ``EVENTS_STREAM_SECONDS`` and
+the browser reconnects, which also drops streams of clients that left
+without the server noticing.
+"""
+
+import asyncio
+import json
+import logging
+import selectors
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections, transaction
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'mentorion_events'
+STUDENTS = 'students'
+QUEUE_SIZE = 100
+# NOTIFY payloads are limited to 8000 bytes, so long recipient lists are split.
+RECIPIENTS_PER_NOTIFY = 200
+
+# Exported with the other metrics by mentorion.metrics.
+OPEN_STREAMS = Gauge('mentorion_event_streams', 'Open live event streams', multiprocess_mode='livesum')
+
+# Streams of one worker that may be authenticating (and holding a database
+# connection) at the same time.
+handshake_slots = asyncio.Semaphore(getattr(settings, 'EVENTS_HANDSHAKE_CONCURRENCY', 10))
+
+
+def user_key(user_id):
+    """Return the hub key of a user's own events."""
+    return f'user:{user_id}'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class Subscription:
+    """Queue of one open stream, fed from any thread."""
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def _put(self, message):
+        if self.queue.full():
+            # A stalled client loses its oldest events instead of growing memory.
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        """Schedule ``message`` on the stream's event loop."""
+        self.loop.call_soon_threadsafe(self._put, message)
+
+
+class Hub:
+    """In-process fan-out from hub keys to open streams."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, keys):
+        subscription = Subscription(keys)
+        with self._lock:
+            for key in subscription.keys:
+                self._subscribers[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for key in subscription.keys:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
+
+    def dispatch(self, message):
+        """Deliver a message to every stream subscribed to one of its keys."""
+        with self._lock:
+            targets = set().union(*(self._subscribers.get(key, ()) for key in message['to']))
+        for subscription in targets:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # The stream's loop is already closed.
+                self.unsubscribe(subscription)
+
+    def __len__(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values()))
+
+
+hub = Hub()
+
+
+class LocalBackend:
+    """Deliver events to the streams of the publishing process."""
+
+    def send(self, message):
+        hub.dispatch(message)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PostgresBackend:
+    """Deliver events to all workers through PostgreSQL LISTEN/NOTIFY."""
+
+    def __init__(self):
+        self._listener = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        # Set while the listener connection is subscribed to the channel.
+        self.listening = threading.Event()
+
+    def send(self, message):
+        to = message['to']
+        with connections['default'].cursor() as cursor:
+            for start in range(0, max(len(to), 1), RECIPIENTS_PER_NOTIFY):
+                part = {**message, 'to': to[start:start + RECIPIENTS_PER_NOTIFY]}
+                cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, json.dumps(part, ensure_ascii=False)])
+
+    def start(self):
+        """Start the listener thread of this process once."""
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._stopping.clear()
+                self._listener = threading.Thread(target=self._listen, name='events-listener', daemon=True)
+                self._listener.start()
+
+    def stop(self):
+        """Stop the listener thread and close its connection."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        self._stopping.set()
+        # Wake the listener up with an event nobody is subscribed to.
+        self.send({'event': 'stop', 'data': {}, 'to': []})
+        listener.join(timeout=5)
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            wrapper = connections.create_connection('default')
+            try:
+                wrapper.ensure_connection()
+                raw = wrapper.connection
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                self.listening.set()
+                # select() cannot watch descriptors above 1024, which a worker
+                # holding thousands of streams easily reaches.
+                with selectors.DefaultSelector() as selector:
+                    selector.register(raw, selectors.EVENT_READ)
+                    while not self._stopping.is_set():
+                        if not selector.select(30):
+                            continue
+                        raw.poll()
+                        while raw.notifies:
+                            notify = raw.notifies.pop(0)
+                            hub.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Events listener lost its connection, reconnecting")
+                time.sleep(1)
+            finally:
+                self.listening.clear()
+                wrapper.close()
+
+
+_backends = {}
+
+
+def backend():
+    """
+    Return the configured backend.
+
+    ``EVENTS_BACKEND`` is ``local``, ``postgres`` or ``auto`` (PostgreSQL when
+    the default database is PostgreSQL).
+    """
+    name = _setting('EVENTS_BACKEND', 'auto')
+    if name == 'auto':
+        name = 'postgres' if connections['default'].vendor == 'postgresql' else 'local'
+    if name not in _backends:
+        _backends[name] = PostgresBackend() if name == 'postgres' else LocalBackend()
+    return _backends[name]
+
+
+def publish(event, data, user_ids=(), students=False):
+    """
+    Send an event to users once the current transaction commits.
+
+    Args:
+        event: Event name, e.g. ``request_created``.
+        data: JSON-serializable payload; ``message`` is shown to the user.
+        user_ids: Ids of users that receive the event.
+        students: Also send the event to every connected student.
+    """
+    to = [user_key(pk) for pk in set(user_ids)]
+    if students:
+        to.append(STUDENTS)
+    if not to:
+        return
+    message = {'event': event, 'data': data, 'to': to}
+    transaction.on_commit(lambda: backend().send(message))
+
+
+def publish_slots_freed(teacher_ids):
+    """
+    Tell all connected students that teachers have free slots again.
+
+    Args:
+        teacher_ids: Ids of teachers whose slots were released or added.
+    """
+    teacher_ids = sorted(set(teacher_ids))
+    if teacher_ids:
+        publish('slot_freed', {'teacher_ids': teacher_ids, 'message': "З'явилися вільні слоти"}, students=True)
+
+
+def format_event(message):
+    """Encode a hub message as an SSE frame."""
+    return f"event: {message['event']}\ndata: {json.dumps(message['data'], ensure_ascii=False)}\n\n"
+
+
+async def stream(keys):
+    """
+    Yield SSE frames for the given hub keys until the stream lifetime is over.
+
+    Args:
+        keys: Hub keys, e.g. ``user_key(user.pk)`` and ``STUDENTS``.
+
+    Yields:
+        str: SSE frames and keep-alive comments.
+    """
+    heartbeat = _setting('EVENTS_HEARTBEAT_SECONDS', 20)
+    deadline = time.monotonic() + _setting('EVENTS_STREAM_SECONDS', 300)
+    backend().start()
+    subscription = hub.subscribe(keys)
+    OPEN_STREAMS.inc()
+    try:
+        yield f"retry: {_setting('EVENTS_RETRY_MS', 5000)}\n\n"
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+            else:
+                yield format_event(message)
+    finally:
+        OPEN_STREAMS.dec()
+        hub.unsubscribe(subscription)
+
+
+def release_connections():
+    """
+    Close this thread's database connections before a long-lived stream starts.
+
+    Connections inside a transaction (e.g. in tests) are left alone.
+    """
+    for conn in connections.all(initialized_only=True):
+        if not conn.in_atomic_block:
+            conn.close()
@@ -0,0 +1,111 @@
+"""Facet counts for the department and interest filters of the teacher catalog.
+
+Each facet is counted with every current filter applied except its own, so
+an option shows how many teachers the catalog would list after choosing it.
+A facet is one grouped aggregate query that counts approved teachers and
+teachers with free slots per option.
+
+Counts are cached per filter combination under the catalog version (see
+searching.cards), which moves whenever any teacher card changes, so a
+cached entry is never served after the data behind it changed.
+"""
+
+import hashlib
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef
+
+from .cards import catalog_version
+from .catalog import filter_catalog, restricts_to_department
+from .models import Slot
+
+FACETS_KEY = 'searching:facets:{version}:{digest}'
+FACETS_TIMEOUT = 10 * 60
+
+
+class FacetOption(NamedTuple):
+    """A filter option with its counts."""
+
+    id: int
+    name: str
+    teachers: int
+    available: int
+
+
+def _teachers(student_profile, department_id=None, interest_id=None, query=''):
+    """Return catalog teachers for the given filter values."""
+    params = {'department': department_id or '', 'interest': interest_id or '', 'q': query}
+    return filter_catalog(params, student_profile).teachers
+
+
+def _group_counts(teachers, field):
+    """
+    Count teachers and teachers with free slots per value of ``field``.
+
+    Returns:
+        dict: Mapping of the field value to ``(teachers, available)``.
+    """
+    has_free_slot = Exists(Slot.objects.filter(teacher_id=OuterRef('pk'), is_available=True, is_filled=False))
+    rows = (
+        teachers.filter(**{f'{field}__isnull': False})
+        .order_by()
+        .values(field)
+        .annotate(teachers=Count('pk'), available=Count('pk', filter=has_free_slot))
+        .values_list(field, 'teachers', 'available')
+    )
+    return {value: (count, available) for value, count, available in rows}
+
+
+def _compute(student_profile, department_id, interest_id, query):
+    facets = {
+        'interests': _group_counts(
+            _teachers(student_profile, department_id=department_id, query=query), 'scientific_interests',
+        ),
+    }
+    # 3rd/4th year students see their own department only, so it has no facet.
+    if not restricts_to_department(student_profile):
+        facets['departments'] = _group_counts(
+            _teachers(student_profile, interest_id=interest_id, query=query), 'department_id',
+        )
+    return facets
+
+
+def facet_counts(student_profile, department_id=None, interest_id=None, query='', version=None):
+    """
+    Return cached facet counts for the current catalog filters.
+
+    Args:
+        student_profile: Profile of the student browsing the catalog.
+        department_id: Selected department id, if any.
+        interest_id: Selected scientific interest id, if any.
+        query: Free-text query.
+        version: Catalog version, if the caller has already read it.
+
+    Returns:
+        dict: ``interests`` and, unless the student is restricted to their
+        department, ``departments``: each a mapping of option id to
+        ``(teachers, available)``.
+    """
+    restricted = student_profile.department_id if restricts_to_department(student_profile) else None
+    filters = (department_id, interest_id, query.lower(), restricted)
+    key = FACETS_KEY.format(
+        version=catalog_version() if version is None else version, digest=hashlib.sha1(repr(filters).encode()).hexdigest(),
+    )
+    return cache.get_or_set(
+        key, lambda: _compute(student_profile, department_id, interest_id, query), FACETS_TIMEOUT,
+    )
+
+
+def facet_options(objects, counts):
+    """
+    Combine reference objects with their facet counts.
+
+    Args:
+        objects: Departments or interests with ``pk`` and ``name``.
+        counts: Mapping of option id to ``(teachers, available)``.
+
+    Returns:
+        list: ``FacetOption`` per object, zero counts for missing ones.
+    """
+    return [FacetOption(obj.pk, obj.name, *counts.get(obj.pk, (0, 0))) for obj in objects]
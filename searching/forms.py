@@ -0,0 +1,81 @@
+"""Forms for allocation round preferences."""
+
+from django import forms
+
+
+def _full_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.email
+
+
+class StudentPreferenceForm(forms.Form):
+    """
+    Ranked list of teachers submitted by a student in an allocation round.
+
+    One select per place in the list; only the first one is required.
+    """
+
+    def __init__(self, *args, teachers, max_choices, **kwargs):
+        super().__init__(*args, **kwargs)
+        choices = [('', '— Не обрано —')] + [(teacher.pk, _full_name(teacher.user)) for teacher in teachers]
+        self.max_choices = max_choices
+        for place in range(1, max_choices + 1):
+            self.fields[f'choice_{place}'] = forms.TypedChoiceField(
+                choices=choices,
+                coerce=int,
+                empty_value=None,
+                required=place == 1,
+                label=f"{place}-й вибір",
+            )
+
+    def clean(self):
+        """
+        Collect the chosen teachers in order of preference.
+
+        Raises:
+            ValidationError: If a teacher was chosen more than once.
+        """
+        cleaned_data = super().clean()
+        teacher_ids = [
+            cleaned_data[f'choice_{place}'] for place in range(1, self.max_choices + 1)
+            if cleaned_data.get(f'choice_{place}')
+        ]
+        if len(set(teacher_ids)) != len(teacher_ids):
+            raise forms.ValidationError("Кожного викладача можна обрати лише один раз.")
+        cleaned_data['teacher_ids'] = teacher_ids
+        return cleaned_data
+
+
+class TeacherRankingForm(forms.Form):
+    """
+    Optional ranking of applicants submitted by a teacher in an allocation round.
+
+    Each applicant gets a number, 1 is the most preferred; applicants
+    without a number are ordered by lot after the ranked ones.
+    """
+
+    def __init__(self, *args, applicants, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.applicants = list(applicants)
+        for student in self.applicants:
+            self.fields[f'student_{student.pk}'] = forms.IntegerField(
+                min_value=1,
+                required=False,
+                label=_full_name(student.user),
+                widget=forms.NumberInput(attrs={'min': 1}),
+            )
+
+    def ranked_student_ids(self):
+        """
+        Return the ranked applicants, most preferred first.
+
+        Equal numbers keep the order of the applicant list.
+
+        Returns:
+            list: StudentProfile ids.
+        """
+        ranked = [
+            (self.cleaned_data[f'student_{student.pk}'], position, student.pk)
+            for position, student in enumerate(self.applicants)
+            if self.cleaned_data.get(f'student_{student.pk}') is not None
+        ]
+        return [pk for _, _, pk in sorted(ranked)]
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from searching.plans import DEFAULT_MIN_ROWS, analyze_tables, check_plans
+
+
+class Command(BaseCommand):
+    help = 'Виконує EXPLAIN для гарячих запитів до слотів і запитів та шукає послідовні сканування великих таблиць'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS,
+                            help='Менші таблиці можна сканувати послідовно')
+        parser.add_argument('--analyze', action='store_true', help='Спершу оновити статистику планувальника')
+        parser.add_argument('--verbose-plans', action='store_true', help='Показати плани всіх запитів')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if options['analyze']:
+            analyze_tables(options['database'])
+        checks = check_plans(options['min_rows'], options['database'])
+        if not checks:
+            raise CommandError('Немає даних для перевірки або база даних не підтримується')
+
+        failed = [check for check in checks if not check.ok]
+        for check in checks:
+            if check.ok:
+                self.stdout.write(self.style.SUCCESS(f'OK    {check.name}'))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f"SCAN  {check.name}: послідовне сканування {', '.join(check.sequential_scans)}"
+                ))
+            if not check.ok or options['verbose_plans']:
+                self.stdout.write(check.plan)
+        if failed:
+            raise CommandError(f'Запитів із послідовним скануванням: {len(failed)}')
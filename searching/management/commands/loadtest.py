@@ -0,0 +1,284 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_SECRET_LENGTH
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from profiles.models import StudentProfile, TeacherProfile
+from searching.models import Slot, SlotRequest
+
+DEFAULT_MIX = 'filter_teachers=60,teacher_detail=25,send_request=10,approve_request=5'
+
+
+def percentile(values, q):
+    """Return the ``q``-th percentile (0-100) of ``values`` by linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    """Return p50/p95/p99/mean/max of ``values`` rounded to 0.01."""
+    if not values:
+        return {}
+    return {
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'mean': round(statistics.fmean(values), 2),
+        'max': round(max(values), 2),
+    }
+
+
+def request_host():
+    """Return a host name accepted by ``ALLOWED_HOSTS`` for in-process requests."""
+    return next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+
+
+def parse_mix(value):
+    """
+    Parse a weighted scenario mix like ``filter_teachers=60,teacher_detail=40``.
+
+    Raises:
+        CommandError: If a scenario is unknown or a weight is not a positive integer.
+    """
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in Scenarios.names:
+            raise CommandError(f"Невідомий сценарій: {name}. Доступні: {', '.join(Scenarios.names)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise CommandError(f"Некоректна вага для {name}: {weight!r}")
+        if mix[name] <= 0:
+            raise CommandError(f"Вага для {name} має бути додатною")
+    return mix
+
+
+class HttpClient:
+    """
+    Minimal HTTP counterpart of the test ``Client`` for a running server.
+
+    The session is created in the database the same way ``force_login``
+    does it, so the server must use the same database as this command.
+    """
+
+    def __init__(self, base_url, user):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        client = Client()
+        client.force_login(user)
+        csrf = get_random_string(CSRF_SECRET_LENGTH, CSRF_ALLOWED_CHARS)
+        self.session.cookies.set(settings.SESSION_COOKIE_NAME, client.cookies[settings.SESSION_COOKIE_NAME].value)
+        self.session.cookies.set(settings.CSRF_COOKIE_NAME, csrf)
+        self.session.headers['X-CSRFToken'] = csrf
+
+    def get(self, url, data):
+        return self.session.get(self.base_url + url, params=data, allow_redirects=False)
+
+    def post(self, url, data):
+        return self.session.post(self.base_url + url, data=data, allow_redirects=False)
+
+
+class Scenarios:
+    """
+    Request generators for the registration-day mix.
+
+    Each scenario returns ``(user, method, url, data)``. Users and target rows
+    are sampled from ids loaded once, outside the measured section.
+    """
+
+    names = ('filter_teachers', 'teacher_detail', 'send_request', 'approve_request')
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.lock = threading.Lock()
+        self.students = list(
+            StudentProfile.objects.select_related('user').values_list(
+                'user_id', 'department_id', 'year_of_study',
+            )
+        )
+        self.teachers = list(TeacherProfile.objects.filter(is_approved=True).values_list('pk', 'department_id'))
+        self.free_slots = list(Slot.objects.filter(is_available=True, is_filled=False).values_list(
+            'pk', 'teacher__department_id',
+        ))
+        self.pending = list(SlotRequest.objects.filter(status='pending').values_list('pk', 'slot__teacher__user_id'))
+        self.rng.shuffle(self.pending)
+        if not self.students or not self.teachers:
+            raise CommandError("Немає студентів або підтверджених викладачів. Запустіть generate_dataset.")
+
+    def _student(self):
+        with self.lock:
+            return self.rng.choice(self.students)
+
+    def filter_teachers(self):
+        user_id, _, _ = self._student()
+        with self.lock:
+            params = self.rng.choice([{}, {'sort': 'availability'}, {'q': 'навчання'}])
+        return user_id, 'get', reverse('searching:filter_teachers'), params
+
+    def teacher_detail(self):
+        user_id, department_id, year = self._student()
+        with self.lock:
+            candidates = [t for t in self.teachers if year < 3 or t[1] == department_id] or self.teachers
+            teacher_id = self.rng.choice(candidates)[0]
+        return user_id, 'get', reverse('searching:teacher_detail', args=[teacher_id]), {}
+
+    def send_request(self):
+        user_id, department_id, year = self._student()
+        with self.lock:
+            candidates = [s for s in self.free_slots if year < 3 or s[1] == department_id] or self.free_slots
+            slot_id = self.rng.choice(candidates)[0]
+        url = reverse('searching:send_request', args=[slot_id])
+        return user_id, 'post', url, {'slot_id': slot_id, 'message': 'Навантажувальний тест'}
+
+    def approve_request(self):
+        with self.lock:
+            if not self.pending:
+                return None
+            request_id, teacher_user_id = self.pending.pop()
+        return teacher_user_id, 'get', reverse('searching:approve_request', args=[request_id]), {}
+
+
+class Command(BaseCommand):
+    help = (
+        'Відтворює зважену суміш запитів реєстраційного дня (filter_teachers, teacher_detail, '
+        'send_request, approve_request) і друкує латентність, пропускну здатність та кількість SQL у JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Загальна кількість запитів')
+        parser.add_argument('--concurrency', type=int, default=8, help='Кількість паралельних потоків')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Ваги сценаріїв, напр. "%s"' % DEFAULT_MIX)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для JSON-звіту (за замовчуванням stdout)')
+        parser.add_argument(
+            '--base-url',
+            help='Надсилати запити по HTTP на запущений сервер (напр. http://127.0.0.1:8000) '
+                 'замість обробки в процесі; SQL-запити в цьому режимі не рахуються',
+        )
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        rng = random.Random(options['seed'])
+        scenarios = Scenarios(rng)
+        plan = rng.choices(list(mix), weights=list(mix.values()), k=options['requests'])
+
+        host = request_host()
+        base_url = options['base_url']
+        local = threading.local()
+        results = defaultdict(lambda: {'latency': [], 'queries': [], 'statuses': defaultdict(int), 'errors': 0})
+        results_lock = threading.Lock()
+
+        def client_for(user_id):
+            clients = getattr(local, 'clients', None)
+            if clients is None:
+                clients = local.clients = {}
+            if user_id not in clients:
+                if base_url:
+                    client = HttpClient(base_url, self._user(user_id))
+                else:
+                    client = Client(HTTP_HOST=host)
+                    client.force_login(self._user(user_id))
+                clients[user_id] = client
+            return clients[user_id]
+
+        def run(name):
+            try:
+                call = getattr(scenarios, name)()
+                if call is None:
+                    return
+                user_id, method, url, data = call
+                client = client_for(user_id)
+
+                started = time.perf_counter()
+                with ExitStack() as stack:
+                    # Count queries on every alias, including a read replica.
+                    captured = [] if base_url else [
+                        stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()
+                    ]
+                    try:
+                        response = getattr(client, method)(url, data)
+                        status = response.status_code
+                    except Exception:
+                        status = 'exception'
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                with results_lock:
+                    entry = results[name]
+                    entry['latency'].append(elapsed_ms)
+                    if not base_url:
+                        entry['queries'].append(sum(len(queries) for queries in captured))
+                    entry['statuses'][str(status)] += 1
+                    if status == 'exception' or status >= 500:
+                        entry['errors'] += 1
+            finally:
+                connections.close_all()
+
+        started_at = timezone.now()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(run, plan))
+        duration = time.perf_counter() - started
+
+        report = self._report(results, started_at, duration, options)
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                fh.write(payload)
+            self.stderr.write(self.style.SUCCESS(f"Звіт збережено у {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    @staticmethod
+    def _user(user_id):
+        from users.models import User
+
+        return User.objects.get(pk=user_id)
+
+    @staticmethod
+    def _report(results, started_at, duration, options):
+        all_latency = [value for entry in results.values() for value in entry['latency']]
+        total = len(all_latency)
+        return {
+            'started_at': started_at.isoformat(),
+            'duration_s': round(duration, 3),
+            'target': options['base_url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'mix': options['mix'],
+            'requests': total,
+            'errors': sum(entry['errors'] for entry in results.values()),
+            'throughput_rps': round(total / duration, 2) if duration else None,
+            'latency_ms': summarize(all_latency),
+            'views': {
+                name: {
+                    'requests': len(entry['latency']),
+                    'errors': entry['errors'],
+                    'status_codes': dict(entry['statuses']),
+                    'throughput_rps': round(len(entry['latency']) / duration, 2) if duration else None,
+                    'latency_ms': summarize(entry['latency']),
+                    'sql_queries': summarize(entry['queries']),
+                }
+                for name, entry in sorted(results.items())
+            },
+        }
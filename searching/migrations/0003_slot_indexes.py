@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searching', '0002_slot_topic'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='slot',
+            name='topic',
+            field=models.CharField(blank=True, max_length=500, null=True, verbose_name='Тема курсової'),
+        ),
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(fields=['teacher', 'is_available', 'is_filled'], name='slot_teacher_avail_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slotrequest',
+            index=models.Index(fields=['slot', 'status', '-created_at'], name='slotrequest_slot_status_idx'),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2 on 2026-10-18 08:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_teacherprofile_updated_at'),
+        ('searching', '0003_slot_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllocationRound',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_choices', models.PositiveSmallIntegerField(default=5, verbose_name='Кількість виборів студента')),
+                ('status', models.CharField(choices=[('open', 'Прийом вподобань'), ('allocated', 'Розподілено')], default='open', max_length=20, verbose_name='Статус')),
+                ('summary', models.JSONField(blank=True, null=True, verbose_name='Результат')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Створено')),
+                ('allocated_at', models.DateTimeField(blank=True, null=True, verbose_name='Розподілено')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocation_rounds', to='profiles.department', verbose_name='Кафедра')),
+            ],
+            options={
+                'verbose_name': 'Раунд розподілу',
+                'verbose_name_plural': 'Раунди розподілу',
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Місце')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teacher_preferences', to='searching.allocationround', verbose_name='Раунд')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.studentprofile', verbose_name='Студент')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocation_preferences', to='profiles.teacherprofile', verbose_name='Викладач')),
+            ],
+            options={
+                'verbose_name': 'Вибір викладача',
+                'verbose_name_plural': 'Вибори викладачів',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentPreference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Місце')),
+                ('round', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_preferences', to='searching.allocationround', verbose_name='Раунд')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocation_preferences', to='profiles.studentprofile', verbose_name='Студент')),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='profiles.teacherprofile', verbose_name='Викладач')),
+            ],
+            options={
+                'verbose_name': 'Вибір студента',
+                'verbose_name_plural': 'Вибори студентів',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='teacherpreference',
+            constraint=models.UniqueConstraint(fields=('round', 'teacher', 'rank'), name='unique_teacher_preference_rank'),
+        ),
+        migrations.AddConstraint(
+            model_name='teacherpreference',
+            constraint=models.UniqueConstraint(fields=('round', 'teacher', 'student'), name='unique_teacher_preference'),
+        ),
+        migrations.AddIndex(
+            model_name='studentpreference',
+            index=models.Index(fields=['round', 'teacher'], name='studentpref_round_teacher_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentpreference',
+            constraint=models.UniqueConstraint(fields=('round', 'student', 'rank'), name='unique_student_preference_rank'),
+        ),
+        migrations.AddConstraint(
+            model_name='studentpreference',
+            constraint=models.UniqueConstraint(fields=('round', 'student', 'teacher'), name='unique_student_preference'),
+        ),
+        migrations.AddConstraint(
+            model_name='allocationround',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'open')), fields=('department',), name='unique_open_allocation_round'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-18 08:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_teacherterm'),
+        ('searching', '0004_allocation_rounds'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='slot',
+            options={'verbose_name': 'Слот', 'verbose_name_plural': 'Слоти'},
+        ),
+        migrations.AlterModelOptions(
+            name='slotrequest',
+            options={'verbose_name': 'Запит на слот', 'verbose_name_plural': 'Запити на слоти'},
+        ),
+        # New indexes first, so the foreign keys are never left unindexed.
+        migrations.AddIndex(
+            model_name='slot',
+            index=models.Index(condition=models.Q(('is_available', True), ('is_filled', False)), fields=['teacher', 'created_at', 'id'], name='slot_teacher_free_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='slotrequest',
+            index=models.Index(fields=['student', 'status'], name='slotrequest_student_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='slot',
+            name='teacher',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='profiles.teacherprofile', verbose_name='Викладач'),
+        ),
+        migrations.AlterField(
+            model_name='slotrequest',
+            name='slot',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='requests', to='searching.slot', verbose_name='Слот'),
+        ),
+        migrations.AlterField(
+            model_name='slotrequest',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='slot_requests', to='profiles.studentprofile', verbose_name='Студент'),
+        ),
+    ]
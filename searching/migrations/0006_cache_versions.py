@@ -0,0 +1,24 @@
+# Generated by Django 4.2 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('searching', '0005_slot_request_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('version', models.BigIntegerField(verbose_name='Версія')),
+            ],
+            options={
+                'verbose_name': 'Версія кешу',
+                'verbose_name_plural': 'Версії кешу',
+            },
+        ),
+    ]
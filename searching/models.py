@@ -21,10 +21,12 @@ class Slot(models.Model):
         updated_at: Timestamp of last update
     """
 
+    # Indexed by the composite indexes below, which all start with the teacher.
     teacher = models.ForeignKey(
         'profiles.TeacherProfile',
         on_delete=models.CASCADE,
         related_name='slots',
+        db_index=False,
         verbose_name="Викладач",
     )
     student = models.OneToOneField(
@@ -44,7 +46,57 @@ class Slot(models.Model):
     class Meta:
         verbose_name = "Слот"
         verbose_name_plural = "Слоти"
-        ordering = ['-created_at']
+        indexes = [
+            # Free-slot counters and availability sorting in the teacher catalog.
+            models.Index(fields=['teacher', 'is_available', 'is_filled'], name='slot_teacher_avail_idx'),
+            # Free slots of a teacher in creation order: detail page, API and allocation.
+            models.Index(
+                fields=['teacher', 'created_at', 'id'],
+                condition=models.Q(is_available=True, is_filled=False),
+                name='slot_teacher_free_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded topic and availability to detect changes on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_topic = instance.__dict__.get('topic')
+        # None means unknown, when the availability fields were deferred.
+        loaded = {'is_available', 'is_filled'} <= instance.__dict__.keys()
+        instance._loaded_free = instance._is_free() if loaded else None
+        return instance
+
+    def _is_free(self):
+        """Return True if students can request the slot, from the loaded field values."""
+        return bool(self.__dict__.get('is_available')) and not self.__dict__.get('is_filled', True)
+
+    def became_free(self):
+        """
+        Check whether the slot was saved free after being taken or unavailable.
+
+        Returns:
+            bool: True for new free slots and for slots that were released.
+        """
+        return self._is_free() and getattr(self, '_loaded_free', False) is False
+
+    def free_changed(self):
+        """
+        Check whether the slot was saved free after being taken, or the other way round.
+
+        Returns:
+            bool: True for new slots, when availability changed or is unknown.
+        """
+        return getattr(self, '_loaded_free', None) != self._is_free()
+
+    def topic_changed(self):
+        """
+        Check whether the topic differs from the value loaded from the database.
+
+        Returns:
+            bool: True for new slots with a topic or when the topic was edited.
+        """
+        return getattr(self, '_loaded_topic', None) != self.__dict__.get('topic')
 
     def clean(self):
         """
@@ -62,6 +114,8 @@ class Slot(models.Model):
         """Save slot after validation."""
         self.clean()
         super().save(*args, **kwargs)
+        self._loaded_topic = self.topic
+        self._loaded_free = self._is_free()
 
     def is_full(self):
         """
@@ -99,16 +153,19 @@ class SlotRequest(models.Model):
         ('cancelled', 'Скасовано'),
     ]
 
+    # Both foreign keys lead a composite index below.
     student = models.ForeignKey(
         'profiles.StudentProfile',
         on_delete=models.CASCADE,
         related_name='slot_requests',
+        db_index=False,
         verbose_name="Студент",
     )
     slot = models.ForeignKey(
         Slot,
         on_delete=models.CASCADE,
         related_name='requests',
+        db_index=False,
         verbose_name="Слот",
     )
     status = models.CharField(
@@ -124,7 +181,12 @@ class SlotRequest(models.Model):
     class Meta:
         verbose_name = "Запит на слот"
         verbose_name_plural = "Запити на слоти"
-        ordering = ['-created_at']
+        indexes = [
+            # Teacher request inbox: filter by slot and status, newest first.
+            models.Index(fields=['slot', 'status', '-created_at'], name='slotrequest_slot_status_idx'),
+            # A student's requests by status: sending, approving, topic changes.
+            models.Index(fields=['student', 'status'], name='slotrequest_student_status_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['student', 'slot'],
@@ -157,3 +219,164 @@ class SlotRequest(models.Model):
     def __str__(self):
         """Return string representation of request."""
         return f"Запит {self.student.user.email} -> {self.slot.teacher.user.email} ({self.get_status_display()})"
+
+
+class AllocationRound(models.Model):
+    """
+    Batch allocation of a department's free slots by stable matching.
+
+    While the round is open, students of the department rank teachers and
+    teachers may rank the students who chose them. Allocation assigns all
+    free slots at once, see ``searching.allocation``.
+
+    Attributes:
+        department: Department whose students and teachers take part
+        max_choices: Maximum number of teachers a student may rank
+        status: open or allocated
+        summary: JSON summary of the allocation run
+        created_at: Timestamp of round creation
+        allocated_at: Timestamp of the allocation run
+    """
+
+    STATUS_OPEN = 'open'
+    STATUS_ALLOCATED = 'allocated'
+
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Прийом вподобань'),
+        (STATUS_ALLOCATED, 'Розподілено'),
+    ]
+
+    department = models.ForeignKey(
+        'profiles.Department',
+        on_delete=models.CASCADE,
+        related_name='allocation_rounds',
+        verbose_name="Кафедра",
+    )
+    max_choices = models.PositiveSmallIntegerField(default=5, verbose_name="Кількість виборів студента")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN, verbose_name="Статус")
+    summary = models.JSONField(null=True, blank=True, verbose_name="Результат")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Створено")
+    allocated_at = models.DateTimeField(null=True, blank=True, verbose_name="Розподілено")
+
+    class Meta:
+        verbose_name = "Раунд розподілу"
+        verbose_name_plural = "Раунди розподілу"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['department'],
+                condition=models.Q(status='open'),
+                name='unique_open_allocation_round',
+            ),
+        ]
+
+    def __str__(self):
+        """Return string representation of round."""
+        return f"Раунд #{self.pk} ({self.department}, {self.get_status_display()})"
+
+
+class StudentPreference(models.Model):
+    """
+    Teacher ranked by a student in an allocation round.
+
+    Attributes:
+        round: AllocationRound the preference belongs to
+        student: Ranking student
+        teacher: Ranked teacher
+        rank: Position in the student's list, 1 is the first choice
+    """
+
+    round = models.ForeignKey(
+        AllocationRound,
+        on_delete=models.CASCADE,
+        related_name='student_preferences',
+        verbose_name="Раунд",
+    )
+    student = models.ForeignKey(
+        'profiles.StudentProfile',
+        on_delete=models.CASCADE,
+        related_name='allocation_preferences',
+        verbose_name="Студент",
+    )
+    teacher = models.ForeignKey(
+        'profiles.TeacherProfile',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Викладач",
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Місце")
+
+    class Meta:
+        verbose_name = "Вибір студента"
+        verbose_name_plural = "Вибори студентів"
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'student', 'rank'], name='unique_student_preference_rank'),
+            models.UniqueConstraint(fields=['round', 'student', 'teacher'], name='unique_student_preference'),
+        ]
+        indexes = [
+            # Applicants of a teacher in a round.
+            models.Index(fields=['round', 'teacher'], name='studentpref_round_teacher_idx'),
+        ]
+
+
+class TeacherPreference(models.Model):
+    """
+    Applicant ranked by a teacher in an allocation round.
+
+    Attributes:
+        round: AllocationRound the preference belongs to
+        teacher: Ranking teacher
+        student: Ranked student
+        rank: Position in the teacher's list, 1 is the most preferred
+    """
+
+    round = models.ForeignKey(
+        AllocationRound,
+        on_delete=models.CASCADE,
+        related_name='teacher_preferences',
+        verbose_name="Раунд",
+    )
+    teacher = models.ForeignKey(
+        'profiles.TeacherProfile',
+        on_delete=models.CASCADE,
+        related_name='allocation_preferences',
+        verbose_name="Викладач",
+    )
+    student = models.ForeignKey(
+        'profiles.StudentProfile',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Студент",
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Місце")
+
+    class Meta:
+        verbose_name = "Вибір викладача"
+        verbose_name_plural = "Вибори викладачів"
+        constraints = [
+            models.UniqueConstraint(fields=['round', 'teacher', 'rank'], name='unique_teacher_preference_rank'),
+            models.UniqueConstraint(fields=['round', 'teacher', 'student'], name='unique_teacher_preference'),
+        ]
+
+
+class CacheVersion(models.Model):
+    """
+    Version token of cached data, shared by every web and job process.
+
+    Cached values are keyed by these tokens (see searching.versions), so a
+    bump made by any process makes the old values unreachable everywhere.
+
+    Attributes:
+        key: Name of the cached data, e.g. ``searching:card-version:42``
+        version: ``time_ns`` of the last change
+    """
+
+    key = models.CharField(max_length=100, primary_key=True, verbose_name="Ключ")
+    version = models.BigIntegerField(verbose_name="Версія")
+
+    class Meta:
+        verbose_name = "Версія кешу"
+        verbose_name_plural = "Версії кешу"
+
+    def __str__(self):
+        """Return string representation of version."""
+        return f"{self.key} = {self.version}"
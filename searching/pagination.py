@@ -0,0 +1,128 @@
+"""Cursor (keyset) pagination for ordered querysets.
+
+Instead of OFFSET, each page continues after the sort key of the last row of
+the previous page, so a deep page costs the same as the first one when the
+ordering is backed by an index. The ordering must end with a unique key.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import List, NamedTuple, Optional
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded for the current ordering."""
+
+
+class KeysetPage(NamedTuple):
+    """One page of results and the cursor of the following page."""
+
+    items: List
+    next_cursor: Optional[str]
+
+    @property
+    def has_next(self):
+        """Check whether there is a page after this one."""
+        return self.next_cursor is not None
+
+
+def encode_cursor(values):
+    """Encode sort key values into an opaque URL-safe cursor."""
+    payload = [
+        {'dt': value.isoformat()} if isinstance(value, datetime.datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed, has the wrong number of keys
+            or a value that no sort key can hold.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+    if not isinstance(payload, list) or len(payload) != size:
+        raise InvalidCursor("Cursor does not match the ordering.")
+
+    values = []
+    for value in payload:
+        if isinstance(value, dict):
+            value = parse_datetime(value.get('dt') or '')
+            if value is None:
+                raise InvalidCursor("Invalid datetime in cursor.")
+        elif isinstance(value, bool) or not isinstance(value, (str, int, float, type(None))):
+            raise InvalidCursor("Invalid value in cursor.")
+        elif isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+            # Out of range for any integer column; PostgreSQL would fail the query.
+            raise InvalidCursor("Invalid number in cursor.")
+        values.append(value)
+    return values
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by a list of sort keys.
+
+    Args:
+        queryset: QuerySet to paginate. Sort keys must be fields or annotations.
+        ordering: Sort keys such as ``['-free_slots', 'id']``; the last one must be unique.
+        per_page: Number of rows per page.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.keys = [(key.lstrip('-'), key.startswith('-')) for key in self.ordering]
+
+    def _after(self, values):
+        """Build the lexicographic ``(k1, k2, ...) > (v1, v2, ...)`` filter."""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.keys):
+            step = Q(**{f'{name}__{"lt" if descending else "gt"}': values[i]})
+            for j, (prev_name, _) in enumerate(self.keys[:i]):
+                step &= Q(**{prev_name: values[j]})
+            condition |= step
+        # Implied by the above, but lets the database start the index scan at
+        # the cursor instead of filtering every earlier row.
+        name, descending = self.keys[0]
+        return Q(**{f'{name}__{"lte" if descending else "gte"}': values[0]}) & condition
+
+    def page(self, cursor=None):
+        """
+        Return the page following ``cursor`` (the first page if it is empty).
+
+        Raises:
+            InvalidCursor: If the cursor cannot be decoded or its values do
+                not fit the sort keys.
+        """
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            values = decode_cursor(cursor, len(self.keys))
+            try:
+                # Values are converted to the field types here, e.g. "abc" for an id.
+                queryset = queryset.filter(self._after(values))
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursor("Cursor values do not match the ordering.") from exc
+
+        rows = list(queryset[:self.per_page + 1])
+        if len(rows) <= self.per_page:
+            return KeysetPage(rows, None)
+
+        rows = rows[:self.per_page]
+        last = rows[-1]
+        return KeysetPage(rows, encode_cursor([getattr(last, name) for name, _ in self.keys]))
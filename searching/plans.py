@@ -0,0 +1,125 @@
+"""EXPLAIN checks for the hot Slot and SlotRequest queries.
+
+Every query a student or teacher hits on each page view is listed in
+``hot_queries`` with the same filters and ordering as the views use. The
+checks run ``EXPLAIN`` on them and report tables read by a sequential scan.
+Small tables are scanned sequentially on purpose by the planner, so a scan
+only counts as a regression when the table has at least ``min_rows`` rows.
+
+Plans are read from PostgreSQL and SQLite; other databases are not checked.
+"""
+
+import re
+from typing import NamedTuple
+
+from django.db import connections
+
+from profiles.models import StudentProfile
+
+from .models import Slot, SlotRequest
+
+# A few thousand rows fit in a few dozen pages, which PostgreSQL rightly
+# reads in one go instead of through an index.
+DEFAULT_MIN_ROWS = 10000
+
+_SEQUENTIAL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # "SCAN t USING INDEX i" reads a whole index, which is no better.
+    'sqlite': re.compile(r'\bSCAN (\w+)'),
+}
+
+
+class PlanCheck(NamedTuple):
+    """EXPLAIN result of one hot query."""
+
+    name: str
+    plan: str
+    # Tables above the size threshold that the plan scans sequentially.
+    sequential_scans: list
+
+    @property
+    def ok(self):
+        return not self.sequential_scans
+
+
+def hot_queries(using='default'):
+    """
+    Build the hot queries around sample rows of the database.
+
+    Args:
+        using: Database alias.
+
+    Returns:
+        dict: Query name to QuerySet; empty when there is no data to sample.
+    """
+    slot = (
+        Slot.objects.using(using).filter(is_available=True, is_filled=False)
+        .order_by('pk').values('pk', 'teacher_id').first()
+    )
+    student_id = StudentProfile.objects.using(using).order_by('pk').values_list('pk', flat=True).first()
+    if slot is None or student_id is None:
+        return {}
+
+    slots = Slot.objects.using(using)
+    requests = SlotRequest.objects.using(using)
+    return {
+        # Teacher detail page, API and ``available_slots_count``.
+        'teacher_free_slots': slots.filter(
+            teacher_id=slot['teacher_id'], is_available=True, is_filled=False,
+        ).order_by('-created_at', '-id'),
+        # Profile page, sending and approving requests.
+        'student_assigned_slot': slots.filter(student_id=student_id, is_filled=True),
+        # Sending a request and the student's profile page.
+        'student_pending_request': requests.filter(student_id=student_id, status='pending'),
+        # ``StudentProfile.can_change_topic``.
+        'student_approved_requests': requests.filter(student_id=student_id, status='approved'),
+        # Approving a request rejects the competing ones.
+        'slot_pending_requests': requests.filter(slot_id=slot['pk'], status='pending'),
+        # Teacher request inbox.
+        'teacher_pending_requests': requests.filter(
+            slot__teacher_id=slot['teacher_id'], status='pending',
+        ).order_by('-created_at', '-id'),
+    }
+
+
+def _table_sizes(connection, tables):
+    with connection.cursor() as cursor:
+        sizes = {}
+        for table in tables:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def analyze_tables(using='default'):
+    """Refresh planner statistics of the checked tables."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model in (Slot, SlotRequest, StudentProfile):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def check_plans(min_rows=DEFAULT_MIN_ROWS, using='default'):
+    """
+    EXPLAIN every hot query and find sequential scans of large tables.
+
+    Args:
+        min_rows: Tables with fewer rows may be scanned sequentially.
+        using: Database alias.
+
+    Returns:
+        list: ``PlanCheck`` per hot query; empty for unsupported databases.
+    """
+    connection = connections[using]
+    pattern = _SEQUENTIAL_SCAN.get(connection.vendor)
+    if pattern is None:
+        return []
+
+    checks = []
+    sizes = {}
+    for name, queryset in hot_queries(using).items():
+        plan = queryset.explain()
+        scanned = set(pattern.findall(plan))
+        sizes.update(_table_sizes(connection, scanned - sizes.keys()))
+        checks.append(PlanCheck(name, plan, sorted(table for table in scanned if sizes[table] >= min_rows)))
+    return checks
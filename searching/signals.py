@@ -0,0 +1,100 @@
+# searching/signals.py
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from profiles.models import Department, ScientificInterest, TeacherProfile
+
+from . import events
+from .cards import bump_card_versions
+from .models import Slot
+
+CARD_USER_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=TeacherProfile)
+def bump_card_on_teacher_save(sender, instance, **kwargs):
+    """
+    Invalidate the catalog card when the teacher profile changes.
+    """
+    bump_card_versions([instance.pk])
+
+
+@receiver(post_delete, sender=TeacherProfile)
+def bump_card_on_teacher_delete(sender, instance, **kwargs):
+    """
+    Move the catalog version when a teacher leaves the catalog.
+    """
+    bump_card_versions([instance.pk])
+
+
+@receiver(post_save, sender=Slot)
+@receiver(post_delete, sender=Slot)
+def bump_card_on_slot_save(sender, instance, **kwargs):
+    """
+    Invalidate the teacher's card when a slot changes, since it shows slot counters.
+    """
+    bump_card_versions([instance.teacher_id])
+
+
+@receiver(post_save, sender=Slot)
+def publish_slot_freed(sender, instance, **kwargs):
+    """
+    Notify students when a slot is added free or released.
+    """
+    if instance.became_free():
+        events.publish_slots_freed([instance.teacher_id])
+
+
+@receiver(m2m_changed, sender=TeacherProfile.scientific_interests.through)
+def bump_cards_on_interests_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalidate cards when teachers gain or lose scientific interests.
+    """
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_card_versions([instance.pk])
+        return
+
+    if action == 'pre_clear':
+        bump_card_versions(instance.teachers.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        bump_card_versions(pk_set or [])
+
+
+@receiver(post_save, sender=ScientificInterest)
+def bump_cards_on_interest_edit(sender, instance, created, **kwargs):
+    """
+    Invalidate cards of teachers with a renamed interest.
+    """
+    if not created:
+        bump_card_versions(instance.teachers.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=ScientificInterest)
+def bump_cards_on_interest_delete(sender, instance, **kwargs):
+    """
+    Invalidate cards of teachers that had a deleted interest.
+
+    Teachers are remembered by ``profiles.signals.remember_interest_teachers``.
+    """
+    bump_card_versions(getattr(instance, '_deleted_teacher_ids', []))
+
+
+@receiver(post_save, sender=Department)
+def bump_cards_on_department_rename(sender, instance, created, **kwargs):
+    """
+    Invalidate cards of the department's teachers.
+    """
+    if not created:
+        bump_card_versions(instance.teachers.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_card_on_name_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Invalidate the card when the teacher's name may have changed.
+    """
+    if created or (update_fields is not None and not CARD_USER_FIELDS & set(update_fields)):
+        return
+    bump_card_versions(TeacherProfile.objects.filter(user=instance).values_list('pk', flat=True))
@@ -0,0 +1,25 @@
+"""Background tasks for allocation rounds (see jobs.registry)."""
+
+from dataclasses import asdict
+
+from jobs.registry import task
+
+from .allocation import allocate_round
+
+
+@task('searching.allocate_round')
+def allocate_round_task(job, round_id):
+    """
+    Allocate the free slots of a round's department by stable matching.
+
+    Args:
+        job: JobContext of the running job.
+        round_id: Id of the AllocationRound.
+
+    Returns:
+        dict: Allocation summary.
+    """
+    summary = allocate_round(round_id)
+    job.set_total(summary.students)
+    job.progress(summary.students, force=True)
+    return asdict(summary)
@@ -0,0 +1,22 @@
+from django import template
+from django.template.loader import render_to_string
+
+from searching.cards import card_versions, cached_card
+
+register = template.Library()
+
+
+@register.simple_tag
+def teacher_card(teacher):
+    """
+    Render a cached catalog card for a teacher from ``TeacherProfile.objects.for_catalog()``.
+
+    Uses ``teacher.card_version`` when the view has loaded versions for the
+    whole page, otherwise looks the version up.
+    """
+    version = getattr(teacher, 'card_version', None)
+    if version is None:
+        version = card_versions([teacher.pk])[teacher.pk]
+    return cached_card(
+        teacher.pk, version, lambda: render_to_string('searching/_teacher_card.html', {'teacher': teacher}),
+    )
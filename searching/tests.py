@@ -1,3 +1,1687 @@
-from django.test import TestCase
+import asyncio
+import json
+import logging
+import os
+import pstats
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.http import HttpResponse
+from django.test import (
+    Client, LiveServerTestCase, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mentorion import db_routing, metrics, profiling, querycheck, tracing
+from profiles import reference
+from profiles.approval import approve_teachers
+from profiles.datasets import generate_dataset
+from profiles.models import Department, ScientificInterest, StudentProfile, TeacherProfile
+from profiles.slots import set_department_max_slots
+from searching import cards, events
+from searching import urls as searching_urls
+from searching.cards import card_versions
+from searching.facets import FacetOption, facet_counts
+from searching.allocation import AllocationError, allocate_round, save_student_preferences, save_teacher_ranking
+from searching.matching import UNMATCHED, blocking_pairs, deferred_acceptance
+from searching.plans import DEFAULT_MIN_ROWS, analyze_tables, check_plans, hot_queries
+from searching.models import AllocationRound, CacheVersion, Slot, SlotRequest
+from searching.pagination import encode_cursor
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def make_teacher(department, email, interests=(), max_slots=4, **extra):
+    """Create an approved teacher with slots and interests."""
+    user = User.objects.create_user(email=email, first_name="Іван", last_name=email.split('@')[0])
+    teacher = TeacherProfile.objects.create(
+        user=user, department=department, max_slots=max_slots, is_approved=True, **extra,
+    )
+    if interests:
+        teacher.scientific_interests.set(interests)
+    return teacher
+
+
+class FilterTeachersQueryTests(TestCase):
+    """The teacher catalog runs a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.interests = [
+            ScientificInterest.objects.create(name="Машинне навчання"),
+            ScientificInterest.objects.create(name="Бази даних"),
+        ]
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+
+    def _count_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('searching:filter_teachers'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_teachers(self):
+        for i in range(2):
+            make_teacher(self.department, f"small{i}@lnu.edu.ua", self.interests)
+        small, _ = self._count_queries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(10):
+                make_teacher(self.department, f"large{i}@lnu.edu.ua", self.interests)
+        large, response = self._count_queries()
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context['teachers']), 12)
+
+    def test_interest_filter_keeps_slot_counts(self):
+        teacher = make_teacher(self.department, "t@lnu.edu.ua", self.interests, max_slots=3)
+        _, response = self._count_queries(interest=self.interests[0].pk)
+        [card] = response.context['teachers']
+        self.assertEqual(card.pk, teacher.pk)
+        self.assertEqual(card.free_slot_count, 3)
+        self.assertEqual(card.slot_count, 3)
+
+
+class TeacherSearchTests(TestCase):
+    """Free-text search over bios, interests and slot topics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+
+    def _search(self, query):
+        response = self.client.get(reverse('searching:filter_teachers'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [teacher.pk for teacher in response.context['teachers']]
+
+    def test_matches_bio_interest_and_slot_topic(self):
+        by_bio = make_teacher(self.department, "bio@lnu.edu.ua", bio="Керую роботами з машинного навчання")
+        interest = ScientificInterest.objects.create(name="Комп'ютерний зір")
+        by_interest = make_teacher(self.department, "interest@lnu.edu.ua", [interest])
+        by_topic = make_teacher(self.department, "topic@lnu.edu.ua")
+        slot = by_topic.slots.first()
+        slot.topic = "Розпізнавання облич"
+        slot.save()
+        make_teacher(self.department, "other@lnu.edu.ua", bio="Історія математики")
+
+        self.assertEqual(self._search("МАШИННОГО"), [by_bio.pk])
+        self.assertEqual(self._search("зір"), [by_interest.pk])
+        self.assertEqual(self._search("облич"), [by_topic.pk])
+
+    def test_interest_rename_updates_documents(self):
+        interest = ScientificInterest.objects.create(name="Бази даних")
+        teacher = make_teacher(self.department, "db@lnu.edu.ua", [interest])
+        interest.name = "Сховища даних"
+        interest.save()
+        self.assertEqual(self._search("сховища"), [teacher.pk])
+        self.assertEqual(self._search("бази"), [])
+
+    def test_ranks_by_number_of_matched_terms(self):
+        partial = make_teacher(self.department, "a@lnu.edu.ua", bio="нейронні мережі")
+        full = make_teacher(self.department, "b@lnu.edu.ua", bio="нейронні мережі та графи")
+        results = self._search("мережі графи")
+        self.assertEqual(results[0], full.pk)
+
+
+class RecommendedTeachersTests(TestCase):
+    """The catalog recommends teachers for the student's course topic."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.other_department = Department.objects.create(name="Кафедра математики")
+        cls.student = StudentProfile.objects.create(
+            user=User.objects.create_user(email="student@lnu.edu.ua"), group="ПМі-31", year_of_study=3,
+            department=cls.department, course_topic="Нейронні мережі для розпізнавання мовлення",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+
+    def _recommended(self, **params):
+        response = self.client.get(reverse('searching:filter_teachers'), params)
+        self.assertEqual(response.status_code, 200)
+        return [teacher.pk for teacher in response.context['recommended']]
+
+    def test_recommends_matching_teachers_of_own_department(self):
+        best = make_teacher(self.department, "best@lnu.edu.ua", bio="Нейронні мережі та розпізнавання мовлення")
+        good = make_teacher(self.department, "good@lnu.edu.ua", bio="Глибокі нейронні мережі")
+        make_teacher(self.department, "none@lnu.edu.ua", bio="Історія математики")
+        make_teacher(self.other_department, "other@lnu.edu.ua", bio="Нейронні мережі, мовлення")
+
+        self.assertEqual(self._recommended(), [best.pk, good.pk])
+        self.assertEqual(self._recommended(q="історія"), [])
+
+    def test_topic_change_invalidates_cached_page(self):
+        make_teacher(self.department, "t@lnu.edu.ua", bio="Нейронні мережі")
+        url = reverse('searching:filter_teachers')
+        etag = self.client.get(url)['ETag']
+
+        StudentProfile.objects.filter(pk=self.student.pk).update(course_topic="Історія математики")
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['recommended'], [])
+
+
+class FacetCountTests(TestCase):
+    """Filter options are counted with the other filters applied and cached."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.programming = Department.objects.create(name="Кафедра програмування")
+        cls.math = Department.objects.create(name="Кафедра математики")
+        cls.ml = ScientificInterest.objects.create(name="Машинне навчання")
+        cls.db = ScientificInterest.objects.create(name="Бази даних")
+        cls.busy = make_teacher(
+            cls.programming, "busy@lnu.edu.ua", [cls.ml, cls.db], max_slots=1, bio="Криптографія",
+        )
+        Slot.objects.filter(teacher=cls.busy).update(is_filled=True, is_available=False)
+        make_teacher(cls.programming, "free@lnu.edu.ua", [cls.ml])
+        make_teacher(cls.math, "math@lnu.edu.ua", [cls.db])
+        cls.student = StudentProfile.objects.create(
+            user=User.objects.create_user(email="student@lnu.edu.ua"), group="ПМі-21", year_of_study=2,
+            department=cls.math,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_teachers_and_free_teachers_per_option(self):
+        facets = facet_counts(self.student)
+
+        self.assertEqual(facets['departments'], {self.programming.pk: (2, 1), self.math.pk: (1, 1)})
+        self.assertEqual(facets['interests'], {self.ml.pk: (2, 1), self.db.pk: (2, 1)})
+
+    def test_facet_ignores_its_own_filter(self):
+        facets = facet_counts(self.student, department_id=str(self.programming.pk), interest_id=str(self.db.pk))
+
+        self.assertEqual(facets['departments'], {self.programming.pk: (1, 0), self.math.pk: (1, 1)})
+        self.assertEqual(facets['interests'], {self.ml.pk: (2, 1), self.db.pk: (1, 0)})
+
+    def test_follows_search_query(self):
+        facets = facet_counts(self.student, query="криптографія")
+
+        self.assertEqual(facets['departments'], {self.programming.pk: (1, 0)})
+
+    def test_senior_student_sees_own_department_only(self):
+        self.student.year_of_study = 3
+        facets = facet_counts(self.student)
+
+        self.assertNotIn('departments', facets)
+        self.assertEqual(facets['interests'], {self.db.pk: (1, 1)})
+
+    def test_cached_until_a_card_changes(self):
+        facet_counts(self.student)
+        # Only the catalog version is read.
+        with self.assertNumQueries(1):
+            facet_counts(self.student)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_teacher(self.math, "new@lnu.edu.ua", [self.ml])
+        with self.assertNumQueries(3):
+            facets = facet_counts(self.student)
+        self.assertEqual(facets['departments'][self.math.pk], (2, 2))
+
+    def test_bulk_approval_and_deletes_move_counts(self):
+        pending = TeacherProfile.objects.create(
+            user=User.objects.create_user(email="pending@lnu.edu.ua"), department=self.math, max_slots=1,
+        )
+        self.assertEqual(facet_counts(self.student)['departments'][self.math.pk], (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_teachers([pending.pk])
+        self.assertEqual(facet_counts(self.student)['departments'][self.math.pk], (2, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.slots.all().delete()
+        self.assertEqual(facet_counts(self.student)['departments'][self.math.pk], (2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pending.delete()
+        self.assertEqual(facet_counts(self.student)['departments'][self.math.pk], (1, 1))
+
+    def test_options_show_counts(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('searching:filter_teachers'))
+
+        self.assertIn(FacetOption(self.programming.pk, self.programming.name, 2, 1), response.context['departments'])
+        self.assertContains(response, "Машинне навчання (2, з вільними місцями: 1)")
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pagination of the catalog and the request inbox."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+        cls.teachers = [
+            make_teacher(cls.department, f"t{i:02d}@lnu.edu.ua", max_slots=i % 5)
+            for i in range(30)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def _walk(self, url, params):
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.context['teachers'])
+            url = response.context['next_url']
+            pages += 1
+        return seen, pages
+
+    def test_walks_catalog_by_name(self):
+        self.client.force_login(self.student.user)
+        seen, pages = self._walk(reverse('searching:filter_teachers'), {'sort': 'name'})
+        self.assertEqual(pages, 2)
+        self.assertEqual([t.user.last_name for t in seen], sorted(t.user.last_name for t in self.teachers))
+
+    def test_walks_catalog_by_availability(self):
+        self.client.force_login(self.student.user)
+        seen, _ = self._walk(reverse('searching:filter_teachers'), {'sort': 'availability'})
+        self.assertEqual(len({t.pk for t in seen}), 30)
+        counts = [t.free_slot_count for t in seen]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_availability_order_follows_slot_changes(self):
+        busiest = max(self.teachers, key=lambda t: t.max_slots)
+        for slot in busiest.slots.all():
+            slot.is_available = False
+            slot.save()
+        Slot.objects.filter(teacher=busiest).first().delete()
+        self.assertEqual(TeacherProfile.objects.get(pk=busiest.pk).free_slots, 0)
+
+        self.client.force_login(self.student.user)
+        seen, _ = self._walk(reverse('searching:filter_teachers'), {'sort': 'availability'})
+        counts = [t.free_slot_count for t in seen]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertEqual([t.free_slot_count for t in seen], [t.free_slots for t in seen])
+
+    def test_invalid_cursor_shows_first_page(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('searching:filter_teachers'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['teachers']), 24)
+
+    def test_tampered_cursor_shows_first_page(self):
+        self.client.force_login(self.student.user)
+        url = reverse('searching:filter_teachers')
+        cursors = {
+            'availability': [["abc", 1], [3, "x"], [True, 1], [1, 2 ** 70]],
+            'name': [["a", "b", [1]], ["a", "b", {"dt": "2026-01-01T00:00:00"}]],
+        }
+        for sort, payloads in cursors.items():
+            for payload in payloads:
+                with self.subTest(sort=sort, cursor=payload):
+                    response = self.client.get(url, {'sort': sort, 'cursor': encode_cursor(payload)})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.context['teachers']), 24)
+
+    def test_request_inbox_filters_by_status(self):
+        teacher = self.teachers[4]
+        slot = teacher.slots.first()
+        SlotRequest.objects.create(student=self.student, slot=slot, status='rejected')
+        pending = SlotRequest.objects.create(student=self.student, slot=slot, status='pending')
+
+        self.client.force_login(teacher.user)
+        response = self.client.get(reverse('searching:teacher_requests'), {'status': 'pending'})
+        self.assertEqual([r.pk for r in response.context['requests']], [pending.pk])
+
+        response = self.client.get(reverse('searching:teacher_requests'), {'q': 'student@'})
+        self.assertEqual(len(response.context['requests']), 2)
+
+
+class ApproveRequestTests(TestCase):
+    """Approval assigns a slot at most once and a student at most once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=2)
+        cls.other_teacher = make_teacher(cls.department, "other@lnu.edu.ua", max_slots=1)
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+
+    def _approve(self, teacher, slot_request):
+        self.client.force_login(teacher.user)
+        return self.client.get(reverse('searching:approve_request', args=[slot_request.pk]))
+
+    def test_second_approval_of_same_request_is_rejected(self):
+        slot = self.teacher.slots.first()
+        slot_request = SlotRequest.objects.create(student=self.student, slot=slot)
+        self._approve(self.teacher, slot_request)
+        self._approve(self.teacher, slot_request)
+
+        slot.refresh_from_db()
+        self.assertEqual(slot.student_id, self.student.pk)
+        self.assertEqual(SlotRequest.objects.get(pk=slot_request.pk).status, 'approved')
+
+    def test_student_cannot_be_assigned_twice(self):
+        first = SlotRequest.objects.create(student=self.student, slot=self.teacher.slots.first(), status='pending')
+        second_slot = self.other_teacher.slots.first()
+        second = SlotRequest.objects.create(student=self.student, slot=second_slot, status='pending')
+
+        self._approve(self.teacher, first)
+        response = self._approve(self.other_teacher, second)
+
+        self.assertEqual(response.status_code, 302)
+        second_slot.refresh_from_db()
+        self.assertIsNone(second_slot.student_id)
+        self.assertEqual(SlotRequest.objects.get(pk=second.pk).status, 'pending')
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged catalog pages are answered with 304 without rendering."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=2)
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+
+    def setUp(self):
+        self.client.force_login(self.student.user)
+
+    def _revalidate(self, url):
+        self.client.get(url)  # the first visit sets the CSRF cookie, which is part of the ETag
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('private', first['Cache-Control'])
+        return self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_unchanged_catalog_is_not_modified(self):
+        url = reverse('searching:filter_teachers')
+        self.client.get(url)  # warm session and role caches
+
+        with CaptureQueriesContext(connection) as rendered:
+            first = self.client.get(url)
+        with CaptureQueriesContext(connection) as revalidated:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertLess(len(revalidated), len(rendered))
+
+    def test_slot_change_invalidates_catalog(self):
+        url = reverse('searching:filter_teachers')
+        etag = self.client.get(url)['ETag']
+
+        slot = self.teacher.slots.first()
+        slot.is_available = False
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.save()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_job_worker_change_invalidates_catalog(self):
+        url = reverse('searching:filter_teachers')
+        etag = self.client.get(url)['ETag']
+
+        # The run_jobs worker has a cache of its own.
+        worker_cache = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker'}}
+        with override_settings(CACHES=worker_cache), self.captureOnCommitCallbacks(execute=True):
+            set_department_max_slots([self.department.pk], 3)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_revalidation_runs_no_catalog_query(self):
+        url = reverse('searching:filter_teachers')
+        etag = self.client.get(url)['ETag']
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        tables = {f'"{model._meta.db_table}"' for model in (TeacherProfile, Slot)}
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if any(t in q['sql'] for t in tables)])
+
+    def test_redirects_carry_no_validators(self):
+        self.student.year_of_study = 3
+        self.student.department = Department.objects.create(name="Кафедра математики")
+        self.student.save()
+
+        response = self.client.get(reverse('searching:teacher_detail', args=[self.teacher.pk]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_own_request_invalidates_teacher_detail(self):
+        url = reverse('searching:teacher_detail', args=[self.teacher.pk])
+        self.assertEqual(self._revalidate(url).status_code, 304)
+        etag = self.client.get(url)['ETag']
+
+        SlotRequest.objects.create(student=self.student, slot=self.teacher.slots.first())
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_interest_rename_invalidates_teacher_detail(self):
+        interest = ScientificInterest.objects.create(name="Бази даних")
+        self.teacher.scientific_interests.add(interest)
+        url = reverse('searching:teacher_detail', args=[self.teacher.pk])
+        etag = self.client.get(url)['ETag']
+
+        interest.name = "Сховища даних"
+        interest.save()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AsyncTeacherDetailTests(TestCase):
+    """The async teacher page works through the ASGI handler."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.other_department = Department.objects.create(name="Кафедра математики")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=2)
+        cls.other_teacher = make_teacher(cls.other_department, "other@lnu.edu.ua", max_slots=1)
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(
+            user=student_user, group="ПМі-31", year_of_study=3, department=cls.department,
+        )
+
+    async def _login(self):
+        await sync_to_async(self.async_client.force_login)(self.student.user)
+
+    async def test_renders_over_asgi(self):
+        await self._login()
+        slot = await self.teacher.slots.afirst()
+        await SlotRequest.objects.acreate(student=self.student, slot=slot)
+
+        response = await self.async_client.get(reverse('searching:teacher_detail', args=[self.teacher.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['active_request'].slot_id, slot.pk)
+        self.assertFalse(response.context['has_assigned_slot'])
+        self.assertEqual(len(response.context['available_slots']), 2)
+        self.assertFalse(response.context['can_send_request'])
+
+    async def test_not_modified_over_asgi(self):
+        await self._login()
+        url = reverse('searching:teacher_detail', args=[self.teacher.pk])
+        await self.async_client.get(url)  # sets the CSRF cookie
+        etag = (await self.async_client.get(url))['ETag']
+
+        response = await self.async_client.get(url, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_missing_teacher(self):
+        await self._login()
+        response = await self.async_client.get(reverse('searching:teacher_detail', args=[self.other_teacher.pk + 100]))
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_senior_student_sees_only_own_department(self):
+        await self._login()
+        response = await self.async_client.get(reverse('searching:teacher_detail', args=[self.other_teacher.pk]))
+
+        self.assertRedirects(response, reverse('searching:filter_teachers'), fetch_redirect_response=False)
+
+    async def test_anonymous_is_sent_to_login(self):
+        response = await self.async_client.get(reverse('searching:teacher_detail', args=[self.teacher.pk]))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('next=', response['Location'])
+
+
+async def next_event(iterator, timeout=2):
+    """Return the next SSE frame of a stream that is not a keep-alive comment."""
+    while True:
+        frame = await asyncio.wait_for(anext(iterator), timeout)
+        frame = frame.decode() if isinstance(frame, bytes) else frame
+        if not frame.startswith(':'):
+            return frame
+
+
+class TracingTests(TestCase):
+    """Requests are timed in Server-Timing and sampled traces are exported."""
+
+    SAMPLED = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'
+    UNSAMPLED = '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-00'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua")
+        # Staff get the detailed Server-Timing header and traces on request.
+        cls.student = StudentProfile.objects.create(
+            user=User.objects.create_user(email="student@lnu.edu.ua", is_staff=True), group="ПМі-21", year_of_study=2,
+        )
+        cls.visitor = StudentProfile.objects.create(
+            user=User.objects.create_user(email="visitor@lnu.edu.ua"), group="ПМі-21", year_of_study=2,
+        )
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            TRACING_FILE=os.path.join(directory.name, 'traces.jsonl'), TRACING_SAMPLE_RATE=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.trace_file = str(tracing.process_file(settings.TRACING_FILE))
+        self.client.force_login(self.student.user)
+
+    def _timing(self, response):
+        metrics = {}
+        for part in response['Server-Timing'].split(', '):
+            name, *params = part.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def _spans(self):
+        with open(self.trace_file, encoding='utf-8') as f:
+            [line] = f.readlines()
+        [resource] = json.loads(line)['resourceSpans']
+        [scope] = resource['scopeSpans']
+        return scope['spans']
+
+    def test_server_timing_counts_queries_templates_and_role_checks(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('searching:filter_teachers'))
+
+        metrics = self._timing(response)
+        self.assertEqual(metrics['sql']['desc'], f'"{len(ctx.captured_queries)}"')
+        self.assertEqual(metrics['auth']['desc'], '"1"')
+        self.assertIn('tpl', metrics)
+        self.assertIn('msg', metrics)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['sql']['dur']))
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    def test_sampled_trace_is_exported(self):
+        response = self.client.get(reverse('searching:filter_teachers'), headers={'traceparent': self.SAMPLED})
+
+        self.assertEqual(response.status_code, 200)
+        spans = self._spans()
+        root = spans[0]
+        self.assertEqual(root['traceId'], '0af7651916cd43dd8448eb211c80319c')
+        self.assertEqual(root['name'], 'GET searching/filter-teachers/')
+        span_ids = {span['spanId'] for span in spans}
+        self.assertTrue(all(span['parentSpanId'] in span_ids for span in spans[1:]))
+
+        sql = [span for span in spans if span['kind'] == tracing.KIND_CLIENT]
+        self.assertTrue(sql)
+        attributes = {item['key']: item['value']['stringValue'] for item in sql[-1]['attributes']}
+        self.assertIn('SELECT', attributes['db.statement'])
+        self.assertRegex(attributes['code.location'], r'^\w+/[\w/]+\.py:\d+$')
+        self.assertIn('searching/filter_teachers.html', {span['name'] for span in spans})
+
+    def test_other_users_cannot_request_traces_or_timings(self):
+        self.client.force_login(self.visitor.user)
+        response = self.client.get(reverse('searching:filter_teachers'), headers={'traceparent': self.SAMPLED})
+
+        self.assertEqual(list(self._timing(response)), ['total'])
+        self.assertFalse(os.path.exists(self.trace_file))
+
+        self.client.logout()
+        response = self.client.get(reverse('account_login'), headers={'traceparent': self.SAMPLED})
+        self.assertEqual(list(self._timing(response)), ['total'])
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    @override_settings(TRACING_TRUSTED_PROXIES=['127.0.0.1'])
+    def test_trusted_proxy_requests_traces(self):
+        self.client.force_login(self.visitor.user)
+        self.client.get(reverse('searching:filter_teachers'), headers={'traceparent': self.SAMPLED})
+
+        self.assertEqual(self._spans()[0]['traceId'], '0af7651916cd43dd8448eb211c80319c')
+
+    def test_unsampled_trace_is_not_exported(self):
+        with override_settings(TRACING_SAMPLE_RATE=1, TRACING_TRUSTED_PROXIES=['127.0.0.1']):
+            response = self.client.get(reverse('searching:filter_teachers'), headers={'traceparent': self.UNSAMPLED})
+
+        self.assertIn('sql', self._timing(response))
+        self.assertFalse(os.path.exists(self.trace_file))
+
+    async def test_async_view_queries_are_traced(self):
+        await sync_to_async(self.async_client.force_login)(self.student.user)
+
+        response = await self.async_client.get(
+            reverse('searching:teacher_detail', args=[self.teacher.pk]), headers={'traceparent': self.SAMPLED},
+        )
+
+        self.assertGreater(int(self._timing(response)['sql']['desc'].strip('"')), 0)
+        spans = await sync_to_async(self._spans)()
+        self.assertTrue(any(span['kind'] == tracing.KIND_CLIENT for span in spans))
+
+    def test_each_process_writes_its_own_file(self):
+        first = tracing.exporter()
+        with mock.patch('mentorion.tracing.os.getpid', return_value=first.pid + 1):
+            forked = tracing.exporter()
+
+        self.assertEqual(str(first.file), self.trace_file)
+        self.assertEqual(first.file.name, f'traces.{first.pid}.jsonl')
+        self.assertEqual(forked.file.name, f'traces.{first.pid + 1}.jsonl')
+
+    def test_exporter_rotates_files(self):
+        exporter = tracing.FileExporter(settings.TRACING_FILE, max_bytes=500, backups=2)
+        for _ in range(5):
+            trace = tracing.Trace(sampled=True)
+            trace.add(tracing.SQL, 'SELECT', 0, 1, attributes={'db.statement': 'SELECT 1' * 50})
+            exporter.export(trace, {'spanId': trace.span_id})
+
+        self.assertTrue(os.path.exists(self.trace_file + '.1'))
+        self.assertTrue(os.path.exists(self.trace_file + '.2'))
+        self.assertFalse(os.path.exists(self.trace_file + '.3'))
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+    """/metrics exposes per-view histograms and backlog gauges."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=3)
+        TeacherProfile.objects.create(
+            user=User.objects.create_user(email="new@lnu.edu.ua"), department=cls.department,
+        )
+        cls.student = StudentProfile.objects.create(
+            user=User.objects.create_user(email="student@lnu.edu.ua"), group="ПМі-21", year_of_study=2,
+        )
+        SlotRequest.objects.create(student=cls.student, slot=cls.teacher.slots.first())
+
+    def setUp(self):
+        cache.clear()
+
+    def _scrape(self, token='secret'):
+        return self.client.get('/metrics', headers={'Authorization': f'Bearer {token}'})
+
+    def _sample(self, name, **labels):
+        return metrics.REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requires_token(self):
+        self.assertEqual(self._scrape('wrong').status_code, 403)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self._scrape().status_code, 404)
+
+    def test_observes_latency_and_queries_per_view(self):
+        labels = {'view': 'searching:filter_teachers'}
+        count = self._sample('mentorion_http_request_duration_seconds_count', method='GET', status='200', **labels)
+        queries = self._sample('mentorion_http_request_queries_sum', **labels)
+        self.client.force_login(self.student.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('searching:filter_teachers'))
+
+        self.assertEqual(
+            self._sample('mentorion_http_request_duration_seconds_count', method='GET', status='200', **labels),
+            count + 1,
+        )
+        self.assertEqual(
+            self._sample('mentorion_http_request_queries_sum', **labels), queries + len(ctx.captured_queries),
+        )
+        self.assertContains(self._scrape(), 'view="searching:filter_teachers"')
+
+    def test_untracked_routes_are_not_observed(self):
+        self._scrape()
+        self.assertNotContains(self._scrape(), 'view="metrics"')
+
+    def test_backlog_gauges_are_cached(self):
+        body = self._scrape().content.decode()
+
+        self.assertIn('mentorion_pending_slot_requests 1.0', body)
+        self.assertIn('mentorion_unapproved_teachers 1.0', body)
+        self.assertIn('mentorion_free_slots{department="Кафедра програмування"} 3.0', body)
+        with self.assertNumQueries(0):
+            metrics.backlog()
+
+    def test_setup_runs_without_migrated_database(self):
+        # Admin autodiscovery imports the metrics before ``migrate`` could create any table.
+        with tempfile.TemporaryDirectory() as directory:
+            result = subprocess.run(
+                [sys.executable, 'manage.py', 'check'],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                env={**os.environ, 'DATABASE_URL': f'sqlite:///{directory}/empty.sqlite3'},
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_merges_samples_of_worker_processes(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        worker = (
+            "from prometheus_client import Histogram; "
+            "Histogram('mentorion_http_request_duration_seconds', '', ['view', 'method', 'status'])"
+            ".labels('profiles:student_profile', 'GET', '200').observe(0.1)"
+        )
+        for _ in range(2):
+            subprocess.run(
+                [sys.executable, '-c', worker],
+                check=True,
+                env={**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory.name},
+            )
+
+        with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory.name}):
+            body = self._scrape().content.decode()
+
+        self.assertIn(
+            'mentorion_http_request_duration_seconds_count'
+            '{method="GET",status="200",view="profiles:student_profile"} 2.0',
+            body,
+        )
+        self.assertIn('mentorion_pending_slot_requests 1.0', body)
+
+
+class ViewQueryBudgetTests(TestCase):
+    """Every searching view runs a fixed number of queries, whatever the data size."""
+
+    # (URL name, method) -> most queries a request may run on a cold cache.
+    BUDGETS = {
+        ('filter_teachers', 'get'): 15,
+        ('teacher_detail', 'get'): 11,
+        ('send_request', 'post'): 12,
+        ('teacher_requests', 'get'): 4,
+        ('approve_request', 'post'): 15,
+        ('reject_request', 'post'): 9,
+        ('teacher_slots', 'get'): 5,
+        ('slot_detail', 'get'): 5,
+        ('edit_slot', 'get'): 4,
+        ('edit_slot', 'post'): 12,
+        ('allocation_preferences', 'get'): 8,
+        ('allocation_preferences', 'post'): 12,
+        ('allocation_applicants', 'get'): 7,
+        ('allocation_applicants', 'post'): 11,
+        # Measured through the ASGI handler, from the handshake to the end of the stream.
+        ('events', 'get'): 3,
+    }
+    # Only served under ASGI; over WSGI the view answers 204 before any query.
+    STREAMED = {'events'}
+    SIZES = (2, 10)
+
+    def _seed(self, size):
+        """Create ``size`` of everything a page lists: teachers, slots, requests, applicants."""
+        department = Department.objects.create(name="Кафедра програмування")
+        interests = [ScientificInterest.objects.create(name=f"Тема {i}") for i in range(size)]
+        teacher = make_teacher(department, "teacher@lnu.edu.ua", interests, max_slots=size + 1)
+        catalog = [make_teacher(department, f"t{i}@lnu.edu.ua", interests, max_slots=2) for i in range(size)]
+        allocation_round = AllocationRound.objects.create(department=department)
+
+        def student(email):
+            return StudentProfile.objects.create(
+                user=User.objects.create_user(email=email, last_name=email.split('@')[0]),
+                group="ПМі-31", year_of_study=3, department=department, course_topic="Бази даних",
+            )
+
+        slots = list(teacher.slots.order_by('pk'))
+        requests = []
+        for i in range(size):
+            applicant = student(f"applicant{i}@lnu.edu.ua")
+            requests.append(SlotRequest.objects.create(student=applicant, slot=slots[0], message="Добрий день"))
+            save_student_preferences(allocation_round, applicant, [teacher.pk])
+            Slot.objects.filter(pk=slots[i + 1].pk).update(
+                student=student(f"assigned{i}@lnu.edu.ua"), is_filled=True, is_available=False,
+            )
+        return {
+            'teacher': teacher,
+            'student': student("student@lnu.edu.ua"),
+            'other': catalog[0],
+            'slot': slots[0],
+            'requests': requests,
+        }
+
+    def _requests(self, data):
+        """Return (URL name, method) -> (user, url, form data) of one request per view."""
+        teacher, student = data['teacher'].user, data['student'].user
+        slot, (first, second) = data['slot'], data['requests'][:2]
+        free_slot = data['other'].slots.first()
+        ranking = {f'student_{request.student_id}': rank for rank, request in enumerate(data['requests'], start=1)}
+        return {
+            ('filter_teachers', 'get'): (student, reverse('searching:filter_teachers'), None),
+            ('teacher_detail', 'get'): (student, reverse('searching:teacher_detail', args=[data['other'].pk]), None),
+            ('send_request', 'post'): (student, reverse('searching:send_request', args=[free_slot.pk]), {}),
+            ('teacher_requests', 'get'): (teacher, reverse('searching:teacher_requests'), None),
+            ('approve_request', 'post'): (teacher, reverse('searching:approve_request', args=[first.pk]), {}),
+            ('reject_request', 'post'): (teacher, reverse('searching:reject_request', args=[second.pk]), {}),
+            ('teacher_slots', 'get'): (teacher, reverse('searching:teacher_slots'), None),
+            ('slot_detail', 'get'): (teacher, reverse('searching:slot_detail', args=[slot.pk]), None),
+            ('edit_slot', 'get'): (teacher, reverse('searching:edit_slot', args=[slot.pk]), None),
+            ('edit_slot', 'post'): (teacher, reverse('searching:edit_slot', args=[slot.pk]), {'topic': "Нова тема"}),
+            ('allocation_preferences', 'get'): (student, reverse('searching:allocation_preferences'), None),
+            ('allocation_preferences', 'post'): (
+                student, reverse('searching:allocation_preferences'), {'choice_1': data['teacher'].pk},
+            ),
+            ('allocation_applicants', 'get'): (teacher, reverse('searching:allocation_applicants'), None),
+            ('allocation_applicants', 'post'): (teacher, reverse('searching:allocation_applicants'), ranking),
+            ('events', 'get'): (student, reverse('searching:events'), None),
+        }
+
+    async def _stream(self, url):
+        """Open a live event stream and read it to the end."""
+        response = await self.async_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = [frame async for frame in response.streaming_content]
+        self.assertTrue(frames[0].startswith(b'retry:'))
+        return response
+
+    @override_settings(EVENTS_BACKEND='local', EVENTS_STREAM_SECONDS=0.1, EVENTS_HEARTBEAT_SECONDS=0.05)
+    def _measure(self, size):
+        """Return (URL name, method) -> query count at the given data size."""
+        counts = {}
+        with transaction.atomic():
+            data = self._seed(size)
+            for (name, method), (user, url, form) in self._requests(data).items():
+                cache.clear()
+                reference.reset()
+                self.client.force_login(user)
+                self.async_client.force_login(user)
+                # Each request sees the seeded data, not the writes of the previous one.
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as ctx:
+                        if name in self.STREAMED:
+                            response = async_to_sync(self._stream)(url)
+                        else:
+                            response = getattr(self.client, method)(url, form)
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400, name)
+                if method == 'post':
+                    self.assertEqual(response.status_code, 302, f"{name}: the form was not accepted")
+                counts[name, method] = len(ctx.captured_queries)
+            transaction.set_rollback(True)
+        return counts
+
+    def test_views_stay_within_budget(self):
+        # Process-wide lookups (e.g. the PostgreSQL collation probe) run on the first request only.
+        self._measure(self.SIZES[0])
+        small, large = (self._measure(size) for size in self.SIZES)
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(view=name):
+                self.assertEqual(small[name], large[name], "query count grows with the data")
+                self.assertLessEqual(large[name], budget)
+
+    def test_every_view_has_a_budget(self):
+        self.assertEqual({pattern.name for pattern in searching_urls.urlpatterns}, {name for name, _ in self.BUDGETS})
+
+
+class QueryCheckTests(TestCase):
+    """The opt-in detector reports a query shape repeated within one request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(email=f"u{i}@lnu.edu.ua") for i in range(5)]
+
+    def _request(self):
+        def view(request):
+            for user in self.users:
+                User.objects.filter(pk=user.pk).first()
+            return HttpResponse()
+        return querycheck.QueryCheckMiddleware(view)(RequestFactory().get('/'))
+
+    def test_shape_ignores_literals_and_list_lengths(self):
+        self.assertEqual(
+            querycheck.query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) AND n = 5'),
+            querycheck.query_shape('SELECT *  FROM t WHERE id IN (%s) AND n = 7'),
+        )
+
+    @override_settings(QUERYCHECK_MODE='log', QUERYCHECK_REPEAT_LIMIT=3)
+    def test_log_mode_warns_once(self):
+        with self.assertLogs('mentorion.querycheck', 'WARNING') as logs:
+            self.assertEqual(self._request().status_code, 200)
+        [message] = logs.output
+        self.assertIn("more than 3 times", message)
+        self.assertIn("searching/tests.py", message)
+
+    @override_settings(QUERYCHECK_MODE='raise', QUERYCHECK_REPEAT_LIMIT=3)
+    def test_raise_mode_fails_the_request(self):
+        with self.assertRaises(querycheck.RepeatedQueryError):
+            self._request()
+
+    @override_settings(QUERYCHECK_MODE='raise', QUERYCHECK_REPEAT_LIMIT=5)
+    def test_repeats_up_to_the_limit_pass(self):
+        self.assertEqual(self._request().status_code, 200)
+
+
+class ProfilingTests(TestCase):
+    """Staff can profile single requests; other requests are left alone."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@lnu.edu.ua", password="x")
+        cls.user = User.objects.create_user(email="user@lnu.edu.ua")
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(PROFILING_ROOT=root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.root = Path(root)
+
+    def _get(self, user, **params):
+        self.client.force_login(user)
+        return self.client.get(reverse('profiles:onboarding'), params)
+
+    def test_staff_request_is_profiled(self):
+        response = self._get(self.admin, _profile='cpu')
+
+        name = response['X-Profile-Dump']
+        self.assertIn('profiles.onboarding', name)
+        stats = pstats.Stats(str(self.root / f'{name}.prof'))
+        self.assertTrue(any(function == 'dispatch' for _, _, function in stats.stats))
+        self.assertEqual([path.name for path in self.root.iterdir()], [f'{name}.prof'])
+
+    def test_memory_mode_writes_allocation_summary(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('profiles:onboarding'), headers={'X-Profile': 'mem'})
+
+        summary = (self.root / f"{response['X-Profile-Dump']}.alloc.txt").read_text(encoding='utf-8')
+        self.assertIn("Peak traced memory", summary)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_other_requests_are_not_profiled(self):
+        with mock.patch.object(profiling, '_is_staff', wraps=profiling._is_staff) as is_staff:
+            response = self._get(self.admin)
+        is_staff.assert_not_called()
+        self.assertNotIn('X-Profile-Dump', response)
+
+        response = self._get(self.user, _profile='cpu')
+        self.assertNotIn('X-Profile-Dump', response)
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    @override_settings(PROFILING_MAX_DUMPS=2)
+    def test_keeps_newest_dumps(self):
+        names = [self._get(self.admin, _profile='mem')['X-Profile-Dump'] for _ in range(3)]
+
+        self.assertEqual(
+            sorted(path.name for path in self.root.iterdir()),
+            sorted(f'{name}{suffix}' for name in names[1:] for suffix in ('.alloc.txt', '.prof')),
+        )
+
+    def test_staff_lists_and_downloads_dumps(self):
+        name = self._get(self.admin, _profile='cpu')['X-Profile-Dump']
+
+        response = self.client.get(reverse('profiling_dumps'))
+        self.assertContains(response, name)
+        download = self.client.get(reverse('profiling_download', args=[f'{name}.prof']))
+        self.assertEqual(b''.join(download.streaming_content), (self.root / f'{name}.prof').read_bytes())
+        self.assertEqual(self.client.get(reverse('profiling_download', args=['settings.py'])).status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('profiling_dumps')).status_code, 302)
+
+    async def test_async_request_includes_worker_thread(self):
+        await sync_to_async(self.async_client.force_login)(self.admin)
+
+        response = await self.async_client.get(reverse('profiles:onboarding'), {'_profile': 'cpu'})
+
+        stats = pstats.Stats(str(self.root / f"{response['X-Profile-Dump']}.prof"))
+        # The sync view runs in the request's worker thread, outside the event loop.
+        self.assertTrue(any(function == 'dispatch' for _, _, function in stats.stats))
+
+
+@override_settings(EVENTS_BACKEND='local', EVENTS_HEARTBEAT_SECONDS=0.05)
+class LiveEventsTests(TestCase):
+    """Request and slot changes are pushed to the affected users."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=2)
+        cls.students = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(email=f"s{i}@lnu.edu.ua", first_name="Олена", last_name=f"С{i}"),
+                group="ПМі-21", year_of_study=2,
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        patcher = mock.patch.object(events.LocalBackend, 'send', autospec=True)
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _published(self):
+        return [(message['event'], message['to']) for _, message in (c.args for c in self.send.call_args_list)]
+
+    def test_send_notifies_teacher(self):
+        self.client.force_login(self.students[0].user)
+        slot = self.teacher.slots.first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('searching:send_request', args=[slot.pk]), {'message': 'Добрий день'})
+
+        self.assertEqual(self._published(), [('request_created', [events.user_key(self.teacher.user_id)])])
+        self.assertIn('Олена С0', self.send.call_args.args[1]['data']['message'])
+
+    def test_approval_notifies_approved_and_rejected_students(self):
+        slot = self.teacher.slots.first()
+        first, second = (SlotRequest.objects.create(student=student, slot=slot) for student in self.students)
+        self.client.force_login(self.teacher.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('searching:approve_request', args=[first.pk]))
+
+        self.assertEqual(self._published(), [
+            ('request_approved', [events.user_key(self.students[0].user_id)]),
+            ('request_rejected', [events.user_key(self.students[1].user_id)]),
+        ])
+
+    def test_released_slot_notifies_students(self):
+        slot = self.teacher.slots.first()
+        slot.student = self.students[0]
+        slot.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            slot = Slot.objects.get(pk=slot.pk)
+            slot.student = None
+            slot.is_available = True
+            slot.save()
+
+        self.assertEqual(self._published(), [('slot_freed', [events.STUDENTS])])
+
+    def test_wsgi_requests_are_not_streamed(self):
+        self.client.force_login(self.teacher.user)
+
+        self.assertEqual(self.client.get(reverse('searching:events')).status_code, 204)
+
+
+@override_settings(EVENTS_BACKEND='local', EVENTS_HEARTBEAT_SECONDS=0.05)
+class EventStreamTests(TestCase):
+    """The SSE endpoint streams hub events to the connected user."""
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(department, "teacher@lnu.edu.ua", max_slots=1)
+        cls.student = StudentProfile.objects.create(
+            user=User.objects.create_user(email="student@lnu.edu.ua"), group="ПМі-21", year_of_study=2,
+        )
+
+    async def test_teacher_receives_new_request(self):
+        await sync_to_async(self.async_client.force_login)(self.teacher.user)
+        response = await self.async_client.get(reverse('searching:events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertTrue((await next_event(stream)).startswith('retry:'))
+
+        def send_request():
+            client = Client()
+            client.force_login(self.student.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                client.post(reverse('searching:send_request', args=[self.teacher.slots.first().pk]))
+        await sync_to_async(send_request)()
+
+        frame = await next_event(stream)
+        self.assertTrue(frame.startswith('event: request_created\n'))
+        self.assertIn('"request_id"', frame)
+
+    async def test_anonymous_is_refused(self):
+        response = await self.async_client.get(reverse('searching:events'))
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(EVENTS_STREAM_SECONDS=0.2)
+    async def test_stream_ends_and_unsubscribes(self):
+        await sync_to_async(self.async_client.force_login)(self.student.user)
+        response = await self.async_client.get(reverse('searching:events'))
+
+        frames = [frame async for frame in response.streaming_content]
+
+        self.assertTrue(frames[0].startswith(b'retry:'))
+        self.assertEqual(len(events.hub), 0)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "LISTEN/NOTIFY needs PostgreSQL.")
+@override_settings(EVENTS_BACKEND='postgres', EVENTS_HEARTBEAT_SECONDS=0.05)
+class PostgresEventsTests(TransactionTestCase):
+    """Events published after commit reach streams through NOTIFY."""
+
+    def tearDown(self):
+        events.backend().stop()
+
+    async def test_notify_reaches_stream(self):
+        stream = events.stream([events.user_key(1)])
+        self.assertTrue((await next_event(stream)).startswith('retry:'))
+        self.assertTrue(await sync_to_async(events.backend().listening.wait)(5))
+
+        await sync_to_async(events.publish)('request_rejected', {'message': 'Відхилено'}, user_ids=[1])
+        frame = await next_event(stream)
+        await stream.aclose()
+
+        self.assertEqual(frame, 'event: request_rejected\ndata: {"message": "Відхилено"}\n\n')
+
+
+class TeacherCardCacheTests(TestCase):
+    """Catalog cards are cached per teacher version and rebuilt by one worker."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=2)
+        student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(user=student_user, group="ПМі-21", year_of_study=2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+
+    def _card_rendered(self):
+        response = self.client.get(reverse('searching:filter_teachers'))
+        return 'searching/_teacher_card.html' in [t.name for t in response.templates], response
+
+    def test_card_is_served_from_cache(self):
+        self.assertTrue(self._card_rendered()[0])
+        rendered, response = self._card_rendered()
+        self.assertFalse(rendered)
+        self.assertContains(response, "2 / 2 вільних")
+
+    def test_slot_change_bumps_version(self):
+        self._card_rendered()
+        with self.captureOnCommitCallbacks(execute=True):
+            slot = self.teacher.slots.first()
+            slot.is_available = False
+            slot.save()
+
+        rendered, response = self._card_rendered()
+        self.assertTrue(rendered)
+        self.assertContains(response, "1 / 2 вільних")
+
+    def test_name_change_bumps_version(self):
+        self._card_rendered()
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self.teacher.user
+            user.last_name = "Франко"
+            user.save()
+
+        self.assertContains(self._card_rendered()[1], "Франко")
+
+    def test_version_bumped_by_another_process_is_seen(self):
+        self._card_rendered()
+        # The job worker has its own cache: only the database row is shared.
+        Slot.objects.filter(teacher=self.teacher).update(is_available=False)
+        CacheVersion.objects.create(key=cards.VERSION_KEY.format(teacher_id=self.teacher.pk), version=1)
+
+        rendered, response = self._card_rendered()
+        self.assertTrue(rendered)
+        self.assertContains(response, "0 / 2 вільних")
+
+    def test_only_lock_holder_rebuilds_expired_card(self):
+        version = card_versions([self.teacher.pk])[self.teacher.pk]
+        key = cards.FRAGMENT_KEY.format(teacher_id=self.teacher.pk, version=version)
+        cache.set(key, ("stale", time.time() - 1))
+        cache.add(cards.LOCK_KEY.format(teacher_id=self.teacher.pk, version=version), 1)
+
+        html = cards.cached_card(self.teacher.pk, version, lambda: self.fail("rebuilt without the lock"))
+
+        self.assertEqual(html, "stale")
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Only reads of replica_reads views go to the replica, and never after a write."""
+
+    def setUp(self):
+        patcher = mock.patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = db_routing.ReplicaRouter()
+
+    def _route(self, state):
+        token = db_routing._state.set(state)
+        try:
+            return self.router.db_for_read(TeacherProfile)
+        finally:
+            db_routing._state.reset(token)
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(TeacherProfile), 'default')
+
+    def test_replica_reads_use_replica(self):
+        self.assertEqual(self._route(db_routing.RoutingState(use_replica=True)), 'replica')
+        self.assertEqual(self._route(db_routing.RoutingState()), 'default')
+
+    def test_reads_after_write_use_primary(self):
+        state = db_routing.RoutingState(use_replica=True)
+        token = db_routing._state.set(state)
+        try:
+            self.assertEqual(self.router.db_for_write(TeacherProfile), 'default')
+        finally:
+            db_routing._state.reset(token)
+
+        self.assertTrue(state.wrote)
+        self.assertEqual(self._route(state), 'default')
+
+    def test_no_replica_configured(self):
+        del settings.DATABASES['replica']
+
+        self.assertEqual(self._route(db_routing.RoutingState(use_replica=True)), 'default')
+
+
+class PrimaryPinTests(TestCase):
+    """A write pins the browser to the primary for a short time."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teacher = make_teacher(cls.department, "teacher@lnu.edu.ua", max_slots=1)
+        cls.student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        StudentProfile.objects.create(user=cls.student_user, group="ПМі-21", year_of_study=2)
+
+    def setUp(self):
+        patcher = mock.patch.dict(settings.DATABASES, {'replica': settings.DATABASES['default']})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_login(self.student_user)
+
+    def test_write_sets_pin_cookie(self):
+        slot = self.teacher.slots.first()
+        response = self.client.post(reverse('searching:send_request', args=[slot.pk]), {'message': 'Добрий день'})
+
+        self.assertTrue(SlotRequest.objects.filter(slot=slot).exists())
+        self.assertEqual(response.cookies[db_routing.PIN_COOKIE]['max-age'], settings.READ_REPLICA_PIN_SECONDS)
+
+    def test_read_does_not_pin(self):
+        response = self.client.get(reverse('searching:filter_teachers'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(db_routing.PIN_COOKIE, response.cookies)
+
+
+@unittest.skipUnless('replica' in settings.DATABASES, 'REPLICA_DATABASE_URL is not set')
+class ReplicaRoutingTests(TransactionTestCase):
+    """With two aliases the catalog reads from the replica until the student writes."""
+
+    databases = '__all__'
+
+    def setUp(self):
+        department = Department.objects.create(name="Кафедра програмування")
+        self.teacher = make_teacher(department, "teacher@lnu.edu.ua", max_slots=1)
+        self.student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        StudentProfile.objects.create(user=self.student_user, group="ПМі-21", year_of_study=2)
+        self.client.force_login(self.student_user)
+
+    def _catalog_queries(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('searching:filter_teachers'))
+        self.assertEqual(response.status_code, 200)
+        return len(replica)
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.assertGreater(self._catalog_queries(), 0)
+
+        slot = self.teacher.slots.first()
+        response = self.client.post(reverse('searching:send_request', args=[slot.pk]), {'message': 'Добрий день'})
+        self.assertIn(db_routing.PIN_COOKIE, response.cookies)
+
+        self.assertEqual(self._catalog_queries(), 0)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "Row locking needs a real PostgreSQL database.")
+class ConcurrentApprovalTests(TransactionTestCase):
+    """
+    Fire hundreds of concurrent approvals and sends and check the invariants.
+
+    Set ``CONCURRENCY_TEST_REQUESTS`` and ``CONCURRENCY_TEST_THREADS`` to scale the run
+    and ``CONCURRENCY_TEST_MIN_RPS`` to the throughput the run must reach.
+    """
+
+    requests_count = int(os.environ.get('CONCURRENCY_TEST_REQUESTS', 300))
+    threads = int(os.environ.get('CONCURRENCY_TEST_THREADS', 32))
+    # Well below what a laptop reaches (about 30), so only a collapse fails the run.
+    min_rps = float(os.environ.get('CONCURRENCY_TEST_MIN_RPS', 10))
+
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(42)
+        department = Department.objects.create(name="Кафедра програмування")
+        self.teachers = [make_teacher(department, f"t{i}@lnu.edu.ua", max_slots=3) for i in range(20)]
+        slots = list(Slot.objects.all())
+        students = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(email=f"s{i}@lnu.edu.ua"), group="ПМі-31", year_of_study=2,
+            )
+            for i in range(self.requests_count // 2)
+        ]
+        # Every student asks for two different slots, so approvals race for both slots and students.
+        self.pending = []
+        for student in students:
+            for slot in rng.sample(slots, 2):
+                self.pending.append(SlotRequest.objects.create(student=student, slot=slot))
+        self.students = students
+        self.slots = slots
+
+    def _run(self, task):
+        try:
+            return task()
+        finally:
+            connection.close()
+
+    def _approve(self, slot_request):
+        client = Client()
+        client.force_login(slot_request.slot.teacher.user)
+        return client.get(reverse('searching:approve_request', args=[slot_request.pk])).status_code
+
+    def _send(self, student, slot):
+        client = Client()
+        client.force_login(student.user)
+        return client.post(reverse('searching:send_request', args=[slot.pk]), {'slot_id': slot.pk}).status_code
+
+    def test_invariants_hold_under_concurrency(self):
+        for slot_request in self.pending:
+            slot_request.slot.teacher.user  # warm relations outside the threads
+
+        rng = random.Random(7)
+        tasks = [lambda r=r: self._approve(r) for r in self.pending]
+        tasks += [lambda r=r: self._approve(r) for r in rng.sample(self.pending, len(self.pending) // 4)]
+        tasks += [lambda s=s: self._send(s, rng.choice(self.slots)) for s in self.students]
+        rng.shuffle(tasks)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            statuses = list(pool.map(self._run, tasks))
+        rps = len(tasks) / (time.perf_counter() - started)
+        logger.info("%d concurrent requests at %.1f requests/s", len(tasks), rps)
+
+        self.assertNotIn(500, statuses)
+        self.assertGreaterEqual(rps, self.min_rps, f"{len(tasks)} requests at {rps:.1f} requests/s")
+
+        approved = SlotRequest.objects.filter(status='approved')
+        assigned = {slot.pk: slot.student_id for slot in Slot.objects.filter(student__isnull=False)}
+        self.assertEqual(approved.count(), len(assigned))
+        self.assertEqual(len(set(assigned.values())), len(assigned))
+        for slot_request in approved:
+            self.assertEqual(assigned.get(slot_request.slot_id), slot_request.student_id)
+        self.assertFalse(Slot.objects.filter(student__isnull=False, is_filled=False).exists())
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    """The load driver replays the mix and reports per-view statistics."""
+
+    def test_reports_latency_and_queries_per_view(self):
+        generate_dataset(departments=1, teachers_per_department=3, students_per_department=8, interests=3)
+        out = StringIO()
+
+        # SQLite test databases lock whole tables, so only PostgreSQL runs in parallel.
+        concurrency = 4 if connection.vendor == 'postgresql' else 1
+        call_command('loadtest', requests=20, concurrency=concurrency, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['requests'], 0)
+        self.assertTrue({'p50', 'p95', 'p99'} <= set(report['latency_ms']))
+        for stats in report['views'].values():
+            self.assertTrue(all(int(code) < 400 for code in stats['status_codes']), stats['status_codes'])
+            self.assertGreater(stats['sql_queries']['max'], 0)
+
+
+class LoadTestHttpModeTests(LiveServerTestCase):
+    """With --base-url the load driver talks to a running server over HTTP."""
+
+    def test_reports_latency_over_http(self):
+        generate_dataset(departments=1, teachers_per_department=2, students_per_department=4, interests=2)
+        out = StringIO()
+
+        call_command(
+            'loadtest', requests=10, concurrency=1, base_url=self.live_server_url,
+            mix='filter_teachers=1,teacher_detail=1,send_request=1', stdout=out,
+        )
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['target'], self.live_server_url)
+        self.assertEqual(report['errors'], 0)
+        for stats in report['views'].values():
+            self.assertTrue(all(int(code) < 400 for code in stats['status_codes']), stats['status_codes'])
+            self.assertEqual(stats['sql_queries'], {})
+
+
+class QueryPlanTests(TestCase):
+    """Hot Slot and SlotRequest queries are answered through indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(
+            departments=5, teachers_per_department=300, students_per_department=2200, interests=5,
+            min_slots=7, max_slots=9, pending_ratio=1.0,
+        )
+        analyze_tables()
+
+    def test_hot_queries_avoid_sequential_scans(self):
+        checks = check_plans()
+
+        self.assertGreater(Slot.objects.count(), DEFAULT_MIN_ROWS)
+        self.assertGreater(SlotRequest.objects.count(), DEFAULT_MIN_ROWS)
+        for check in checks:
+            with self.subTest(check.name):
+                self.assertTrue(check.ok, check.plan)
+
+    def test_command_fails_on_sequential_scan(self):
+        queries = {**hot_queries(), 'by_topic': Slot.objects.filter(topic="Без індексу")}
+        with mock.patch('searching.plans.hot_queries', return_value=queries):
+            with self.assertRaisesMessage(CommandError, "Запитів із послідовним скануванням: 1"):
+                call_command('explain_hot_queries', stdout=StringIO())
+
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertIn("OK    teacher_free_slots", out.getvalue())
+
+
+class DeferredAcceptanceTests(SimpleTestCase):
+    """The vectorized engine finds stable matchings within capacity."""
+
+    def test_student_optimal_textbook_case(self):
+        # Both students prefer teacher 0, who prefers student 1.
+        choices = [[0, 1], [0, 1], [1, -1]]
+        priorities = [[1, 0], [0, 1], [2, 0]]
+
+        matching = deferred_acceptance(choices, priorities, capacity=[1, 1])
+
+        self.assertEqual(matching.assignment.tolist(), [1, 0, UNMATCHED])
+
+    def test_random_instances_are_stable(self):
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            students, teachers = int(rng.integers(1, 80)), int(rng.integers(1, 12))
+            width = min(teachers, 4)
+            choices = np.full((students, width), UNMATCHED)
+            for s in range(students):
+                picked = rng.permutation(teachers)[:rng.integers(0, width + 1)]
+                choices[s, :picked.size] = picked
+            ranking = np.array([rng.permutation(students) for _ in range(teachers)])
+            priorities = np.where(choices >= 0, ranking[np.maximum(choices, 0), np.arange(students)[:, None]], 0)
+            capacity = rng.integers(0, 4, teachers)
+
+            assignment = deferred_acceptance(choices, priorities, capacity).assignment
+
+            self.assertEqual(blocking_pairs(choices, priorities, capacity, assignment), [])
+            self.assertTrue((np.bincount(assignment[assignment >= 0], minlength=teachers) <= capacity).all())
+            for s in np.flatnonzero(assignment >= 0):
+                self.assertIn(assignment[s], choices[s])
+
+
+@override_settings(EVENTS_BACKEND='local')
+class AllocationRoundTests(TestCase):
+    """A round assigns all free slots of the department in one run."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teachers = [make_teacher(cls.department, f"t{i}@lnu.edu.ua", max_slots=1) for i in range(2)]
+        cls.students = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(email=f"s{i}@lnu.edu.ua"),
+                group="ПМі-31", year_of_study=3, department=cls.department,
+            )
+            for i in range(3)
+        ]
+        cls.round = AllocationRound.objects.create(department=cls.department)
+
+    def _prefer(self, student, *teachers):
+        save_student_preferences(self.round, student, [teacher.pk for teacher in teachers])
+
+    def test_allocates_by_preferences_and_ranking(self):
+        first, second = self.teachers
+        self._prefer(self.students[0], first, second)
+        self._prefer(self.students[1], first)
+        self._prefer(self.students[2], first, second)
+        save_teacher_ranking(self.round, first, [self.students[1].pk])
+        pending = SlotRequest.objects.create(student=self.students[2], slot=second.slots.get())
+
+        with mock.patch.object(events.LocalBackend, 'send', autospec=True) as send:
+            with self.captureOnCommitCallbacks(execute=True):
+                summary = allocate_round(self.round.pk)
+
+        assigned = dict(Slot.objects.filter(student__isnull=False).values_list('student_id', 'teacher_id'))
+        self.assertEqual(len(assigned), 2)
+        self.assertEqual(assigned[self.students[1].pk], first.pk)
+        # The other two compete for the second teacher and are ordered by lot.
+        (winner,) = set(assigned) - {self.students[1].pk}
+        self.assertEqual(assigned[winner], second.pk)
+        self.assertEqual((summary.matched, summary.unmatched, summary.slots), (2, 1, 2))
+        self.assertEqual(SlotRequest.objects.filter(status='approved').count(), 2)
+        self.assertEqual(
+            SlotRequest.objects.get(pk=pending.pk).status, 'cancelled' if winner == pending.student_id else 'rejected',
+        )
+        self.round.refresh_from_db()
+        self.assertEqual(self.round.status, AllocationRound.STATUS_ALLOCATED)
+        self.assertEqual(self.round.summary['matched'], 2)
+        self.assertIn('request_approved', [c.args[1]['event'] for c in send.call_args_list])
+
+        with self.assertRaises(AllocationError):
+            allocate_round(self.round.pk)
+
+    def test_leaves_other_assigned_slots_alone(self):
+        other = make_teacher(self.department, "other@lnu.edu.ua", max_slots=1)
+        outsider = StudentProfile.objects.create(
+            user=User.objects.create_user(email="outsider@lnu.edu.ua"), group="ПМі-31", year_of_study=3,
+        )
+        self._prefer(self.students[0], self.teachers[0])
+        now = timezone.now()
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            # Written in the same transaction and at the same time as the round's slots.
+            with transaction.atomic():
+                slot = other.slots.get()
+                slot.student = self.students[2]
+                slot.save()
+                waiting = SlotRequest.objects.create(student=outsider, slot=slot)
+                allocate_round(self.round.pk)
+
+        self.assertEqual(SlotRequest.objects.get(pk=waiting.pk).status, 'pending')
+
+    def test_query_count_does_not_grow_with_students(self):
+        def run(count):
+            for student in self.students[:count]:
+                self._prefer(student, *self.teachers)
+            with CaptureQueriesContext(connection) as ctx:
+                allocate_round(self.round.pk)
+            return len(ctx.captured_queries)
+
+        with transaction.atomic():
+            small = run(1)
+            transaction.set_rollback(True)
+        self.assertEqual(run(3), small)
+
+    def test_closed_round_rejects_preferences(self):
+        self.round.status = AllocationRound.STATUS_ALLOCATED
+        self.round.save()
+
+        with self.assertRaises(AllocationError):
+            self._prefer(self.students[0], self.teachers[0])
+
+    def test_admin_action_queues_allocation(self):
+        self._prefer(self.students[0], self.teachers[0])
+        admin = User.objects.create_superuser(email="admin@lnu.edu.ua", password="x")
+        self.client.force_login(admin)
+
+        self.client.post(reverse('admin:searching_allocationround_changelist'), {
+            'action': 'allocate', '_selected_action': [self.round.pk],
+        })
+        call_command('run_jobs', workers=0, once=True, stdout=StringIO())
+
+        self.assertEqual(Slot.objects.get(student=self.students[0]).teacher, self.teachers[0])
+
+
+class AllocationViewTests(TestCase):
+    """Students rank teachers and teachers rank applicants while a round is open."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.teachers = [make_teacher(cls.department, f"t{i}@lnu.edu.ua", max_slots=1) for i in range(2)]
+        cls.students = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(email=f"s{i}@lnu.edu.ua", last_name=f"С{i}"),
+                group="ПМі-31", year_of_study=3, department=cls.department,
+            )
+            for i in range(2)
+        ]
+        cls.round = AllocationRound.objects.create(department=cls.department, max_choices=2)
+
+    def test_student_submits_ranked_list(self):
+        self.client.force_login(self.students[0].user)
+        url = reverse('searching:allocation_preferences')
+
+        response = self.client.post(url, {'choice_1': self.teachers[1].pk, 'choice_2': self.teachers[1].pk})
+        self.assertContains(response, "лише один раз")
+
+        response = self.client.post(url, {'choice_1': self.teachers[1].pk, 'choice_2': self.teachers[0].pk})
+        self.assertRedirects(response, url)
+        self.assertEqual(
+            list(self.round.student_preferences.order_by('rank').values_list('teacher_id', flat=True)),
+            [self.teachers[1].pk, self.teachers[0].pk],
+        )
+        self.assertContains(self.client.get(reverse('profiles:student_profile')), url)
+
+    def test_teacher_ranks_applicants(self):
+        teacher = self.teachers[0]
+        for student in self.students:
+            save_student_preferences(self.round, student, [teacher.pk])
+        self.client.force_login(teacher.user)
+        url = reverse('searching:allocation_applicants')
+
+        response = self.client.get(url)
+        self.assertContains(response, self.students[1].user.email)
+
+        response = self.client.post(url, {
+            f'student_{self.students[0].pk}': 5, f'student_{self.students[1].pk}': 2,
+        })
+        self.assertRedirects(response, url)
+        self.assertEqual(
+            list(self.round.teacher_preferences.order_by('rank').values_list('student_id', 'rank')),
+            [(self.students[1].pk, 1), (self.students[0].pk, 2)],
+        )
+
+    def test_without_open_round_redirects_to_profile(self):
+        AllocationRound.objects.update(status=AllocationRound.STATUS_ALLOCATED)
+        self.client.force_login(self.students[0].user)
+
+        response = self.client.get(reverse('searching:allocation_preferences'))
+
+        self.assertRedirects(response, reverse('profiles:student_profile'), fetch_redirect_response=False)
@@ -13,5 +13,8 @@ urlpatterns = [
     path('teacher/slots/', views.teacher_slots_view, name='teacher_slots'),
     path('teacher/slots/<int:slot_id>/', views.slot_detail_view, name='slot_detail'),
     path('teacher/slots/<int:slot_id>/edit/', views.edit_slot_view, name='edit_slot'),
+    path('allocation/preferences/', views.allocation_preferences_view, name='allocation_preferences'),
+    path('allocation/applicants/', views.allocation_applicants_view, name='allocation_applicants'),
+    path('events/', views.events_view, name='events'),
 ]
 
@@ -0,0 +1,69 @@
+"""Version tokens of cached data, stored in the database.
+
+Caches may be per process (the default ``locmemcache://``), while data is
+changed by every gunicorn worker and by the ``run_jobs`` worker. So the
+tokens that key cached values live in the ``CacheVersion`` table: a bump in
+any process is seen by all of them on their next read, and cached values of
+the old version are simply never looked up again.
+"""
+
+import time
+
+from django.db import transaction
+
+from .models import CacheVersion
+
+
+def current_versions(keys):
+    """
+    Return the versions of the given keys.
+
+    Keys that were never bumped have version 0.
+
+    Args:
+        keys: Iterable of version keys.
+
+    Returns:
+        dict: Mapping of key to version token.
+    """
+    keys = list(keys)
+    found = dict(CacheVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {key: found.get(key, 0) for key in keys}
+
+
+def current_version(key):
+    """
+    Return the version of one key, 0 if it was never bumped.
+
+    Args:
+        key: Version key.
+
+    Returns:
+        int: Version token.
+    """
+    return current_versions([key])[key]
+
+
+def bump_versions(keys):
+    """
+    Give the keys a fresh version once the transaction commits.
+
+    Bumping after commit keeps a concurrent request from caching data that
+    is not committed yet under the new version.
+
+    Args:
+        keys: Iterable of version keys.
+    """
+    keys = set(keys)
+    if not keys:
+        return
+
+    def bump():
+        version = time.time_ns()
+        # Rows are locked in key order, so concurrent bumps cannot deadlock.
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(key=key, version=version) for key in sorted(keys)],
+            update_conflicts=True, unique_fields=['key'], update_fields=['version'],
+        )
+
+    transaction.on_commit(bump)
@@ -1,17 +1,83 @@
 """Views for teacher search, slot management, and request handling."""
 
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from mentorion.db_routing import replica_reads
+from profiles import reference
+from profiles.decorators import login_required, student_required, teacher_required
+from profiles.models import StudentProfile, TeacherProfile
+from profiles.recommendations import recommend_teachers
+from users.roles import ROLE_STUDENT, resolve_profile
+
+from . import events
+from .allocation import AllocationError, save_student_preferences, save_teacher_ranking
+from .cards import page_versions
+from .catalog import CATALOG_SORTS, filter_catalog
+from .conditional import catalog_state, conditional_page, teacher_detail_state
+from .facets import facet_counts, facet_options
+from .forms import StudentPreferenceForm, TeacherRankingForm
+from .models import AllocationRound, Slot, SlotRequest
+from .pagination import InvalidCursor, KeysetPaginator
+
+CATALOG_PAGE_SIZE = 24
+REQUESTS_PAGE_SIZE = 25
 
-from profiles.decorators import student_required, teacher_required
-from profiles.models import Department, ScientificInterest, TeacherProfile
+REQUESTS_ORDERING = ['-created_at', '-id']
 
-from .models import Slot, SlotRequest
+
+async def _alist(queryset):
+    """Evaluate a queryset with the async ORM and return a list."""
+    return [obj async for obj in queryset]
+
+
+def _keyset_page(paginator, cursor):
+    """Return the page after ``cursor``, falling back to the first page for bad cursors."""
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        return paginator.page()
+
+
+def _page_url(request, cursor=None):
+    """
+    Build the current URL for another page, keeping the other query parameters.
+
+    Args:
+        request: HTTP request object.
+        cursor: Cursor of the page, or None for the first page.
+
+    Returns:
+        str: URL of the page.
+    """
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    if cursor:
+        params['cursor'] = cursor
+    return f"{request.path}?{params.urlencode()}" if params else request.path
+
+
+def _pagination_context(request, page):
+    """Return template context with links to the next and the first page."""
+    return {
+        'next_url': _page_url(request, page.next_cursor) if page.has_next else None,
+        'first_url': _page_url(request) if request.GET.get('cursor') else None,
+    }
 
 
 @login_required
 @student_required
+@replica_reads
+@conditional_page(catalog_state)
 def filter_teachers_view(request):
     """
     Display filtered list of approved teachers for students.
@@ -20,8 +86,15 @@ def filter_teachers_view(request):
     - Only approved teachers
     - By department (optional)
     - By scientific interests (optional)
+    - By free-text query ``q`` over bios, interests and slot topics (optional, ranked)
     - 3rd/4th year students: only teachers from their department
 
+    Results are paginated by cursor and sorted by surname (``sort=name``),
+    free slots (``sort=availability``) or relevance when searching. The first
+    page without a query also shows teachers recommended for the student's
+    course topic. Filter options show how many teachers, and how
+    many of them with free slots, each option would list.
+
     Args:
         request: HTTP request object.
 
@@ -29,39 +102,50 @@ def filter_teachers_view(request):
         HttpResponse: Rendered teacher list page.
     """
     student_profile = request.user.student_profile
-    teachers = TeacherProfile.objects.filter(is_approved=True)
-
-    department_id = request.GET.get('department')
-    if department_id:
-        teachers = teachers.filter(department_id=department_id)
-
-    interest_id = request.GET.get('interest')
-    if interest_id:
-        teachers = teachers.filter(scientific_interests__id=interest_id)
-
-    if student_profile.year_of_study in [3, 4] and student_profile.department:
-        teachers = teachers.filter(department=student_profile.department)
+    teachers, department_id, interest_id, query, sort = filter_catalog(request.GET, student_profile)
 
-    teachers = teachers.distinct()
+    total = teachers.count()
+    paginator = KeysetPaginator(
+        teachers.for_catalog().with_sort_names(), CATALOG_SORTS[sort], CATALOG_PAGE_SIZE,
+    )
+    page = _keyset_page(paginator, request.GET.get('cursor'))
+    recommended = []
+    if student_profile.course_topic and not query and not request.GET.get('cursor'):
+        recommended = recommend_teachers(teachers.for_catalog(), student_profile.course_topic)
+    teachers = page.items
+    version, versions = page_versions([teacher.pk for teacher in [*teachers, *recommended]])
+    facets = facet_counts(student_profile, department_id, interest_id, query, version=version)
+    for teacher in [*teachers, *recommended]:
+        teacher.card_version = versions[teacher.pk]
 
     context = {
         'teachers': teachers,
-        'departments': Department.objects.all(),
-        'interests': ScientificInterest.objects.all(),
+        'recommended': recommended,
+        'departments': facet_options(reference.departments(), facets.get('departments', {})),
+        'interests': facet_options(reference.interests(), facets['interests']),
         'selected_department': department_id,
         'selected_interest': interest_id,
+        'query': query,
+        'sort': sort,
+        'total': total,
         'student_profile': student_profile,
         'hide_department_filter': student_profile.year_of_study in [3, 4],
+        **_pagination_context(request, page),
     }
     return render(request, 'searching/filter_teachers.html', context)
 
 
 @login_required
 @student_required
-def teacher_detail_view(request, teacher_id):
+@replica_reads
+@conditional_page(teacher_detail_state)
+async def teacher_detail_view(request, teacher_id):
     """
     Display detailed teacher profile with available slots.
 
+    The teacher, the student's pending request to them, the student's
+    assigned slot and the free slots are loaded concurrently.
+
     Args:
         request: HTTP request object.
         teacher_id: ID of the teacher to display.
@@ -69,32 +153,39 @@ def teacher_detail_view(request, teacher_id):
     Returns:
         HttpResponse: Rendered teacher detail page.
     """
-    teacher = get_object_or_404(TeacherProfile, id=teacher_id)
     student_profile = request.user.student_profile
 
+    teacher, active_request, has_assigned_slot, available_slots = await asyncio.gather(
+        TeacherProfile.objects.for_catalog().filter(id=teacher_id).afirst(),
+        SlotRequest.objects.filter(
+            student=student_profile,
+            slot__teacher_id=teacher_id,
+            status='pending'
+        ).afirst(),
+        Slot.objects.filter(student=student_profile, is_filled=True).aexists(),
+        _alist(Slot.objects.filter(
+            teacher_id=teacher_id, is_available=True, is_filled=False,
+        ).order_by('-created_at', '-id')),
+    )
+    if teacher is None:
+        raise Http404("Викладача не знайдено.")
+
     # For 3rd/4th year students restrict access to teachers from their department only
-    if student_profile.year_of_study in [3, 4] and student_profile.department:
-        if teacher.department != student_profile.department:
+    if student_profile.year_of_study in [3, 4] and student_profile.department_id:
+        if teacher.department_id != student_profile.department_id:
             messages.error(request, "Ви можете переглядати лише викладачів своєї кафедри.")
             return redirect('searching:filter_teachers')
 
-    available_slots = teacher.slots.filter(is_available=True, is_filled=False)
-    active_request = SlotRequest.objects.filter(
-        student=student_profile,
-        slot__teacher=teacher,
-        status='pending'
-    ).first()
-    has_assigned_slot = Slot.objects.filter(student=student_profile, is_filled=True).exists()
-
     context = {
         'teacher': teacher,
         'available_slots': available_slots,
-        'first_available_slot': available_slots.first(),
+        'first_available_slot': available_slots[0] if available_slots else None,
         'active_request': active_request,
         'has_assigned_slot': has_assigned_slot,
-        'can_send_request': not active_request and not has_assigned_slot and available_slots.exists(),
+        'can_send_request': not active_request and not has_assigned_slot and bool(available_slots),
     }
-    return render(request, 'searching/teacher_detail.html', context)
+    # Rendered by the handler in a worker thread, so templates may still touch the ORM.
+    return TemplateResponse(request, 'searching/teacher_detail.html', context)
 
 
 @login_required
@@ -121,7 +212,7 @@ def send_slot_request_view(request, slot_id):
     if request.method == 'POST':
         slot_id = request.POST.get('slot_id', slot_id)
 
-    slot = get_object_or_404(Slot, id=slot_id)
+    slot = get_object_or_404(Slot.objects.select_related('teacher'), id=slot_id)
     student_profile = request.user.student_profile
 
     if student_profile.year_of_study in [3, 4] and student_profile.department:
@@ -134,21 +225,35 @@ def send_slot_request_view(request, slot_id):
         messages.error(request, "Цей слот вже зайнятий.")
         return redirect('searching:teacher_detail', teacher_id=slot.teacher.id)
 
-    if SlotRequest.objects.filter(student=student_profile, status='pending').exists():
+    try:
+        with transaction.atomic():
+            # Lock the student row so parallel sends (e.g. a double click) are serialized.
+            StudentProfile.objects.select_for_update(no_key=True).filter(pk=student_profile.pk).first()
+
+            if SlotRequest.objects.filter(student=student_profile, status='pending').exists():
+                messages.error(request, "У вас вже є активний запит. Спочатку дочекайтеся відповіді.")
+                return redirect('profiles:student_profile')
+
+            if Slot.objects.filter(student=student_profile, is_filled=True).exists():
+                messages.error(request, "Ви вже прикріплені до викладача.")
+                return redirect('profiles:student_profile')
+
+            slot_request = SlotRequest.objects.create(
+                student=student_profile,
+                slot=slot,
+                status='pending',
+                message=request.POST.get('message', '')
+            )
+            student_name = f"{request.user.first_name} {request.user.last_name}".strip() or request.user.email
+            events.publish(
+                'request_created',
+                {'request_id': slot_request.pk, 'slot_id': slot.pk, 'message': f"Новий запит від {student_name}"},
+                user_ids=[slot.teacher.user_id],
+            )
+    except IntegrityError:
         messages.error(request, "У вас вже є активний запит. Спочатку дочекайтеся відповіді.")
         return redirect('profiles:student_profile')
 
-    if Slot.objects.filter(student=student_profile, is_filled=True).exists():
-        messages.error(request, "Ви вже прикріплені до викладача.")
-        return redirect('profiles:student_profile')
-
-    SlotRequest.objects.create(
-        student=student_profile,
-        slot=slot,
-        status='pending',
-        message=request.POST.get('message', '')
-    )
-
     messages.success(request, "Запит успішно надіслано!")
     return redirect('profiles:student_profile')
 
@@ -157,7 +262,13 @@ def send_slot_request_view(request, slot_id):
 @teacher_required
 def teacher_requests_view(request):
     """
-    Display all slot requests for the teacher.
+    Display slot requests for the teacher, newest first.
+
+    Filters:
+    - By status (optional)
+    - By ``q`` over student name, email and course topic (optional)
+
+    Results are paginated by cursor over ``created_at``.
 
     Args:
         request: HTTP request object.
@@ -168,9 +279,33 @@ def teacher_requests_view(request):
     teacher_profile = request.user.teacher_profile
     requests = SlotRequest.objects.filter(
         slot__teacher=teacher_profile
-    ).order_by('-created_at')
+    ).select_related('slot', 'student__user')
+
+    status = request.GET.get('status', '')
+    if status in dict(SlotRequest.STATUS_CHOICES):
+        requests = requests.filter(status=status)
+    else:
+        status = ''
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        requests = requests.filter(
+            Q(student__user__first_name__icontains=query)
+            | Q(student__user__last_name__icontains=query)
+            | Q(student__user__email__icontains=query)
+            | Q(student__course_topic__icontains=query)
+        )
+
+    paginator = KeysetPaginator(requests, REQUESTS_ORDERING, REQUESTS_PAGE_SIZE)
+    page = _keyset_page(paginator, request.GET.get('cursor'))
 
-    context = {'requests': requests}
+    context = {
+        'requests': page.items,
+        'status_choices': SlotRequest.STATUS_CHOICES,
+        'selected_status': status,
+        'query': query,
+        **_pagination_context(request, page),
+    }
     return render(request, 'searching/teacher_requests.html', context)
 
 
@@ -184,6 +319,7 @@ def approve_request_view(request, request_id):
     - Teacher owns the slot
     - Request is pending
     - Slot is not already filled
+    - Student is not already assigned to another slot
 
     Args:
         request: HTTP request object.
@@ -192,35 +328,82 @@ def approve_request_view(request, request_id):
     Returns:
         HttpResponse: Redirect to teacher requests page.
     """
-    slot_request = get_object_or_404(SlotRequest, id=request_id)
+    slot_request = get_object_or_404(SlotRequest.objects.select_related('slot'), id=request_id)
 
-    if slot_request.slot.teacher != request.user.teacher_profile:
+    if slot_request.slot.teacher_id != request.user.teacher_profile.id:
         messages.error(request, "Ви не маєте доступу до цього запиту.")
         return redirect('searching:teacher_requests')
 
-    if slot_request.status != 'pending':
-        messages.error(request, "Цей запит вже оброблено.")
-        return redirect('searching:teacher_requests')
+    try:
+        error = _approve_slot_request(slot_request)
+    except IntegrityError:
+        error = "Не вдалося підтвердити запит через одночасну зміну. Спробуйте ще раз."
 
-    if slot_request.slot.is_filled:
-        messages.error(request, "Цей слот вже зайнятий.")
-        return redirect('searching:teacher_requests')
+    if error:
+        messages.error(request, error)
+    else:
+        messages.success(request, "Запит підтверджено!")
+    return redirect('searching:teacher_requests')
 
-    slot_request.slot.student = slot_request.student
-    slot_request.slot.is_filled = True
-    slot_request.slot.is_available = False
-    slot_request.slot.save()
 
-    slot_request.status = 'approved'
-    slot_request.save()
+def _approve_slot_request(slot_request):
+    """
+    Assign the requested slot to the student in one transaction.
 
-    SlotRequest.objects.filter(
-        slot=slot_request.slot,
-        status='pending'
-    ).exclude(id=request_id).update(status='rejected')
+    Rows are locked in a fixed order (slot, student, request) so concurrent
+    approvals and sends serialize without deadlocks. ``FOR NO KEY UPDATE``
+    does not block the key-share locks taken by foreign key checks of
+    concurrent inserts.
 
-    messages.success(request, "Запит підтверджено!")
-    return redirect('searching:teacher_requests')
+    Args:
+        slot_request: SlotRequest to approve.
+
+    Returns:
+        str or None: Error message, or None if the request was approved.
+    """
+    with transaction.atomic():
+        slot = Slot.objects.select_for_update(no_key=True).get(pk=slot_request.slot_id)
+        student = StudentProfile.objects.select_for_update(no_key=True).get(pk=slot_request.student_id)
+        slot_request = SlotRequest.objects.select_for_update(no_key=True).get(pk=slot_request.pk)
+
+        if slot_request.status != 'pending':
+            return "Цей запит вже оброблено."
+
+        if slot.is_filled or slot.student_id is not None:
+            return "Цей слот вже зайнятий."
+
+        if Slot.objects.filter(student=student).exists():
+            return "Студент вже прикріплений до іншого викладача."
+
+        slot.student = student
+        slot.is_filled = True
+        slot.is_available = False
+        slot.save()
+
+        slot_request.status = 'approved'
+        slot_request.save()
+
+        competing = dict(
+            SlotRequest.objects.filter(slot=slot, status='pending').exclude(id=slot_request.pk).values_list(
+                'pk', 'student__user_id',
+            )
+        )
+        if competing:
+            SlotRequest.objects.filter(pk__in=competing).update(status='rejected', updated_at=timezone.now())
+
+        events.publish(
+            'request_approved',
+            {'request_id': slot_request.pk, 'message': "Ваш запит підтверджено!"},
+            user_ids=[student.user_id],
+        )
+        for request_id, user_id in competing.items():
+            events.publish(
+                'request_rejected',
+                {'request_id': request_id, 'message': "Ваш запит відхилено: слот зайнято іншим студентом."},
+                user_ids=[user_id],
+            )
+
+    return None
 
 
 @login_required
@@ -236,18 +419,25 @@ def reject_request_view(request, request_id):
     Returns:
         HttpResponse: Redirect to teacher requests page.
     """
-    slot_request = get_object_or_404(SlotRequest, id=request_id)
+    slot_request = get_object_or_404(SlotRequest.objects.select_related('slot'), id=request_id)
 
-    if slot_request.slot.teacher != request.user.teacher_profile:
+    if slot_request.slot.teacher_id != request.user.teacher_profile.id:
         messages.error(request, "Ви не маєте доступу до цього запиту.")
         return redirect('searching:teacher_requests')
 
-    if slot_request.status != 'pending':
-        messages.error(request, "Цей запит вже оброблено.")
-        return redirect('searching:teacher_requests')
+    with transaction.atomic():
+        slot_request = SlotRequest.objects.select_for_update(no_key=True).get(pk=slot_request.pk)
+        if slot_request.status != 'pending':
+            messages.error(request, "Цей запит вже оброблено.")
+            return redirect('searching:teacher_requests')
 
-    slot_request.status = 'rejected'
-    slot_request.save()
+        slot_request.status = 'rejected'
+        slot_request.save()
+        events.publish(
+            'request_rejected',
+            {'request_id': slot_request.pk, 'message': "Ваш запит відхилено."},
+            user_ids=StudentProfile.objects.filter(pk=slot_request.student_id).values_list('user_id', flat=True),
+        )
 
     messages.success(request, "Запит відхилено.")
     return redirect('searching:teacher_requests')
@@ -255,6 +445,7 @@ def reject_request_view(request, request_id):
 
 @login_required
 @teacher_required
+@replica_reads
 def teacher_slots_view(request):
     """
     Display all slots for the teacher.
@@ -266,7 +457,7 @@ def teacher_slots_view(request):
         HttpResponse: Rendered slots list page.
     """
     teacher_profile = request.user.teacher_profile
-    slots = teacher_profile.slots.all().order_by('-created_at')
+    slots = teacher_profile.slots.select_related('student__user').order_by('-created_at')
 
     context = {
         'slots': slots,
@@ -294,13 +485,13 @@ def slot_detail_view(request, slot_id):
     Returns:
         HttpResponse: Rendered slot detail page.
     """
-    slot = get_object_or_404(Slot, id=slot_id)
+    slot = get_object_or_404(Slot.objects.select_related('student__user'), id=slot_id)
 
-    if slot.teacher != request.user.teacher_profile:
+    if slot.teacher_id != request.user.teacher_profile.id:
         messages.error(request, "Ви не маєте доступу до цього слота.")
         return redirect('searching:teacher_slots')
 
-    requests = slot.requests.all().order_by('-created_at')
+    requests = slot.requests.select_related('student__user').order_by('-created_at')
 
     context = {
         'slot': slot,
@@ -324,7 +515,7 @@ def edit_slot_view(request, slot_id):
     """
     slot = get_object_or_404(Slot, id=slot_id)
 
-    if slot.teacher != request.user.teacher_profile:
+    if slot.teacher_id != request.user.teacher_profile.id:
         messages.error(request, "Ви не маєте доступу до цього слота.")
         return redirect('searching:teacher_slots')
 
@@ -341,3 +532,156 @@ def edit_slot_view(request, slot_id):
 
     context = {'slot': slot}
     return render(request, 'searching/edit_slot.html', context)
+
+
+def _open_round(department_id):
+    """Return the open allocation round of a department, if any."""
+    if department_id is None:
+        return None
+    return AllocationRound.objects.filter(department_id=department_id, status=AllocationRound.STATUS_OPEN).first()
+
+
+@login_required
+@student_required
+def allocation_preferences_view(request):
+    """
+    Let a student rank teachers of their department for the open allocation round.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        HttpResponse: Rendered preferences form or redirect to student profile.
+    """
+    student_profile = request.user.student_profile
+    allocation_round = _open_round(student_profile.department_id)
+    if allocation_round is None:
+        messages.info(request, "Для вашої кафедри зараз немає відкритого розподілу.")
+        return redirect('profiles:student_profile')
+
+    if Slot.objects.filter(student=student_profile).exists():
+        messages.error(request, "Ви вже прикріплені до викладача.")
+        return redirect('profiles:student_profile')
+
+    teachers = TeacherProfile.objects.filter(
+        department_id=allocation_round.department_id, is_approved=True,
+    ).select_related('user').order_by('user__last_name', 'user__first_name', 'pk')
+    current = allocation_round.student_preferences.filter(student=student_profile).order_by('rank').values_list(
+        'teacher_id', flat=True,
+    )
+    form = StudentPreferenceForm(
+        request.POST or None,
+        teachers=teachers,
+        max_choices=allocation_round.max_choices,
+        initial={f'choice_{place}': teacher_id for place, teacher_id in enumerate(current, start=1)},
+    )
+
+    if request.method == 'POST' and form.is_valid():
+        try:
+            save_student_preferences(allocation_round, student_profile, form.cleaned_data['teacher_ids'])
+        except AllocationError as exc:
+            messages.error(request, str(exc))
+            return redirect('profiles:student_profile')
+        messages.success(request, "Ваш вибір збережено. Результати з'являться після розподілу.")
+        return redirect('searching:allocation_preferences')
+
+    context = {'allocation_round': allocation_round, 'form': form}
+    return render(request, 'searching/allocation_preferences.html', context)
+
+
+@login_required
+@teacher_required
+def allocation_applicants_view(request):
+    """
+    Let a teacher rank the students who chose them in the open allocation round.
+
+    Ranking is optional: unranked applicants are ordered by lot.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        HttpResponse: Rendered applicants form or redirect to teacher profile.
+    """
+    teacher_profile = request.user.teacher_profile
+    allocation_round = _open_round(teacher_profile.department_id)
+    if allocation_round is None:
+        messages.info(request, "Для вашої кафедри зараз немає відкритого розподілу.")
+        return redirect('profiles:teacher_profile')
+
+    applicants = StudentProfile.objects.filter(
+        allocation_preferences__round=allocation_round, allocation_preferences__teacher=teacher_profile,
+    ).annotate(choice=F('allocation_preferences__rank')).select_related('user').order_by(
+        'user__last_name', 'user__first_name', 'pk',
+    )
+    current = allocation_round.teacher_preferences.filter(teacher=teacher_profile).values_list('student_id', 'rank')
+    form = TeacherRankingForm(
+        request.POST or None,
+        applicants=applicants,
+        initial={f'student_{student_id}': rank for student_id, rank in current},
+    )
+
+    if request.method == 'POST' and form.is_valid():
+        try:
+            save_teacher_ranking(allocation_round, teacher_profile, form.ranked_student_ids())
+        except AllocationError as exc:
+            messages.error(request, str(exc))
+            return redirect('profiles:teacher_profile')
+        messages.success(request, "Рейтинг студентів збережено.")
+        return redirect('searching:allocation_applicants')
+
+    context = {
+        'allocation_round': allocation_round,
+        'form': form,
+        'rows': [(student, form[f'student_{student.pk}']) for student in form.applicants],
+    }
+    return render(request, 'searching/allocation_applicants.html', context)
+
+
+def _stream_identity(request):
+    """
+    Return the hub keys of the requesting user, or ``None`` for anonymous users.
+
+    Runs in the request's worker thread and closes its database connections
+    afterwards, so an idle stream does not hold one.
+    """
+    try:
+        if not request.user.is_authenticated:
+            return None
+        keys = [events.user_key(request.user.pk)]
+        if resolve_profile(request.user).role == ROLE_STUDENT:
+            keys.append(events.STUDENTS)
+        return keys
+    finally:
+        events.release_connections()
+
+
+async def events_view(request):
+    """
+    Stream live events of the current user as Server-Sent Events.
+
+    Teachers get new requests; students get decisions on their requests and
+    notices about freed slots. Only served under ASGI: a sync worker would be
+    held for the whole stream, so WSGI requests get 204 and the browser stops
+    reconnecting. Anonymous users get 403 instead of a login redirect, which
+    ``EventSource`` could not follow anyway.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        StreamingHttpResponse: ``text/event-stream`` response.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    # Reconnect storms would otherwise open one database connection per stream at once.
+    async with events.handshake_slots:
+        keys = await sync_to_async(_stream_identity)(request)
+    if keys is None:
+        return HttpResponse(status=403)
+
+    response = StreamingHttpResponse(events.stream(keys), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
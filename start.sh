@@ -15,6 +15,9 @@ python manage.py collectstatic --noinput
 echo "--> Creating superuser (if needed)..."
 python create_superuser.py
 
+echo "--> Starting background job worker..."
+python manage.py run_jobs &
+
 echo "--> Starting Gunicorn Server..."
 
-gunicorn mentorion.wsgi:application
\ No newline at end of file
+gunicorn -c gunicorn.conf.py
\ No newline at end of file
@@ -0,0 +1,38 @@
+/*
+ * Live notices from the Server-Sent Events stream (searching:events).
+ *
+ * Usage: <ul class="messages" id="live-events" data-url="..." data-events="request_created slot_freed"></ul>
+ * Every listed event shows its message with a link to refresh the page, so
+ * the page is only reloaded when something has actually changed.
+ */
+(function () {
+    var container = document.getElementById('live-events');
+    if (!container || !window.EventSource) {
+        return;
+    }
+
+    var source = new EventSource(container.dataset.url);
+    var shown = {};
+
+    function show(event) {
+        var data = JSON.parse(event.data);
+        var item = shown[event.type];
+        if (!item) {
+            item = document.createElement('li');
+            item.className = 'message info';
+            shown[event.type] = item;
+            container.appendChild(item);
+        }
+        item.textContent = data.message + ' ';
+        var link = document.createElement('a');
+        link.href = window.location.href;
+        link.textContent = 'Оновити сторінку';
+        item.appendChild(link);
+    }
+
+    container.dataset.events.split(/\s+/).forEach(function (name) {
+        if (name) {
+            source.addEventListener(name, show);
+        }
+    });
+})();
@@ -7,13 +7,15 @@ from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from django.shortcuts import render
 from django.urls import reverse
 
-from profiles.models import StudentProfile, TeacherProfile
+from mentorion.tracing import ADAPTER, traced
 from users.models import User
+from users.roles import ROLE_STUDENT, ROLE_TEACHER, resolve_profile
 
 
 class CustomAccountAdapter(DefaultAccountAdapter):
     """Custom account adapter for handling post-login redirects based on user profile type."""
 
+    @traced(ADAPTER)
     def get_login_redirect_url(self, request):
         """
         Determine the redirect URL after successful login.
@@ -46,10 +48,11 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             return reverse('home')
 
         try:
-            if StudentProfile.objects.filter(user=user).exists():
+            role = resolve_profile(user).role
+            if role == ROLE_STUDENT:
                 return reverse('profiles:student_profile')
 
-            if TeacherProfile.objects.filter(user=user).exists():
+            if role == ROLE_TEACHER:
                 return reverse('profiles:teacher_profile')
         except Exception:
             pass
@@ -62,6 +65,7 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
 
     ALLOWED_EMAIL_DOMAIN = '@lnu.edu.ua'
 
+    @traced(ADAPTER)
     def get_connect_redirect_url(self, request, socialaccount):
         """
         Determine redirect URL after social account connection.
@@ -76,6 +80,7 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
         adapter = CustomAccountAdapter()
         return adapter._get_redirect_url(request)
 
+    @traced(ADAPTER)
     def pre_social_login(self, request, sociallogin):
         """
         Handle pre-login logic for social authentication.
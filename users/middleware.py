@@ -0,0 +1,30 @@
+"""Middleware attaching the resolved role and profile to each request."""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+from .roles import resolve_profile
+
+
+class ProfileMiddleware:
+    """
+    Expose ``request.profile`` with the user's role and profile.
+
+    The value is resolved lazily on first access and shared by the role
+    decorators, views and allauth adapters, so the profile is loaded at most
+    once per request. Must be placed after ``AuthenticationMiddleware``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.profile = SimpleLazyObject(lambda: resolve_profile(request.user))
+        # Under ASGI get_response is a coroutine function and its coroutine
+        # is returned to the caller as is.
+        return self.get_response(request)
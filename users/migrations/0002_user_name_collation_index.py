@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 09:30
+
+from django.conf import settings
+from django.db import migrations
+
+INDEX_NAME = 'users_user_name_collated_idx'
+
+
+def create_name_index(apps, schema_editor):
+    """Index surnames with the catalog collation for keyset sorting (PostgreSQL only)."""
+    collation = getattr(settings, 'CATALOG_COLLATION', None)
+    if schema_editor.connection.vendor != 'postgresql' or not collation:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_collation WHERE collname = %s', [collation])
+        if cursor.fetchone() is None:
+            return
+    collation = schema_editor.quote_name(collation)
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON users_user '
+        f'(last_name COLLATE {collation}, first_name COLLATE {collation}, id)'
+    )
+
+
+def drop_name_index(apps, schema_editor):
+    """Drop the collated name index (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
@@ -3,6 +3,8 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 
+from .roles import ROLE_STUDENT, ROLE_TEACHER, resolve_profile
+
 
 class UserManager(BaseUserManager):
     """Custom user manager for email-based authentication instead of username."""
@@ -84,8 +86,7 @@ class User(AbstractUser):
         Returns:
             bool: True if user has a StudentProfile, False otherwise.
         """
-        from profiles.models import StudentProfile
-        return StudentProfile.objects.filter(user=self).exists()
+        return self.profile_role == ROLE_STUDENT
 
     @property
     def is_teacher(self):
@@ -95,8 +96,7 @@ class User(AbstractUser):
         Returns:
             bool: True if user has a TeacherProfile, False otherwise.
         """
-        from profiles.models import TeacherProfile
-        return TeacherProfile.objects.filter(user=self).exists()
+        return self.profile_role == ROLE_TEACHER
 
     @property
     def has_profile(self):
@@ -106,18 +106,16 @@ class User(AbstractUser):
         Returns:
             bool: True if user has either profile type, False otherwise.
         """
-        return self.is_student or self.is_teacher
+        return self.profile_role is not None
 
     @property
     def profile_role(self):
         """
         Get the user's profile role.
 
+        The role is resolved once per user instance (see ``users.roles``).
+
         Returns:
             str or None: 'student', 'teacher', or None if no profile exists.
         """
-        if self.is_student:
-            return 'student'
-        if self.is_teacher:
-            return 'teacher'
-        return None
\ No newline at end of file
+        return resolve_profile(self).role
@@ -0,0 +1,134 @@
+"""Per-request resolution of the user's role and profile.
+
+The role (student/teacher/none) and the matching profile are loaded once per
+request and memoized on the user instance. Across requests the role and the
+profile id are kept in the cache, so an authenticated page view costs at most
+one profile lookup. Profile save/delete signals invalidate the cached entry.
+"""
+
+from typing import NamedTuple, Optional
+
+from django.core.cache import cache
+from django.db import models
+
+ROLE_STUDENT = 'student'
+ROLE_TEACHER = 'teacher'
+
+CACHE_KEY = 'users:role:{user_id}'
+CACHE_TIMEOUT = 60 * 60
+
+_MEMO_ATTR = '_resolved_profile'
+
+
+class ResolvedProfile(NamedTuple):
+    """Role of the user and the matching profile (``None`` if no profile)."""
+
+    role: Optional[str]
+    profile: Optional[models.Model]
+
+
+NO_PROFILE = ResolvedProfile(None, None)
+
+
+def _cache_key(user_id):
+    """Return the cross-request cache key for a user id."""
+    return CACHE_KEY.format(user_id=user_id)
+
+
+def resolve_profile(user):
+    """
+    Resolve the user's role and profile, loading them at most once per user instance.
+
+    The matching reverse relation (``user.student_profile`` or
+    ``user.teacher_profile``) is primed, so views can use it without
+    another query.
+
+    Args:
+        user: User instance (may be anonymous).
+
+    Returns:
+        ResolvedProfile: The user's role and profile.
+    """
+    if user is None or not user.is_authenticated:
+        return NO_PROFILE
+
+    resolved = user.__dict__.get(_MEMO_ATTR)
+    if resolved is None:
+        resolved = _load(user)
+        _prime_relations(user, resolved)
+        user.__dict__[_MEMO_ATTR] = resolved
+    return resolved
+
+
+def forget_profile(user):
+    """Drop the per-instance memo so the next access resolves the profile again."""
+    user.__dict__.pop(_MEMO_ATTR, None)
+
+
+def invalidate_role(user_id):
+    """Remove the cross-request cache entry for a user."""
+    cache.delete(_cache_key(user_id))
+
+
+def _load(user):
+    """Load the profile using the cached role when possible."""
+    from profiles.models import StudentProfile, TeacherProfile
+
+    cached = cache.get(_cache_key(user.pk))
+    if cached is not None:
+        role, profile_id = cached
+        if role is None:
+            return NO_PROFILE
+
+        model = StudentProfile if role == ROLE_STUDENT else TeacherProfile
+        profile = (
+            model.objects.select_related('department')
+            .filter(pk=profile_id, user_id=user.pk)
+            .first()
+        )
+        if profile is not None:
+            return ResolvedProfile(role, profile)
+
+    resolved = _query(user)
+    profile_id = resolved.profile.pk if resolved.profile is not None else None
+    cache.set(_cache_key(user.pk), (resolved.role, profile_id), CACHE_TIMEOUT)
+    return resolved
+
+
+def _query(user):
+    """Load both possible profiles of the user in a single joined query."""
+    from users.models import User
+
+    fetched = (
+        User.objects.select_related('student_profile__department', 'teacher_profile__department')
+        .filter(pk=user.pk)
+        .first()
+    )
+    if fetched is None:
+        return NO_PROFILE
+
+    student = getattr(fetched, 'student_profile', None)
+    if student is not None:
+        return ResolvedProfile(ROLE_STUDENT, student)
+
+    teacher = getattr(fetched, 'teacher_profile', None)
+    if teacher is not None:
+        return ResolvedProfile(ROLE_TEACHER, teacher)
+
+    return NO_PROFILE
+
+
+def _prime_relations(user, resolved):
+    """Cache the reverse one-to-one relations on the user instance."""
+    from users.models import User
+
+    student = resolved.profile if resolved.role == ROLE_STUDENT else None
+    teacher = resolved.profile if resolved.role == ROLE_TEACHER else None
+
+    for descriptor, profile in (
+        (User.student_profile, student),
+        (User.teacher_profile, teacher),
+    ):
+        descriptor.related.set_cached_value(user, profile)
+        if profile is not None:
+            descriptor.related.field.set_cached_value(profile, user)
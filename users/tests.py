@@ -1,3 +1,69 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from profiles.models import Department, StudentProfile, TeacherProfile
+from users.models import User
+from users.roles import ROLE_STUDENT, ROLE_TEACHER, resolve_profile
+
+
+class RoleResolutionTests(TestCase):
+    """Role and profile are resolved once per request and cached across requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Кафедра програмування")
+        cls.student_user = User.objects.create_user(email="student@lnu.edu.ua")
+        cls.teacher_user = User.objects.create_user(email="teacher@lnu.edu.ua")
+        cls.plain_user = User.objects.create_user(email="new@lnu.edu.ua")
+        cls.student = StudentProfile.objects.create(
+            user=cls.student_user, group="ПМі-31", year_of_study=3, department=cls.department,
+        )
+        cls.teacher = TeacherProfile.objects.create(user=cls.teacher_user, department=cls.department)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_resolves_role_and_primes_relation(self):
+        user = User.objects.get(pk=self.student_user.pk)
+        with self.assertNumQueries(1):
+            resolved = resolve_profile(user)
+            self.assertEqual(resolved.role, ROLE_STUDENT)
+            self.assertTrue(user.is_student)
+            self.assertFalse(user.is_teacher)
+            self.assertEqual(user.student_profile, self.student)
+            self.assertEqual(user.student_profile.department.name, self.department.name)
+
+    def test_user_without_profile_is_cached_as_none(self):
+        resolve_profile(User.objects.get(pk=self.plain_user.pk))
+        user = User.objects.get(pk=self.plain_user.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_profile)
+            self.assertIsNone(user.profile_role)
+
+    def test_cached_role_loads_only_the_matching_profile(self):
+        resolve_profile(User.objects.get(pk=self.teacher_user.pk))
+        user = User.objects.get(pk=self.teacher_user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.profile_role, ROLE_TEACHER)
+            self.assertEqual(user.teacher_profile.department, self.department)
+
+    def test_profile_creation_invalidates_cached_role(self):
+        resolve_profile(User.objects.get(pk=self.plain_user.pk))
+        StudentProfile.objects.create(user=self.plain_user, group="ПМі-11", year_of_study=1)
+        user = User.objects.get(pk=self.plain_user.pk)
+        self.assertEqual(user.profile_role, ROLE_STUDENT)
+
+    def test_home_redirects_by_role(self):
+        self.client.force_login(self.teacher_user)
+        response = self.client.get(reverse('home'))
+        self.assertRedirects(response, reverse('profiles:teacher_profile'), fetch_redirect_response=False)
+
+        self.client.force_login(self.plain_user)
+        response = self.client.get(reverse('home'))
+        self.assertRedirects(response, reverse('profiles:onboarding'), fetch_redirect_response=False)
+
+    def test_role_decorator_redirects_other_role(self):
+        self.client.force_login(self.student_user)
+        response = self.client.get(reverse('profiles:teacher_profile'))
+        self.assertRedirects(response, reverse('profiles:student_profile'), fetch_redirect_response=False)